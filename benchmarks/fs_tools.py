@@ -0,0 +1,110 @@
+"""
+Event-loop blocking of the file tools, inline vs. on the I/O pool.
+
+Writes a few large log files, then has the file tools read their tails
+(building line indexes), edit and list them while other "chats" tick on
+the same loop every millisecond. Reports how long the loop was blocked:
+the total and worst lag of the ticks beyond their 1 ms sleep.
+
+"inline" calls the tools' blocking bodies directly in the coroutine, as
+the tools used to; "pool" awaits `execute()`, which runs them on
+worker threads.
+
+Usage:
+    python benchmarks/fs_tools.py [--files 4] [--mb 64] [--chats 20]
+"""
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from nanobot.agent.tools.fileread import line_indexes
+from nanobot.agent.tools.filesystem import EditFileTool, ListDirTool, ReadFileTool, WriteFileTool
+from nanobot.utils.metrics import metrics
+
+TICK = 0.001
+
+
+def make_files(root: Path, count: int, mb: int) -> list[Path]:
+    line = "2026-01-01T00:00:00 INFO request handled in 12ms path=/api/v1/items status=200\n"
+    block = line * (1024 * 1024 // len(line))
+    paths = []
+    for i in range(count):
+        path = root / f"app{i}.log"
+        with open(path, "w") as f:
+            for _ in range(mb):
+                f.write(block)
+        paths.append(path)
+    return paths
+
+
+async def chat(stop: asyncio.Event, lags: list[float]) -> None:
+    """Stands in for another conversation: wants the loop back every millisecond."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(max(0.0, time.perf_counter() - start - TICK))
+
+
+async def workload(paths: list[Path], inline: bool) -> None:
+    read, write, edit, ls = ReadFileTool(), WriteFileTool(), EditFileTool(), ListDirTool()
+
+    async def one(path: Path) -> None:
+        notes = str(path.with_suffix(".notes"))
+        if inline:
+            read._read(str(path), 10_000_000, 50, None, None)
+            write._write(notes, "x" * 5_000_000 + "marker")
+            edit._edit(notes, "marker", "edited")
+            ls._list(str(path.parent))
+        else:
+            await read.execute(str(path), offset=10_000_000, limit=50)
+            await write.execute(notes, "x" * 5_000_000 + "marker")
+            await edit.execute(notes, "marker", "edited")
+            await ls.execute(str(path.parent))
+
+    await asyncio.gather(*(one(p) for p in paths))
+
+
+async def run(paths: list[Path], chats: int, inline: bool) -> None:
+    line_indexes._entries.clear()
+    stop = asyncio.Event()
+    lags: list[float] = []
+    tickers = [asyncio.create_task(chat(stop, lags)) for _ in range(chats)]
+    await asyncio.sleep(0.05)
+    start = time.perf_counter()
+    await workload(paths, inline)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await asyncio.gather(*tickers)
+    lags.sort()
+    p99 = lags[int(len(lags) * 0.99)] if lags else 0.0
+    print(
+        f"  {'inline' if inline else 'pool':<7} wall {elapsed:6.2f}s   "
+        f"loop blocked: max {lags[-1] * 1e3:8.1f} ms  p99 {p99 * 1e3:7.1f} ms  "
+        f"mean {statistics.fmean(lags) * 1e3:6.2f} ms over {len(lags)} ticks"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=4)
+    parser.add_argument("--mb", type=int, default=64)
+    parser.add_argument("--chats", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="nanobot-fsbench-") as tmp:
+        paths = make_files(Path(tmp), args.files, args.mb)
+        print(f"{args.files} files x {args.mb} MB, {args.chats} concurrent chats:")
+        asyncio.run(run(paths, args.chats, inline=True))  # warm the page cache
+        for inline in (True, False):
+            asyncio.run(run(paths, args.chats, inline=inline))
+        for name, s in sorted(metrics.snapshot("tool.io.").items()):
+            if isinstance(s, dict):
+                print(f"  {name:<28} avg {s['avg'] * 1e3:8.2f} ms  max {s['max'] * 1e3:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
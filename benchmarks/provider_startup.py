@@ -0,0 +1,58 @@
+"""
+Compare cold-start time and peak RSS of LiteLLMProvider vs OpenAICompatProvider.
+
+Each sample runs in a fresh interpreter that imports the provider module and
+constructs a provider, as `nanobot agent -m` does before the first LLM call.
+
+Usage:
+    python benchmarks/provider_startup.py [--runs 5]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+SNIPPET = """
+import json, resource, time
+t0 = time.perf_counter()
+from {module} import {cls}
+provider = {cls}(api_key="sk-test", api_base="http://127.0.0.1:8000/v1", default_model="gpt-4o")
+elapsed = time.perf_counter() - t0
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{"seconds": elapsed, "rss_mb": rss_kb / 1024}}))
+"""
+
+PROVIDERS = {
+    "litellm": ("nanobot.providers.litellm_provider", "LiteLLMProvider"),
+    "openai": ("nanobot.providers.openai_compat", "OpenAICompatProvider"),
+}
+
+
+def sample(module: str, cls: str) -> dict[str, float]:
+    out = subprocess.run(
+        [sys.executable, "-c", SNIPPET.format(module=module, cls=cls)],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={"LITELLM_LOCAL_MODEL_COST_MAP": "True", "PATH": ""},
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'backend':<10} {'import+init (s)':>16} {'peak RSS (MB)':>14}")
+    for name, (module, cls) in PROVIDERS.items():
+        samples = [sample(module, cls) for _ in range(args.runs)]
+        seconds = statistics.median(s["seconds"] for s in samples)
+        rss = statistics.median(s["rss_mb"] for s in samples)
+        print(f"{name:<10} {seconds:>16.3f} {rss:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Microbenchmark of tool parameter validation and tool definition lookup.
+
+Compares the previous per-call recursive schema walk with the compiled
+validators, on a flat schema and on deep array/object schemas, and times
+ToolRegistry.get_definitions() with and without its cache.
+
+Usage:
+    python benchmarks/tool_validation.py [--number 20000]
+"""
+
+import argparse
+import timeit
+from typing import Any
+
+from nanobot.agent.tools.base import Tool
+from nanobot.agent.tools.registry import ToolRegistry
+
+TYPE_MAP = Tool._TYPE_MAP
+
+
+def walk(val: Any, schema: dict[str, Any], path: str) -> list[str]:
+    """The previous validator: re-reads the schema on every call."""
+    t, label = schema.get("type"), path or "parameter"
+    if t in TYPE_MAP and not isinstance(val, TYPE_MAP[t]):
+        return [f"{label} should be {t}"]
+    errors = []
+    if "enum" in schema and val not in schema["enum"]:
+        errors.append(f"{label} must be one of {schema['enum']}")
+    if t in ("integer", "number"):
+        if "minimum" in schema and val < schema["minimum"]:
+            errors.append(f"{label} must be >= {schema['minimum']}")
+        if "maximum" in schema and val > schema["maximum"]:
+            errors.append(f"{label} must be <= {schema['maximum']}")
+    if t == "string":
+        if "minLength" in schema and len(val) < schema["minLength"]:
+            errors.append(f"{label} must be at least {schema['minLength']} chars")
+        if "maxLength" in schema and len(val) > schema["maxLength"]:
+            errors.append(f"{label} must be at most {schema['maxLength']} chars")
+    if t == "object":
+        props = schema.get("properties", {})
+        for k in schema.get("required", []):
+            if k not in val:
+                errors.append(f"missing required {path + '.' + k if path else k}")
+        for k, v in val.items():
+            if k in props:
+                errors.extend(walk(v, props[k], path + "." + k if path else k))
+    if t == "array" and "items" in schema:
+        for i, item in enumerate(val):
+            errors.extend(walk(item, schema["items"], f"{path}[{i}]" if path else f"[{i}]"))
+    return errors
+
+
+FLAT = {
+    "type": "object",
+    "properties": {
+        "path": {"type": "string", "minLength": 1},
+        "offset": {"type": "integer", "minimum": 0},
+        "mode": {"type": "string", "enum": ["text", "bytes"]},
+    },
+    "required": ["path"],
+}
+FLAT_ARGS = {"path": "src/main.py", "offset": 10, "mode": "text"}
+
+EDIT = {
+    "type": "object",
+    "properties": {
+        "path": {"type": "string"},
+        "old_text": {"type": "string", "minLength": 1},
+        "new_text": {"type": "string"},
+        "count": {"type": "integer", "minimum": 1, "maximum": 100},
+    },
+    "required": ["path", "old_text", "new_text"],
+}
+DEEP = {
+    "type": "object",
+    "properties": {
+        "files": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "path": {"type": "string"},
+                    "edits": {"type": "array", "items": EDIT},
+                    "meta": {
+                        "type": "object",
+                        "properties": {"tags": {"type": "array", "items": {"type": "string", "maxLength": 32}}},
+                    },
+                },
+                "required": ["path", "edits"],
+            },
+        },
+    },
+    "required": ["files"],
+}
+DEEP_ARGS = {
+    "files": [
+        {
+            "path": f"src/mod{i}.py",
+            "edits": [{"path": f"src/mod{i}.py", "old_text": "a", "new_text": "b", "count": 1}] * 5,
+            "meta": {"tags": ["refactor", "perf"]},
+        }
+        for i in range(10)
+    ]
+}
+
+
+def make_tool(schema: dict[str, Any], name: str = "bench") -> Tool:
+    class BenchTool(Tool):
+        @property
+        def name(self) -> str:
+            return name
+
+        @property
+        def description(self) -> str:
+            return "benchmark tool"
+
+        @property
+        def parameters(self) -> dict[str, Any]:
+            return schema
+
+        async def execute(self, **kwargs: Any) -> str:
+            return ""
+
+    return BenchTool()
+
+
+def bench(label: str, fn, number: int) -> float:
+    seconds = min(timeit.repeat(fn, number=number, repeat=3))
+    per_call = seconds / number * 1e6
+    print(f"  {label:<28} {per_call:>9.2f} us/call")
+    return per_call
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+    n = args.number
+
+    for title, schema, params in (("flat schema", FLAT, FLAT_ARGS), ("deep array/object schema", DEEP, DEEP_ARGS)):
+        tool = make_tool(schema)
+        assert tool.validate_params(params) == walk(params, schema, "") == []
+        print(f"{title}:")
+        before = bench("recursive walk", lambda: walk(params, schema, ""), n // (10 if schema is DEEP else 1))
+        after = bench("compiled validator", lambda: tool.validate_params(params), n // (10 if schema is DEEP else 1))
+        print(f"  speedup {before / after:.1f}x")
+
+    registry = ToolRegistry()
+    for i in range(12):
+        registry.register(make_tool(DEEP if i % 2 else FLAT, name=f"tool{i}"))
+    print("get_definitions (12 tools):")
+    before = bench("rebuilt per call", lambda: [t._build_schema() for t in registry._tools.values()], n)
+    after = bench("cached", registry.get_definitions, n)
+    print(f"  speedup {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
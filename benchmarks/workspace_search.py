@@ -0,0 +1,80 @@
+"""
+Indexed workspace search vs. `grep -rn` over a generated source tree.
+
+Builds a tree of synthetic Python files, then times grep, the first
+(indexing) search, and repeated searches both within the rescan interval
+and with an mtime scan of the whole tree before each query.
+
+Usage:
+    python benchmarks/workspace_search.py [--files 5000] [--kb 16]
+"""
+
+import argparse
+import random
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+from nanobot.agent.tools.search import WorkspaceIndex
+
+WORDS = "request handler session config provider channel message token cache index buffer worker".split()
+
+
+def make_tree(root: Path, files: int, kb: int) -> None:
+    rng = random.Random(7)
+    for i in range(files):
+        path = root / f"pkg{i % 50}" / f"mod{i}.py"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        lines, size = [], 0
+        while size < kb * 1024:
+            a, b = rng.choice(WORDS), rng.choice(WORDS)
+            line = f"def {a}_{b}_{rng.randrange(10**6)}(x):  # {a} {b}\n"
+            lines.append(line)
+            size += len(line)
+        if i % 997 == 0:
+            lines.append("RARE_MARKER = 'needle_in_haystack'\n")
+        path.write_text("".join(lines))
+
+
+def timed(fn, repeat: int = 1) -> tuple[float, object]:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=5000)
+    parser.add_argument("--kb", type=int, default=16)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="nanobot-searchbench-") as tmp:
+        root = Path(tmp) / "ws"
+        make_tree(root, args.files, args.kb)
+        print(f"{args.files} files x {args.kb} KB:")
+
+        query = "needle_in_haystack"
+        t, out = timed(lambda: subprocess.run(["grep", "-rn", query, str(root)], capture_output=True), 3)
+        print(f"  grep -rn                      {t * 1e3:9.1f} ms  ({len(out.stdout.splitlines())} lines)")
+
+        index = WorkspaceIndex(root, Path(tmp) / "index.db", rescan_interval_s=3600)
+        t, hits = timed(lambda: index.search(query))
+        print(f"  first search (builds index)   {t * 1e3:9.1f} ms  ({sum(h.count for h in hits)} lines)")
+        for q in (query, "RARE_MARKER", "session_cache"):
+            t, hits = timed(lambda: index.search(q), 5)
+            print(f"  repeat {q!r:<22} {t * 1e3:9.1f} ms  ({sum(h.count for h in hits)} lines)")
+
+        index.rescan_interval_s = 0
+        t, _ = timed(lambda: index.search(query), 5)
+        print(f"  repeat with mtime scan        {t * 1e3:9.1f} ms")
+        print(f"  index: {index.stats()['indexed']:,} files, "
+              f"{(Path(tmp) / 'index.db').stat().st_size / 1e6:.1f} MB")
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
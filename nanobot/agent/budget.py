@@ -0,0 +1,110 @@
+"""Per-turn wall-clock and token budgets for the agent loop."""
+
+import asyncio
+import time
+from typing import Any, Awaitable, TypeVar
+
+from loguru import logger
+
+from nanobot.utils.metrics import metrics
+
+T = TypeVar("T")
+
+
+class BudgetExhaustedError(Exception):
+    """The turn ran out of time before an LLM call or tool finished."""
+
+
+class TurnBudget:
+    """
+    Limits how long and how many tokens one agent turn may spend.
+
+    The last `reserve_s` seconds of the deadline are kept for a final,
+    tool-less call that summarizes progress, so the whole turn, including
+    that call, ends within `timeout_s`. LLM calls and tool executions get
+    at most the time left before the reserve (`run()`).
+
+    `exhausted()` is checked before each iteration: it reports "time" when
+    the working time is used up, and "tokens" when the next call (estimated
+    as the size of the previous one) would exceed `max_tokens`.
+
+    Metrics: agent.budget.exhausted.time, agent.budget.exhausted.tokens.
+    """
+
+    FINAL_PROMPT = (
+        "You are out of {what} for this request. Do not call any more tools. "
+        "Reply to the user now: summarize what you did, what you found, and what is still left to do."
+    )
+
+    def __init__(self, timeout_s: float = 0.0, max_tokens: int = 0, reserve_s: float | None = None):
+        self.timeout_s = timeout_s
+        self.max_tokens = max_tokens
+        self.reserve_s = reserve_s if reserve_s is not None else min(30.0, timeout_s * 0.2)
+        self.started = time.monotonic()
+        self.tokens_used = 0
+        self._last_call_tokens = 0
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def remaining(self) -> float | None:
+        """Seconds left until the hard deadline (None = no deadline)."""
+        if self.timeout_s <= 0:
+            return None
+        return self.timeout_s - self.elapsed()
+
+    def work_remaining(self) -> float | None:
+        """Seconds left for LLM calls and tools, excluding the final-answer reserve."""
+        remaining = self.remaining()
+        return None if remaining is None else remaining - self.reserve_s
+
+    def add_usage(self, usage: dict[str, int]) -> None:
+        """Count the tokens of one LLM call."""
+        tokens = usage.get("total_tokens") or usage.get("prompt_tokens", 0) + usage.get("completion_tokens", 0)
+        self.tokens_used += tokens
+        self._last_call_tokens = tokens
+
+    def exhausted(self) -> str | None:
+        """Which budget, if any, is (nearly) used up: "time", "tokens" or None."""
+        work = self.work_remaining()
+        if work is not None and work <= 0:
+            return "time"
+        if self.max_tokens > 0 and self.tokens_used + self._last_call_tokens > self.max_tokens:
+            return "tokens"
+        return None
+
+    def record(self, what: str, scope: str = "turn") -> None:
+        """Log and count a budget-exhaustion event."""
+        metrics.incr(f"agent.budget.exhausted.{what}")
+        logger.warning(
+            f"{scope.capitalize()} budget exhausted ({what}): {self.elapsed():.1f}s elapsed, "
+            f"{self.tokens_used} tokens used; finalizing"
+        )
+
+    def final_prompt(self, what: str) -> str:
+        return self.FINAL_PROMPT.format(what="time" if what == "time" else "token budget")
+
+    async def run(self, aw: Awaitable[T]) -> T:
+        """
+        Await `aw` within the working time left.
+
+        Raises:
+            BudgetExhaustedError: The working time ran out first.
+        """
+        work = self.work_remaining()
+        if work is None:
+            return await aw
+        try:
+            return await asyncio.wait_for(aw, timeout=max(0.0, work))
+        except asyncio.TimeoutError:
+            raise BudgetExhaustedError(f"turn deadline of {self.timeout_s:g}s reached") from None
+
+    async def run_final(self, aw: Awaitable[T], fallback: Any = None) -> T | Any:
+        """Await the final call within the hard deadline, returning `fallback` on timeout."""
+        remaining = self.remaining()
+        if remaining is None:
+            return await aw
+        try:
+            return await asyncio.wait_for(aw, timeout=max(1.0, remaining))
+        except asyncio.TimeoutError:
+            return fallback
@@ -5,18 +5,28 @@
 # 好处：关注点分离清晰，易于调试和扩展，支持异步并发处理
 import asyncio
 import json
+import time
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from loguru import logger
 
 from nanobot.bus.events import InboundMessage, OutboundMessage
 from nanobot.bus.queue import MessageBus
-from nanobot.providers.base import LLMProvider
+from nanobot.providers.base import LLMProvider, ToolCallRequest
+from nanobot.providers.context import CallContext, call_context
 from nanobot.agent.context import ContextBuilder
+from nanobot.agent.budget import BudgetExhaustedError, TurnBudget
+from nanobot.agent.loop_guard import ToolLoopGuard
 from nanobot.agent.tools.registry import ToolRegistry
-from nanobot.agent.tools.filesystem import ReadFileTool, WriteFileTool, EditFileTool, ListDirTool
+from nanobot.agent.tools.filesystem import (
+    ReadFileTool, ReadFilesTool, WriteFileTool, EditFileTool, MultiEditTool, ListDirTool,
+)
+from nanobot.agent.tools.patch import ApplyPatchTool
+from nanobot.agent.tools.search import SearchTool, WorkspaceIndex, default_index_path
+from nanobot.agent.tools.jobs import JobManager, JobsTool
 from nanobot.agent.tools.shell import ExecTool
+from nanobot.agent.tools.shell_session import ShellSessionPool
 from nanobot.agent.tools.web import WebSearchTool, WebFetchTool
 from nanobot.agent.tools.message import MessageTool
 from nanobot.agent.tools.spawn import SpawnTool
@@ -24,6 +34,10 @@ from nanobot.agent.tools.cron import CronTool
 from nanobot.agent.subagent import SubagentManager
 from nanobot.session.manager import SessionManager
 
+if TYPE_CHECKING:
+    from nanobot.config.schema import WorkspaceSearchConfig
+    from nanobot.replay.recorder import TrafficRecorder
+
 
 class AgentLoop:
     """
@@ -50,23 +64,44 @@ class AgentLoop:
         workspace: Path,
         model: str | None = None,
         max_iterations: int = 20,
+        loop_warn_after: int = 3,
+        loop_stop_after: int = 5,
+        turn_timeout_s: float = 0.0,
+        turn_token_budget: int = 0,
+        subagent_timeout_s: float = 0.0,
+        subagent_model: str | None = None,
+        temperature: float = 0.7,
+        max_tokens: int = 4096,
         brave_api_key: str | None = None,
         exec_config: "ExecToolConfig | None" = None,
+        search_config: "WorkspaceSearchConfig | None" = None,
         cron_service: "CronService | None" = None,
         restrict_to_workspace: bool = False,
         session_manager: SessionManager | None = None,
+        recorder: "TrafficRecorder | None" = None,
     ):
-        from nanobot.config.schema import ExecToolConfig
+        from nanobot.config.schema import ExecToolConfig, WorkspaceSearchConfig
         from nanobot.cron.service import CronService
         self.bus = bus
         self.provider = provider
         self.workspace = workspace
         self.model = model or provider.get_default_model()
         self.max_iterations = max_iterations
+        self.loop_warn_after = loop_warn_after
+        self.loop_stop_after = loop_stop_after
+        self.turn_timeout_s = turn_timeout_s
+        self.turn_token_budget = turn_token_budget
+        self.temperature = temperature
+        self.max_tokens = max_tokens
         self.brave_api_key = brave_api_key
         self.exec_config = exec_config or ExecToolConfig()
+        self.search_config = search_config or WorkspaceSearchConfig()
         self.cron_service = cron_service
         self.restrict_to_workspace = restrict_to_workspace
+        self.recorder = recorder
+        if recorder:
+            # 在消息到达总线时记录，保留真实的到达间隔
+            bus.tap_inbound(recorder.record_inbound)
         
         self.context = ContextBuilder(workspace)
         self.sessions = session_manager or SessionManager(workspace)
@@ -75,12 +110,29 @@ class AgentLoop:
             provider=provider,
             workspace=workspace,
             bus=bus,
-            model=self.model,
+            model=subagent_model or self.model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            loop_warn_after=loop_warn_after,
+            loop_stop_after=loop_stop_after,
+            timeout_s=subagent_timeout_s,
+            token_budget=turn_token_budget,
             brave_api_key=brave_api_key,
             exec_config=self.exec_config,
             restrict_to_workspace=restrict_to_workspace,
         )
         
+        self.shells = ShellSessionPool(
+            max_sessions=self.exec_config.max_shells,
+            idle_timeout_s=self.exec_config.shell_idle_timeout_s,
+        ) if self.exec_config.persistent_shell else None
+        self.jobs = JobManager(
+            max_output=self.exec_config.max_output,
+            timeout_s=self.exec_config.job_timeout_s,
+            max_running=self.exec_config.max_jobs,
+            notify=bus.publish_inbound if self.exec_config.notify_jobs else None,
+        ) if self.exec_config.background_jobs else None
+
         self._running = False
         self._register_default_tools()
     
@@ -91,17 +143,40 @@ class AgentLoop:
         """Register the default set of tools."""
         # 文件工具（如果配置了工作限制到工作空间）
         allowed_dir = self.workspace if self.restrict_to_workspace else None
+        on_change = None
+        if self.search_config.enabled:
+            # 索引化工作区搜索；写入/编辑过的文件在下次搜索时立即重新索引
+            index = WorkspaceIndex(
+                self.workspace,
+                default_index_path(self.workspace),
+                max_file_bytes=self.search_config.max_file_kb * 1024,
+                rescan_interval_s=self.search_config.rescan_interval_s,
+            )
+            self.tools.register(SearchTool(self.workspace, index=index))
+            on_change = index.mark_dirty
         self.tools.register(ReadFileTool(allowed_dir=allowed_dir))
-        self.tools.register(WriteFileTool(allowed_dir=allowed_dir))
-        self.tools.register(EditFileTool(allowed_dir=allowed_dir))
-        self.tools.register(ListDirTool(allowed_dir=allowed_dir))
+        self.tools.register(WriteFileTool(allowed_dir=allowed_dir, on_change=on_change))
+        self.tools.register(EditFileTool(allowed_dir=allowed_dir, on_change=on_change))
+        self.tools.register(ListDirTool(allowed_dir=allowed_dir, workspace=self.workspace))
+        # 批量工具：一次调用读取多个文件/应用多处修改，减少 LLM 往返
+        self.tools.register(ReadFilesTool(allowed_dir=allowed_dir))
+        self.tools.register(MultiEditTool(allowed_dir=allowed_dir, on_change=on_change))
+        self.tools.register(ApplyPatchTool(self.workspace, allowed_dir=allowed_dir, on_change=on_change))
         
         # Shell工具
         self.tools.register(ExecTool(
             working_dir=str(self.workspace),
             timeout=self.exec_config.timeout,
             restrict_to_workspace=self.restrict_to_workspace,
+            max_output=self.exec_config.max_output,
+            progress_interval_s=self.exec_config.progress_interval_s,
+            send_callback=self.bus.publish_outbound,
+            sessions=self.shells,
+            jobs=self.jobs,
         ))
+        if self.jobs:
+            # 后台任务：完成后像子代理一样通过消息总线通知
+            self.tools.register(JobsTool(self.jobs))
         
         # Web工具
         self.tools.register(WebSearchTool(api_key=self.brave_api_key))
@@ -137,7 +212,8 @@ class AgentLoop:
                 
                 # 处理消息
                 try:
-                    response = await self._process_message(msg)
+                    with call_context(CallContext.from_inbound(msg)):
+                        response = await self._process_message(msg)
                     if response:
                         await self.bus.publish_outbound(response)
                 except Exception as e:
@@ -157,6 +233,10 @@ class AgentLoop:
     def stop(self) -> None:
         """停止智能体循环。"""
         self._running = False
+        if self.shells:
+            self.shells.close_all()
+        if self.jobs:
+            self.jobs.kill_all()
         logger.info("Agent loop stopping")
     
     # 作用：将用户消息转换为智能体响应，支持多轮工具调用和会话管理
@@ -205,50 +285,7 @@ class AgentLoop:
             chat_id=msg.chat_id,
         )
         
-        # Agent loop
-        iteration = 0
-        final_content = None
-        
-        while iteration < self.max_iterations:
-            iteration += 1
-            
-            # Call LLM
-            response = await self.provider.chat(
-                messages=messages,
-                tools=self.tools.get_definitions(),
-                model=self.model
-            )
-            
-            # Handle tool calls
-            if response.has_tool_calls:
-                # Add assistant message with tool calls
-                tool_call_dicts = [
-                    {
-                        "id": tc.id,
-                        "type": "function",
-                        "function": {
-                            "name": tc.name,
-                            "arguments": json.dumps(tc.arguments)  # Must be JSON string
-                        }
-                    }
-                    for tc in response.tool_calls
-                ]
-                messages = self.context.add_assistant_message(
-                    messages, response.content, tool_call_dicts
-                )
-                
-                # Execute tools
-                for tool_call in response.tool_calls:
-                    args_str = json.dumps(tool_call.arguments, ensure_ascii=False)
-                    logger.info(f"Tool call: {tool_call.name}({args_str[:200]})")
-                    result = await self.tools.execute(tool_call.name, tool_call.arguments)
-                    messages = self.context.add_tool_result(
-                        messages, tool_call.id, tool_call.name, result
-                    )
-            else:
-                # No tool calls, we're done
-                final_content = response.content
-                break
+        final_content = await self._run_agent_loop(messages)
         
         if final_content is None:
             final_content = "I've completed processing but have no response to give."
@@ -268,6 +305,119 @@ class AgentLoop:
             content=final_content
         )
     
+    # 作用：执行一轮对话的LLM调用与工具调用迭代
+    # 设计目的：主消息与系统消息共用同一迭代逻辑，检测重复工具调用并限制时间与token预算
+    # 好处：卡住或过长的回合不会耗尽全部迭代次数，每次回复都有确定的最坏延迟
+    async def _run_agent_loop(self, messages: list[dict[str, Any]]) -> str | None:
+        """
+        Call the LLM and execute its tool calls until it answers.
+
+        A ToolLoopGuard watches the calls: repeated ones get a hint appended
+        to their result. A TurnBudget bounds the turn's wall-clock time and
+        tokens. A turn that keeps looping or runs out of budget ends with
+        one final call without tools.
+
+        Returns:
+            The final answer, or None if max_iterations ran out.
+        """
+        guard = ToolLoopGuard(self.loop_warn_after, self.loop_stop_after)
+        budget = TurnBudget(self.turn_timeout_s, self.turn_token_budget)
+
+        for _ in range(self.max_iterations):
+            if exhausted := budget.exhausted():
+                budget.record(exhausted)
+                return await self._final_answer(messages, budget.final_prompt(exhausted), budget)
+            try:
+                response = await budget.run(self.provider.chat(
+                    messages=messages,
+                    tools=self.tools.get_definitions(),
+                    model=self.model,
+                    max_tokens=self.max_tokens,
+                    temperature=self.temperature,
+                ))
+            except BudgetExhaustedError:
+                budget.record("time")
+                return await self._final_answer(messages, budget.final_prompt("time"), budget)
+            budget.add_usage(response.usage)
+            if not response.has_tool_calls:
+                return response.content
+
+            # Add assistant message with tool calls
+            tool_call_dicts = [
+                {
+                    "id": tc.id,
+                    "type": "function",
+                    "function": {
+                        "name": tc.name,
+                        "arguments": json.dumps(tc.arguments)  # Must be JSON string
+                    }
+                }
+                for tc in response.tool_calls
+            ]
+            messages = self.context.add_assistant_message(
+                messages, response.content, tool_call_dicts
+            )
+
+            # Execute tools
+            looping = False
+            out_of_time = False
+            for tool_call in response.tool_calls:
+                if out_of_time:
+                    result = "Error: not run, the time budget for this request is used up"
+                else:
+                    try:
+                        result = await budget.run(self._execute_tool(tool_call))
+                    except BudgetExhaustedError:
+                        out_of_time = True
+                        result = "Error: stopped, the time budget for this request is used up"
+                guard.record(tool_call.name, tool_call.arguments)
+                verdict = guard.check()
+                if verdict == "warn":
+                    result += guard.hint()
+                looping = looping or verdict == "stop"
+                messages = self.context.add_tool_result(
+                    messages, tool_call.id, tool_call.name, result
+                )
+
+            if out_of_time:
+                budget.record("time")
+                return await self._final_answer(messages, budget.final_prompt("time"), budget)
+            if looping:
+                logger.warning(f"Tool loop detected ({guard.repeats()} repeats), asking for a final answer")
+                return await self._final_answer(messages, ToolLoopGuard.FINAL_PROMPT, budget)
+
+        return None
+
+    async def _final_answer(
+        self,
+        messages: list[dict[str, Any]],
+        instruction: str,
+        budget: TurnBudget,
+    ) -> str | None:
+        """One last LLM call without tools, asking the model to wrap up within the deadline."""
+        response = await budget.run_final(self.provider.chat(
+            messages=[*messages, {"role": "user", "content": instruction}],
+            tools=None,
+            model=self.model,
+            max_tokens=self.max_tokens,
+            temperature=self.temperature,
+        ))
+        if response is None:
+            return "Sorry, I ran out of time on this request before I could finish."
+        return response.content
+
+    async def _execute_tool(self, tool_call: ToolCallRequest) -> str:
+        """Execute one tool call, logging it and recording the result if enabled."""
+        args_str = json.dumps(tool_call.arguments, ensure_ascii=False)
+        logger.info(f"Tool call: {tool_call.name}({args_str[:200]})")
+        start = time.monotonic()
+        result = await self.tools.execute(tool_call.name, tool_call.arguments)
+        if self.recorder:
+            self.recorder.record_tool(
+                tool_call.name, tool_call.arguments, result, time.monotonic() - start
+            )
+        return result
+
     # 作用：处理后台任务完成通知，将结果路由回原始会话
     # 设计目的：支持异步任务与主代理的无缝集成，实现任务结果传递
     # 好处：解耦后台任务与实时交互，支持长时间运行的任务，保持会话连续性
@@ -315,45 +465,7 @@ class AgentLoop:
             chat_id=origin_chat_id,
         )
         
-        # Agent loop (limited for announce handling)
-        iteration = 0
-        final_content = None
-        
-        while iteration < self.max_iterations:
-            iteration += 1
-            
-            response = await self.provider.chat(
-                messages=messages,
-                tools=self.tools.get_definitions(),
-                model=self.model
-            )
-            
-            if response.has_tool_calls:
-                tool_call_dicts = [
-                    {
-                        "id": tc.id,
-                        "type": "function",
-                        "function": {
-                            "name": tc.name,
-                            "arguments": json.dumps(tc.arguments)
-                        }
-                    }
-                    for tc in response.tool_calls
-                ]
-                messages = self.context.add_assistant_message(
-                    messages, response.content, tool_call_dicts
-                )
-                
-                for tool_call in response.tool_calls:
-                    args_str = json.dumps(tool_call.arguments, ensure_ascii=False)
-                    logger.info(f"Tool call: {tool_call.name}({args_str[:200]})")
-                    result = await self.tools.execute(tool_call.name, tool_call.arguments)
-                    messages = self.context.add_tool_result(
-                        messages, tool_call.id, tool_call.name, result
-                    )
-            else:
-                final_content = response.content
-                break
+        final_content = await self._run_agent_loop(messages)
         
         if final_content is None:
             final_content = "Background task completed."
@@ -391,12 +503,20 @@ class AgentLoop:
         Returns:
             The agent's response.
         """
+        # Cron jobs use "cron:<id>" and heartbeats "heartbeat" as session keys
+        prefix = session_key.split(":", 1)[0]
+        origin = prefix if prefix in ("cron", "heartbeat") else "user"
         msg = InboundMessage(
             channel=channel,
             sender_id="user",
             chat_id=chat_id,
-            content=content
+            content=content,
+            metadata={"origin": origin, "session_key": session_key},
         )
+        if self.recorder:
+            # 直接调用不经过总线，在此记录到达时间
+            self.recorder.record_inbound(msg)
         
-        response = await self._process_message(msg)
+        with call_context(CallContext.from_inbound(msg)):
+            response = await self._process_message(msg)
         return response.content if response else ""
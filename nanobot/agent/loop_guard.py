@@ -0,0 +1,91 @@
+"""Detection of runaway repeated tool calls within one agent turn."""
+
+import hashlib
+import json
+from collections import Counter
+from typing import Any
+
+from nanobot.utils.metrics import metrics
+
+
+def call_fingerprint(name: str, arguments: dict[str, Any]) -> str:
+    """Stable short hash of a tool name plus its arguments."""
+    payload = json.dumps({"n": name, "a": arguments}, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class ToolLoopGuard:
+    """
+    Spots a model stuck repeating itself and says how to react.
+
+    Every tool call of a turn is fingerprinted. A turn counts as looping
+    when the latest calls repeat a cycle of length 1-3 (the same call over
+    and over, or alternating between two or three calls). A call made
+    2 x `stop_after` times in one turn, even interleaved with others, also
+    stops it. `check()` returns:
+
+    - "ok": carry on
+    - "warn": after `warn_after` repeats; append `hint()` to the tool result
+    - "stop": after `stop_after` repeats; ask for a final answer without tools
+
+    Metrics: agent.loop_guard.warned, agent.loop_guard.stopped.
+    """
+
+    MAX_PERIOD = 3
+    FINAL_PROMPT = (
+        "You are repeating the same tool calls without progress. Do not call any more tools. "
+        "Reply to the user now with what you have found so far and what remains unresolved."
+    )
+
+    def __init__(self, warn_after: int = 3, stop_after: int = 5):
+        self.warn_after = warn_after
+        self.stop_after = stop_after
+        self.history: list[tuple[str, str]] = []  # (fingerprint, tool name)
+        self._warned = False
+
+    def record(self, name: str, arguments: dict[str, Any]) -> None:
+        """Add one executed tool call."""
+        self.history.append((call_fingerprint(name, arguments), name))
+
+    def repeats(self) -> int:
+        """How many times the most repeated recent pattern occurred."""
+        prints = [fp for fp, _ in self.history]
+        best = 0
+        for period in range(1, self.MAX_PERIOD + 1):
+            if len(prints) < period:
+                break
+            block = prints[-period:]
+            # Skip e.g. A,A counted as period 2: a cycle needs distinct members
+            if period > 1 and len(set(block)) < period:
+                continue
+            count = 1
+            end = len(prints) - period
+            while end >= period and prints[end - period:end] == block:
+                count += 1
+                end -= period
+            best = max(best, count)
+        return best
+
+    def check(self) -> str:
+        """React to the calls recorded so far."""
+        if self.stop_after <= 0 and self.warn_after <= 0:
+            return "ok"
+        n = self.repeats()
+        most = max(Counter(fp for fp, _ in self.history).values(), default=0)
+        if self.stop_after > 0 and (n >= self.stop_after or most >= 2 * self.stop_after):
+            metrics.incr("agent.loop_guard.stopped")
+            return "stop"
+        if self.warn_after > 0 and n >= self.warn_after:
+            if not self._warned:
+                metrics.incr("agent.loop_guard.warned")
+            self._warned = True
+            return "warn"
+        return "ok"
+
+    def hint(self) -> str:
+        """Feedback appended to the latest tool result when warning."""
+        name = self.history[-1][1] if self.history else "the same tool"
+        return (
+            f"\n\n[Loop guard: {name} has been called {self.repeats()} times with the same arguments "
+            "and the result will not change. Try a different approach, or answer with what you have.]"
+        )
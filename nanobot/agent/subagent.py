@@ -14,8 +14,11 @@ from loguru import logger
 from nanobot.bus.events import InboundMessage
 from nanobot.bus.queue import MessageBus
 from nanobot.providers.base import LLMProvider
+from nanobot.providers.context import CallContext, set_call_context
+from nanobot.agent.budget import BudgetExhaustedError, TurnBudget
+from nanobot.agent.loop_guard import ToolLoopGuard
 from nanobot.agent.tools.registry import ToolRegistry
-from nanobot.agent.tools.filesystem import ReadFileTool, WriteFileTool, ListDirTool
+from nanobot.agent.tools.filesystem import ReadFileTool, ReadFilesTool, WriteFileTool, ListDirTool
 from nanobot.agent.tools.shell import ExecTool
 from nanobot.agent.tools.web import WebSearchTool, WebFetchTool
 
@@ -41,6 +44,12 @@ class SubagentManager:
         workspace: Path,
         bus: MessageBus,
         model: str | None = None,
+        temperature: float = 0.7,
+        max_tokens: int = 4096,
+        loop_warn_after: int = 3,
+        loop_stop_after: int = 5,
+        timeout_s: float = 0.0,
+        token_budget: int = 0,
         brave_api_key: str | None = None,
         exec_config: "ExecToolConfig | None" = None,
         restrict_to_workspace: bool = False,
@@ -50,6 +59,12 @@ class SubagentManager:
         self.workspace = workspace
         self.bus = bus
         self.model = model or provider.get_default_model()
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.loop_warn_after = loop_warn_after
+        self.loop_stop_after = loop_stop_after
+        self.timeout_s = timeout_s
+        self.token_budget = token_budget
         self.brave_api_key = brave_api_key
         self.exec_config = exec_config or ExecToolConfig()
         self.restrict_to_workspace = restrict_to_workspace
@@ -109,18 +124,27 @@ class SubagentManager:
     ) -> None:
         """Execute the subagent task and announce the result."""
         logger.info(f"Subagent [{task_id}] starting task: {label}")
+        # Runs in its own task, so this context does not leak into the main agent
+        set_call_context(CallContext(
+            origin="subagent",
+            channel=origin["channel"],
+            chat_id=origin["chat_id"],
+            session_key=f"subagent:{task_id}",
+        ))
         
         try:
             # Build subagent tools (no message tool, no spawn tool)
             tools = ToolRegistry()
             allowed_dir = self.workspace if self.restrict_to_workspace else None
             tools.register(ReadFileTool(allowed_dir=allowed_dir))
+            tools.register(ReadFilesTool(allowed_dir=allowed_dir))
             tools.register(WriteFileTool(allowed_dir=allowed_dir))
-            tools.register(ListDirTool(allowed_dir=allowed_dir))
+            tools.register(ListDirTool(allowed_dir=allowed_dir, workspace=self.workspace))
             tools.register(ExecTool(
                 working_dir=str(self.workspace),
                 timeout=self.exec_config.timeout,
                 restrict_to_workspace=self.restrict_to_workspace,
+                max_output=self.exec_config.max_output,
             ))
             tools.register(WebSearchTool(api_key=self.brave_api_key))
             tools.register(WebFetchTool())
@@ -136,15 +160,29 @@ class SubagentManager:
             max_iterations = 15
             iteration = 0
             final_result: str | None = None
+            guard = ToolLoopGuard(self.loop_warn_after, self.loop_stop_after)
+            budget = TurnBudget(self.timeout_s, self.token_budget)
             
             while iteration < max_iterations:
                 iteration += 1
                 
-                response = await self.provider.chat(
-                    messages=messages,
-                    tools=tools.get_definitions(),
-                    model=self.model,
-                )
+                if exhausted := budget.exhausted():
+                    budget.record(exhausted, scope=f"subagent [{task_id}]")
+                    final_result = await self._finalize(messages, budget.final_prompt(exhausted), budget)
+                    break
+                try:
+                    response = await budget.run(self.provider.chat(
+                        messages=messages,
+                        tools=tools.get_definitions(),
+                        model=self.model,
+                        max_tokens=self.max_tokens,
+                        temperature=self.temperature,
+                    ))
+                except BudgetExhaustedError:
+                    budget.record("time", scope=f"subagent [{task_id}]")
+                    final_result = await self._finalize(messages, budget.final_prompt("time"), budget)
+                    break
+                budget.add_usage(response.usage)
                 
                 if response.has_tool_calls:
                     # Add assistant message with tool calls
@@ -166,16 +204,39 @@ class SubagentManager:
                     })
                     
                     # Execute tools
+                    looping = False
+                    out_of_time = False
                     for tool_call in response.tool_calls:
                         args_str = json.dumps(tool_call.arguments)
                         logger.debug(f"Subagent [{task_id}] executing: {tool_call.name} with arguments: {args_str}")
-                        result = await tools.execute(tool_call.name, tool_call.arguments)
+                        if out_of_time:
+                            result = "Error: not run, the time budget for this task is used up"
+                        else:
+                            try:
+                                result = await budget.run(tools.execute(tool_call.name, tool_call.arguments))
+                            except BudgetExhaustedError:
+                                out_of_time = True
+                                result = "Error: stopped, the time budget for this task is used up"
+                        guard.record(tool_call.name, tool_call.arguments)
+                        verdict = guard.check()
+                        if verdict == "warn":
+                            result += guard.hint()
+                        looping = looping or verdict == "stop"
                         messages.append({
                             "role": "tool",
                             "tool_call_id": tool_call.id,
                             "name": tool_call.name,
                             "content": result,
                         })
+
+                    if out_of_time:
+                        budget.record("time", scope=f"subagent [{task_id}]")
+                        final_result = await self._finalize(messages, budget.final_prompt("time"), budget)
+                        break
+                    if looping:
+                        logger.warning(f"Subagent [{task_id}] stuck in a tool loop, asking for a final answer")
+                        final_result = await self._finalize(messages, ToolLoopGuard.FINAL_PROMPT, budget)
+                        break
                 else:
                     final_result = response.content
                     break
@@ -191,6 +252,23 @@ class SubagentManager:
             logger.error(f"Subagent [{task_id}] failed: {e}")
             await self._announce_result(task_id, label, task, error_msg, origin, "error")
     
+    async def _finalize(
+        self,
+        messages: list[dict[str, Any]],
+        instruction: str,
+        budget: TurnBudget,
+    ) -> str | None:
+        """One last LLM call without tools, asking the subagent to report what it has."""
+        messages.append({"role": "user", "content": instruction})
+        response = await budget.run_final(self.provider.chat(
+            messages=messages,
+            tools=None,
+            model=self.model,
+            max_tokens=self.max_tokens,
+            temperature=self.temperature,
+        ))
+        return response.content if response else "Task stopped: time budget exhausted."
+
     # 作用：通过消息总线向主代理通知子代理结果
     # 设计目的：结构化结果格式化，系统消息注入，路由信息传递
     # 好处：主代理无缝处理结果，用户友好摘要，错误传播
@@ -1,7 +1,7 @@
 """Base class for agent tools."""
 
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Callable
 
 
 class Tool(ABC):
@@ -54,44 +54,98 @@ class Tool(ABC):
 
     def validate_params(self, params: dict[str, Any]) -> list[str]:
         """Validate tool parameters against JSON schema. Returns error list (empty if valid)."""
-        schema = self.parameters or {}
-        if schema.get("type", "object") != "object":
-            raise ValueError(f"Schema must be object type, got {schema.get('type')!r}")
-        return self._validate(params, {**schema, "type": "object"}, "")
+        validator = self.__dict__.get("_validator")
+        if validator is None:
+            schema = self.parameters or {}
+            if schema.get("type", "object") != "object":
+                raise ValueError(f"Schema must be object type, got {schema.get('type')!r}")
+            # Compiled once per instance; parameters are static for a tool's lifetime
+            validator = self._validator = self._compile({**schema, "type": "object"})
+        errors: list[str] = []
+        validator(params, "", None, errors)
+        return errors
 
-    def _validate(self, val: Any, schema: dict[str, Any], path: str) -> list[str]:
-        t, label = schema.get("type"), path or "parameter"
-        if t in self._TYPE_MAP and not isinstance(val, self._TYPE_MAP[t]):
-            return [f"{label} should be {t}"]
-        
-        errors = []
-        if "enum" in schema and val not in schema["enum"]:
-            errors.append(f"{label} must be one of {schema['enum']}")
+    @staticmethod
+    def _path(parent: str, key: str | int | None) -> str:
+        """Dotted path of a value from its parent's path and its key or index."""
+        if key is None:
+            return parent
+        if isinstance(key, int):
+            return f"{parent}[{key}]"
+        return f"{parent}.{key}" if parent else key
+
+    @classmethod
+    def _compile(cls, schema: dict[str, Any]) -> Callable[[Any, str, str | int | None, list[str]], None]:
+        """
+        Turn a JSON schema into a validator closure.
+
+        All schema lookups happen here, once; the closure only runs the
+        checks that apply and appends error messages to `errors`. A value's
+        path is passed as (parent path, key) and only joined into a string
+        when it is reported or needed by nested values.
+        """
+        t = schema.get("type")
+        py_type = cls._TYPE_MAP.get(t)
+        join = cls._path
+        checks: list[Callable[[Any], str | None]] = []
+
+        if "enum" in schema:
+            enum = schema["enum"]
+            checks.append(lambda v: None if v in enum else f"must be one of {enum}")
         if t in ("integer", "number"):
-            if "minimum" in schema and val < schema["minimum"]:
-                errors.append(f"{label} must be >= {schema['minimum']}")
-            if "maximum" in schema and val > schema["maximum"]:
-                errors.append(f"{label} must be <= {schema['maximum']}")
+            if "minimum" in schema:
+                lo = schema["minimum"]
+                checks.append(lambda v: f"must be >= {lo}" if v < lo else None)
+            if "maximum" in schema:
+                hi = schema["maximum"]
+                checks.append(lambda v: f"must be <= {hi}" if v > hi else None)
         if t == "string":
-            if "minLength" in schema and len(val) < schema["minLength"]:
-                errors.append(f"{label} must be at least {schema['minLength']} chars")
-            if "maxLength" in schema and len(val) > schema["maxLength"]:
-                errors.append(f"{label} must be at most {schema['maxLength']} chars")
+            if "minLength" in schema:
+                min_len = schema["minLength"]
+                checks.append(lambda v: f"must be at least {min_len} chars" if len(v) < min_len else None)
+            if "maxLength" in schema:
+                max_len = schema["maxLength"]
+                checks.append(lambda v: f"must be at most {max_len} chars" if len(v) > max_len else None)
+
+        props: dict[str, Callable[[Any, str, str | int | None, list[str]], None]] = {}
+        required: tuple[str, ...] = ()
         if t == "object":
-            props = schema.get("properties", {})
-            for k in schema.get("required", []):
-                if k not in val:
-                    errors.append(f"missing required {path + '.' + k if path else k}")
-            for k, v in val.items():
-                if k in props:
-                    errors.extend(self._validate(v, props[k], path + '.' + k if path else k))
-        if t == "array" and "items" in schema:
-            for i, item in enumerate(val):
-                errors.extend(self._validate(item, schema["items"], f"{path}[{i}]" if path else f"[{i}]"))
-        return errors
+            props = {k: cls._compile(v) for k, v in schema.get("properties", {}).items()}
+            required = tuple(schema.get("required", ()))
+        item = cls._compile(schema["items"]) if t == "array" and "items" in schema else None
+
+        def validate(val: Any, parent: str, key: str | int | None, errors: list[str]) -> None:
+            if py_type is not None and not isinstance(val, py_type):
+                errors.append(f"{join(parent, key) or 'parameter'} should be {t}")
+                return
+            for check in checks:
+                error = check(val)
+                if error:
+                    errors.append(f"{join(parent, key) or 'parameter'} {error}")
+            if required or props:
+                path = join(parent, key)
+                for k in required:
+                    if k not in val:
+                        errors.append(f"missing required {join(path, k)}")
+                for k, v in val.items():
+                    sub = props.get(k)
+                    if sub is not None:
+                        sub(v, path, k, errors)
+            elif item is not None:
+                path = join(parent, key)
+                for i, v in enumerate(val):
+                    item(v, path, i, errors)
+
+        return validate
     
     def to_schema(self) -> dict[str, Any]:
-        """Convert tool to OpenAI function schema format."""
+        """Convert tool to OpenAI function schema format (built once per instance)."""
+        schema = self.__dict__.get("_schema")
+        if schema is None:
+            schema = self._schema = self._build_schema()
+        return schema
+
+    def _build_schema(self) -> dict[str, Any]:
         return {
             "type": "function",
             "function": {
@@ -1,9 +1,17 @@
-"""File system tools: read, write, edit."""
+"""File system tools: read, write, edit, list.
 
+All filesystem access runs on the shared `io_pool` worker threads.
+"""
+
+import asyncio
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
 from nanobot.agent.tools.base import Tool
+from nanobot.agent.tools.fileread import SNIFF, hexdump, is_binary, read_bytes, read_lines
+from nanobot.agent.tools.iopool import io_pool
+from nanobot.utils.helpers import atomic_write_text, format_size
+from nanobot.utils.ignore import IgnoreRules, compile_glob, rules_root, walk
 
 
 def _resolve_path(path: str, allowed_dir: Path | None = None) -> Path:
@@ -15,10 +23,19 @@ def _resolve_path(path: str, allowed_dir: Path | None = None) -> Path:
 
 
 class ReadFileTool(Tool):
-    """Tool to read file contents."""
-    
-    def __init__(self, allowed_dir: Path | None = None):
+    """
+    Tool to read file contents.
+
+    Small text files are returned whole. Larger ones are read in slices by
+    line (offset/limit) or by byte (byte_offset/byte_limit) without loading
+    the file: a sparse, cached line index finds where a slice starts. Output
+    is capped at `max_chars`, with a note telling the model how to continue.
+    Binary files are refused unless read by byte, which gives a hex dump.
+    """
+
+    def __init__(self, allowed_dir: Path | None = None, max_chars: int = 50_000):
         self._allowed_dir = allowed_dir
+        self.max_chars = max_chars
 
     @property
     def name(self) -> str:
@@ -26,7 +43,10 @@ class ReadFileTool(Tool):
     
     @property
     def description(self) -> str:
-        return "Read the contents of a file at the given path."
+        return (
+            "Read the contents of a file at the given path. Large files are returned in slices: "
+            "use offset/limit (lines) or byte_offset/byte_limit (bytes) to read a specific part."
+        )
     
     @property
     def parameters(self) -> dict[str, Any]:
@@ -36,12 +56,50 @@ class ReadFileTool(Tool):
                 "path": {
                     "type": "string",
                     "description": "The file path to read"
+                },
+                "offset": {
+                    "type": "integer",
+                    "minimum": 1,
+                    "description": "First line to read (1-based)"
+                },
+                "limit": {
+                    "type": "integer",
+                    "minimum": 1,
+                    "description": "Maximum number of lines to read"
+                },
+                "byte_offset": {
+                    "type": "integer",
+                    "minimum": 0,
+                    "description": "Read raw bytes starting here instead of lines"
+                },
+                "byte_limit": {
+                    "type": "integer",
+                    "minimum": 1,
+                    "description": "Number of bytes to read in byte mode"
                 }
             },
             "required": ["path"]
         }
     
-    async def execute(self, path: str, **kwargs: Any) -> str:
+    async def execute(
+        self,
+        path: str,
+        offset: int | None = None,
+        limit: int | None = None,
+        byte_offset: int | None = None,
+        byte_limit: int | None = None,
+        **kwargs: Any,
+    ) -> str:
+        return await io_pool.run(self.name, self._read, path, offset, limit, byte_offset, byte_limit)
+
+    def _read(
+        self,
+        path: str,
+        offset: int | None,
+        limit: int | None,
+        byte_offset: int | None,
+        byte_limit: int | None,
+    ) -> str:
         try:
             file_path = _resolve_path(path, self._allowed_dir)
             if not file_path.exists():
@@ -49,19 +107,63 @@ class ReadFileTool(Tool):
             if not file_path.is_file():
                 return f"Error: Not a file: {path}"
             
-            content = file_path.read_text(encoding="utf-8")
-            return content
+            if byte_offset is not None or byte_limit is not None:
+                return self._read_bytes(file_path, path, byte_offset or 0, byte_limit)
+
+            size = file_path.stat().st_size
+            with open(file_path, "rb") as f:
+                sample = f.read(SNIFF)
+            if is_binary(sample):
+                return (
+                    f"Error: {path} looks like a binary file ({size:,} bytes). "
+                    "Use byte_offset/byte_limit to get a hex dump of part of it."
+                )
+
+            if offset is None and limit is None and size <= self.max_chars:
+                return file_path.read_text(encoding="utf-8")
+
+            part = read_lines(file_path, offset or 1, limit, self.max_chars)
+            if part.last < part.first:
+                return f"Error: offset {part.first} is past the end of {path} ({part.total:,} lines)"
+            if part.first == 1 and part.last >= part.total and not part.truncated:
+                return part.text
+
+            note = f"[Lines {part.first}-{part.last} of {part.total:,}"
+            if part.truncated:
+                note += f", output capped at {self.max_chars:,} chars"
+            if part.last < part.total:
+                note += f". Use offset={part.last + 1} to read more"
+            return f"{part.text.rstrip(chr(10))}\n\n{note}.]"
         except PermissionError as e:
             return f"Error: {e}"
         except Exception as e:
             return f"Error reading file: {str(e)}"
 
+    def _read_bytes(self, file_path: Path, path: str, start: int, count: int | None) -> str:
+        size = file_path.stat().st_size
+        if start >= size and size:
+            return f"Error: byte_offset {start} is past the end of {path} ({size:,} bytes)"
+        with open(file_path, "rb") as f:
+            binary = is_binary(f.read(SNIFF))
+        # A hex dump takes ~4 output chars per byte
+        cap = self.max_chars // 4 if binary else self.max_chars
+        data, capped = read_bytes(file_path, start, count or cap, cap)
+        end = start + len(data)
+        body = hexdump(data, start) if binary else data.decode("utf-8", errors="replace")
+        note = f"[Bytes {start:,}-{end:,} of {size:,}"
+        if capped:
+            note += f", output capped at {cap:,} bytes"
+        if end < size:
+            note += f". Use byte_offset={end} to read more"
+        return f"{body}\n\n{note}.]"
+
 
 class WriteFileTool(Tool):
     """Tool to write content to a file."""
     
-    def __init__(self, allowed_dir: Path | None = None):
+    def __init__(self, allowed_dir: Path | None = None, on_change: Callable[[Path], None] | None = None):
         self._allowed_dir = allowed_dir
+        self._on_change = on_change
 
     @property
     def name(self) -> str:
@@ -89,10 +191,15 @@ class WriteFileTool(Tool):
         }
     
     async def execute(self, path: str, content: str, **kwargs: Any) -> str:
+        return await io_pool.run(self.name, self._write, path, content)
+
+    def _write(self, path: str, content: str) -> str:
         try:
             file_path = _resolve_path(path, self._allowed_dir)
             file_path.parent.mkdir(parents=True, exist_ok=True)
             file_path.write_text(content, encoding="utf-8")
+            if self._on_change:
+                self._on_change(file_path)
             return f"Successfully wrote {len(content)} bytes to {path}"
         except PermissionError as e:
             return f"Error: {e}"
@@ -103,8 +210,9 @@ class WriteFileTool(Tool):
 class EditFileTool(Tool):
     """Tool to edit a file by replacing text."""
     
-    def __init__(self, allowed_dir: Path | None = None):
+    def __init__(self, allowed_dir: Path | None = None, on_change: Callable[[Path], None] | None = None):
         self._allowed_dir = allowed_dir
+        self._on_change = on_change
 
     @property
     def name(self) -> str:
@@ -136,6 +244,9 @@ class EditFileTool(Tool):
         }
     
     async def execute(self, path: str, old_text: str, new_text: str, **kwargs: Any) -> str:
+        return await io_pool.run(self.name, self._edit, path, old_text, new_text)
+
+    def _edit(self, path: str, old_text: str, new_text: str) -> str:
         try:
             file_path = _resolve_path(path, self._allowed_dir)
             if not file_path.exists():
@@ -153,6 +264,8 @@ class EditFileTool(Tool):
             
             new_content = content.replace(old_text, new_text, 1)
             file_path.write_text(new_content, encoding="utf-8")
+            if self._on_change:
+                self._on_change(file_path)
             
             return f"Successfully edited {path}"
         except PermissionError as e:
@@ -161,11 +274,176 @@ class EditFileTool(Tool):
             return f"Error editing file: {str(e)}"
 
 
+class MultiEditTool(Tool):
+    """
+    Tool to apply several text replacements to one file in a single call.
+
+    Edits apply in order to the file's content in memory; if any edit does
+    not match (or matches ambiguously), nothing is written. The result is
+    written atomically (temp file + rename).
+    """
+
+    def __init__(self, allowed_dir: Path | None = None, on_change: Callable[[Path], None] | None = None):
+        self._allowed_dir = allowed_dir
+        self._on_change = on_change
+
+    @property
+    def name(self) -> str:
+        return "multi_edit"
+
+    @property
+    def description(self) -> str:
+        return (
+            "Apply several replacements to one file at once. Each old_text must match exactly once "
+            "(or set replace_all). Edits apply in order; if any fails, the file is left unchanged."
+        )
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {
+                "path": {
+                    "type": "string",
+                    "description": "The file path to edit"
+                },
+                "edits": {
+                    "type": "array",
+                    "minItems": 1,
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "old_text": {
+                                "type": "string",
+                                "minLength": 1,
+                                "description": "The exact text to find"
+                            },
+                            "new_text": {
+                                "type": "string",
+                                "description": "The text to replace it with"
+                            },
+                            "replace_all": {
+                                "type": "boolean",
+                                "description": "Replace every occurrence instead of requiring exactly one"
+                            }
+                        },
+                        "required": ["old_text", "new_text"]
+                    },
+                    "description": "Replacements to apply, in order"
+                }
+            },
+            "required": ["path", "edits"]
+        }
+
+    async def execute(self, path: str, edits: list[dict[str, Any]], **kwargs: Any) -> str:
+        return await io_pool.run(self.name, self._multi_edit, path, edits)
+
+    def _multi_edit(self, path: str, edits: list[dict[str, Any]]) -> str:
+        try:
+            file_path = _resolve_path(path, self._allowed_dir)
+            if not file_path.exists():
+                return f"Error: File not found: {path}"
+
+            if not edits:
+                return "Error: no edits given"
+            content = file_path.read_text(encoding="utf-8")
+            for i, edit in enumerate(edits, 1):
+                old_text, new_text = edit["old_text"], edit["new_text"]
+                count = content.count(old_text)
+                if not count:
+                    return f"Error: edit {i}: old_text not found in file. No edits were applied."
+                if count > 1 and not edit.get("replace_all"):
+                    return (
+                        f"Error: edit {i}: old_text appears {count} times. Provide more context or set "
+                        "replace_all. No edits were applied."
+                    )
+                content = content.replace(old_text, new_text)
+
+            atomic_write_text(file_path, content)
+            if self._on_change:
+                self._on_change(file_path)
+            return f"Successfully applied {len(edits)} edits to {path}"
+        except PermissionError as e:
+            return f"Error: {e}"
+        except Exception as e:
+            return f"Error editing file: {str(e)}"
+
+
+class ReadFilesTool(Tool):
+    """
+    Tool to read several files in one call.
+
+    The files are read concurrently on the I/O pool, each as `read_file`
+    would with an equal share of the `max_chars` output cap, so large
+    files come back as slices with continuation notes.
+    """
+
+    MAX_FILES = 20
+
+    def __init__(self, allowed_dir: Path | None = None, max_chars: int = 100_000):
+        self._allowed_dir = allowed_dir
+        self.max_chars = max_chars
+
+    @property
+    def name(self) -> str:
+        return "read_files"
+
+    @property
+    def description(self) -> str:
+        return (
+            f"Read up to {self.MAX_FILES} files in one call. Prefer this over several read_file calls. "
+            "Large files are truncated; use read_file with offset to read the rest."
+        )
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {
+                "paths": {
+                    "type": "array",
+                    "minItems": 1,
+                    "maxItems": self.MAX_FILES,
+                    "items": {"type": "string"},
+                    "description": "The file paths to read"
+                }
+            },
+            "required": ["paths"]
+        }
+
+    async def execute(self, paths: list[str], **kwargs: Any) -> str:
+        if not paths or len(paths) > self.MAX_FILES:
+            return f"Error: give between 1 and {self.MAX_FILES} paths"
+        reader = ReadFileTool(self._allowed_dir, max_chars=max(1000, self.max_chars // len(paths)))
+        contents = await asyncio.gather(*(reader.execute(p) for p in paths))
+        return "\n\n".join(f"==> {p} <==\n{c}" for p, c in zip(paths, contents))
+
+
 class ListDirTool(Tool):
-    """Tool to list directory contents."""
+    """
+    Tool to list directory contents, optionally as a tree or filtered by a glob.
+
+    Walks with `os.scandir` (one syscall batch per directory, types without
+    extra stats) and skips what .gitignore/.ignore/.nanobotignore and the
+    usual VCS/dependency/cache directories exclude. As in git, the ignore
+    files of the enclosing repository (or of `workspace`) apply to a
+    subdirectory listing too. Output stops at `max_entries` entries or
+    `max_chars` characters, whichever comes first, with a note on how to
+    narrow the listing.
+    """
     
-    def __init__(self, allowed_dir: Path | None = None):
+    def __init__(
+        self,
+        allowed_dir: Path | None = None,
+        max_entries: int = 500,
+        max_chars: int = 20_000,
+        workspace: Path | None = None,
+    ):
         self._allowed_dir = allowed_dir
+        workspace = workspace or allowed_dir
+        self._workspace = workspace.resolve() if workspace else None
+        self.max_entries = max_entries
+        self.max_chars = max_chars
 
     @property
     def name(self) -> str:
@@ -173,7 +451,11 @@ class ListDirTool(Tool):
     
     @property
     def description(self) -> str:
-        return "List the contents of a directory."
+        return (
+            "List the contents of a directory. Use depth > 1 to see a tree of subdirectories in one call, "
+            "or pattern (e.g. **/*.py) to find files by name. Ignored files (.gitignore, .git, "
+            "node_modules, caches) are skipped."
+        )
     
     @property
     def parameters(self) -> dict[str, Any]:
@@ -183,12 +465,48 @@ class ListDirTool(Tool):
                 "path": {
                     "type": "string",
                     "description": "The directory path to list"
+                },
+                "depth": {
+                    "type": "integer",
+                    "minimum": 1,
+                    "maximum": 20,
+                    "description": "Levels to descend (default 1; unlimited with a pattern)"
+                },
+                "pattern": {
+                    "type": "string",
+                    "description": "Only list files matching this glob, e.g. *.md or src/**/test_*.py"
+                },
+                "sizes": {
+                    "type": "boolean",
+                    "description": "Show file sizes"
+                },
+                "include_ignored": {
+                    "type": "boolean",
+                    "description": "Also list files excluded by ignore rules"
                 }
             },
             "required": ["path"]
         }
     
-    async def execute(self, path: str, **kwargs: Any) -> str:
+    async def execute(
+        self,
+        path: str,
+        depth: int | None = None,
+        pattern: str | None = None,
+        sizes: bool = False,
+        include_ignored: bool = False,
+        **kwargs: Any,
+    ) -> str:
+        return await io_pool.run(self.name, self._list, path, depth, pattern, sizes, include_ignored)
+
+    def _list(
+        self,
+        path: str,
+        depth: int | None = None,
+        pattern: str | None = None,
+        sizes: bool = False,
+        include_ignored: bool = False,
+    ) -> str:
         try:
             dir_path = _resolve_path(path, self._allowed_dir)
             if not dir_path.exists():
@@ -196,14 +514,40 @@ class ListDirTool(Tool):
             if not dir_path.is_dir():
                 return f"Error: Not a directory: {path}"
             
-            items = []
-            for item in sorted(dir_path.iterdir()):
-                prefix = "📁 " if item.is_dir() else "📄 "
-                items.append(f"{prefix}{item.name}")
+            rules = None if include_ignored else IgnoreRules(rules_root(dir_path, self._workspace))
+            if depth is None and not pattern:
+                depth = 1
+            matcher = compile_glob(pattern) if pattern else None
+
+            items: list[str] = []
+            used = 0
+            truncated = False
+            for rel, entry, level in walk(dir_path, rules, max_depth=depth, include_dirs=not matcher):
+                is_dir = entry.is_dir(follow_symlinks=False)
+                if matcher and not matcher.match(rel):
+                    continue
+                indent = "" if matcher else "  " * (level - 1)
+                line = f"{indent}{'📁 ' if is_dir else '📄 '}{rel if matcher else entry.name}"
+                if sizes and not is_dir:
+                    try:
+                        line += f" ({format_size(entry.stat(follow_symlinks=False).st_size)})"
+                    except OSError:
+                        pass
+                if len(items) >= self.max_entries or used + len(line) > self.max_chars:
+                    truncated = True
+                    break
+                items.append(line)
+                used += len(line) + 1
             
             if not items:
+                if matcher:
+                    return f"No files matching {pattern} in {path}"
                 return f"Directory {path} is empty"
-            
+            if truncated:
+                items.append(
+                    f"\n[Listing truncated after {len(items)} entries. "
+                    "Use a smaller depth, a pattern, or a subdirectory path.]"
+                )
             return "\n".join(items)
         except PermissionError as e:
             return f"Error: {e}"
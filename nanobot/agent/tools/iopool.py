@@ -0,0 +1,81 @@
+"""Bounded thread pool that keeps blocking filesystem calls off the event loop."""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from nanobot.utils.metrics import metrics
+
+T = TypeVar("T")
+
+
+class IOPool:
+    """
+    Runs blocking tool I/O on a fixed number of worker threads.
+
+    A slow mount or a huge file then ties up one worker instead of the
+    event loop that serves every channel and turn. Calls beyond
+    `max_workers` queue up in the pool.
+
+    Metrics per tool: tool.io.<name>.wait_s (time queued for a worker),
+    tool.io.<name>.run_s (time spent in the worker), tool.io.<name>.calls.
+    """
+
+    def __init__(self, max_workers: int = 8):
+        self.max_workers = max_workers
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._active = 0
+
+    def configure(self, max_workers: int) -> None:
+        """Resize the pool; takes effect for calls made after the current workers drain."""
+        with self._lock:
+            if max_workers == self.max_workers:
+                return
+            self.max_workers = max_workers
+            old, self._executor = self._executor, None
+        if old:
+            old.shutdown(wait=False)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=max(1, self.max_workers), thread_name_prefix="nanobot-io"
+                )
+            return self._executor
+
+    async def run(self, name: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Call `fn(*args, **kwargs)` on a worker thread and record its latency under `name`."""
+        queued = time.perf_counter()
+
+        def call() -> T:
+            started = time.perf_counter()
+            metrics.observe(f"tool.io.{name}.wait_s", started - queued)
+            with self._lock:
+                self._active += 1
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._active -= 1
+                metrics.observe(f"tool.io.{name}.run_s", time.perf_counter() - started)
+
+        metrics.incr(f"tool.io.{name}.calls")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), call)
+
+    def status(self) -> dict[str, Any]:
+        with self._lock:
+            return {"max_workers": self.max_workers, "active": self._active}
+
+    def shutdown(self) -> None:
+        with self._lock:
+            old, self._executor = self._executor, None
+        if old:
+            old.shutdown(wait=False)
+
+
+io_pool = IOPool()
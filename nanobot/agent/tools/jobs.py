@@ -0,0 +1,264 @@
+"""Background exec jobs and the `jobs` tool to check on them."""
+
+import asyncio
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
+from loguru import logger
+
+from nanobot.agent.tools.base import Tool
+from nanobot.agent.tools.shell import OutputBuffer, _pump, kill_process_group
+from nanobot.bus.events import InboundMessage
+from nanobot.providers.context import current_call
+
+KILLED_ON_REQUEST = "killed on request"
+KILLED_ON_SHUTDOWN = "shutdown"
+
+
+@dataclass
+class Job:
+    """One background command; stdout and stderr share a single bounded buffer."""
+    id: str
+    command: str
+    cwd: str
+    session_key: str
+    origin: tuple[str, str]  # (channel, chat_id) to notify, or ("", "")
+    notify: bool
+    output: OutputBuffer
+    process: asyncio.subprocess.Process | None = None
+    started: float = field(default_factory=time.monotonic)
+    finished: float | None = None
+    returncode: int | None = None
+    killed: str | None = None  # Why it was killed, if it was
+    task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self.finished is None
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.monotonic()) - self.started
+
+    def state(self) -> str:
+        if self.running:
+            return "running"
+        if self.killed:
+            return f"killed ({self.killed})"
+        return f"exited with code {self.returncode}"
+
+    def summary(self) -> str:
+        short = self.command if len(self.command) <= 60 else self.command[:57] + "..."
+        return f"[{self.id}] {self.state()} after {self.elapsed:.0f}s: {short}"
+
+
+class JobManager:
+    """
+    Runs exec commands in the background and tracks them per chat session.
+
+    Each job has its own process group and a `max_output`-byte head+tail
+    buffer for its combined output. Jobs still running after `timeout_s`
+    are killed. At most `max_running` jobs run at once, and only the
+    latest `keep_finished` finished jobs are kept for inspection. With a
+    `notify` callback (e.g. `bus.publish_inbound`), a finished job posts a
+    system message to its chat, the way subagents report back.
+    """
+
+    def __init__(
+        self,
+        max_output: int = 10_000,
+        timeout_s: float = 3600,
+        max_running: int = 8,
+        keep_finished: int = 32,
+        notify: Callable[[InboundMessage], Awaitable[None]] | None = None,
+    ):
+        self.max_output = max_output
+        self.timeout_s = timeout_s
+        self.max_running = max_running
+        self.keep_finished = keep_finished
+        self._notify = notify
+        self._jobs: dict[str, Job] = {}
+
+    async def start(self, command: str, cwd: str, notify: bool = True) -> Job:
+        """
+        Start `command` in the background.
+
+        Raises:
+            RuntimeError: `max_running` jobs are already running.
+        """
+        if sum(j.running for j in self._jobs.values()) >= self.max_running:
+            raise RuntimeError(f"{self.max_running} background jobs are already running")
+        ctx = current_call()
+        channel, chat_id = ctx.channel or "", ctx.chat_id or ""
+        if channel == "system" and ":" in chat_id:
+            channel, chat_id = chat_id.split(":", 1)
+        job = Job(
+            id=str(uuid.uuid4())[:8],
+            command=command,
+            cwd=cwd,
+            session_key=ctx.session_key or "default",
+            origin=(channel, chat_id),
+            notify=notify and self._notify is not None and bool(channel and chat_id),
+            output=OutputBuffer(self.max_output),
+        )
+        job.process = await asyncio.create_subprocess_shell(
+            command,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+            cwd=cwd,
+            start_new_session=os.name != "nt",
+        )
+        self._jobs[job.id] = job
+        job.task = asyncio.create_task(self._watch(job))
+        self._prune()
+        return job
+
+    async def _watch(self, job: Job) -> None:
+        assert job.process
+        try:
+            async with asyncio.timeout(self.timeout_s):
+                await asyncio.gather(_pump(job.process.stdout, job.output), job.process.wait())
+        except asyncio.TimeoutError:
+            job.killed = f"timed out after {self.timeout_s:.0f}s"
+        except asyncio.CancelledError:
+            job.killed = job.killed or KILLED_ON_SHUTDOWN
+            job.returncode = job.process.returncode
+            job.finished = time.monotonic()
+            raise
+        finally:
+            kill_process_group(job.process)
+        await job.process.wait()
+        job.returncode = job.process.returncode
+        job.finished = time.monotonic()
+        logger.debug(f"Background job {job.summary()}")
+        # Killed jobs were stopped by the model or by shutdown: nothing to report
+        if job.notify and self._notify and job.killed not in (KILLED_ON_REQUEST, KILLED_ON_SHUTDOWN):
+            await self._announce(job)
+
+    async def _announce(self, job: Job) -> None:
+        channel, chat_id = job.origin
+        content = f"""[Background job {job.id} {job.state()}]
+
+Command: {job.command}
+
+Output (last lines):
+{tail_lines(job.output, 20) or "(no output)"}
+
+Tell the user briefly how it went (1-2 sentences)."""
+        try:
+            await self._notify(InboundMessage(
+                channel="system",
+                sender_id="exec_job",
+                chat_id=f"{channel}:{chat_id}",
+                content=content,
+                # The follow-up turn belongs to the job's chat, so it can tail it
+                metadata={"session_key": job.session_key},
+            ))
+        except Exception as e:
+            logger.warning(f"Background job {job.id} notification failed: {e}")
+
+    def _prune(self) -> None:
+        finished = [j for j in self._jobs.values() if not j.running]
+        for job in finished[:max(0, len(finished) - self.keep_finished)]:
+            del self._jobs[job.id]
+
+    def get(self, job_id: str, session_key: str | None = None) -> Job | None:
+        """The job with this id, if it belongs to `session_key` (when given)."""
+        job = self._jobs.get(job_id)
+        if job and session_key is not None and job.session_key != session_key:
+            return None
+        return job
+
+    def list_jobs(self, session_key: str | None = None) -> list[Job]:
+        return [j for j in self._jobs.values() if session_key is None or j.session_key == session_key]
+
+    async def kill(self, job: Job) -> None:
+        if job.running and job.process and job.task:
+            job.killed = KILLED_ON_REQUEST
+            kill_process_group(job.process)
+            await asyncio.shield(job.task)
+
+    def kill_all(self) -> None:
+        """Kill every running job's process group (on shutdown, from `AgentLoop.stop`)."""
+        for job in self._jobs.values():
+            if job.running and job.process:
+                job.killed = job.killed or KILLED_ON_SHUTDOWN
+                kill_process_group(job.process)
+
+
+def tail_lines(buf: OutputBuffer, lines: int) -> str:
+    """The last `lines` lines kept in `buf`."""
+    kept = buf.tail if buf.omitted else buf.head + buf.tail
+    text = bytes(kept).decode("utf-8", errors="replace").rstrip("\n").splitlines()
+    if buf.omitted:
+        text = text[1:]  # Probably cut mid-line
+    return "\n".join(text[-lines:])
+
+
+class JobsTool(Tool):
+    """Tool to check on, tail and kill background exec jobs of the current session."""
+
+    def __init__(self, manager: JobManager):
+        self._manager = manager
+
+    @property
+    def name(self) -> str:
+        return "jobs"
+
+    @property
+    def description(self) -> str:
+        return (
+            "Manage background commands started with exec(background=true). "
+            "action=list shows this chat's jobs; status, tail (recent output) and kill take a job_id."
+        )
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {
+                "action": {
+                    "type": "string",
+                    "enum": ["list", "status", "tail", "kill"],
+                    "description": "What to do"
+                },
+                "job_id": {
+                    "type": "string",
+                    "description": "Job id returned by exec (not needed for list)"
+                },
+                "lines": {
+                    "type": "integer",
+                    "minimum": 1,
+                    "maximum": 500,
+                    "description": "Lines of output to show for tail (default 50)"
+                }
+            },
+            "required": ["action"]
+        }
+
+    async def execute(self, action: str, job_id: str | None = None, lines: int = 50, **kwargs: Any) -> str:
+        session_key = current_call().session_key or "default"
+        if action == "list":
+            jobs = self._manager.list_jobs(session_key)
+            return "\n".join(j.summary() for j in jobs) if jobs else "No background jobs."
+        if not job_id:
+            return f"Error: job_id is required for {action}"
+        job = self._manager.get(job_id, session_key)
+        if job is None:
+            return f"Error: No background job {job_id}"
+        if action == "status":
+            return f"{job.summary()}\nOutput: {job.output.total:,} bytes\nLast line: {job.output.last_line()}"
+        if action == "tail":
+            omitted = job.output.omitted
+            note = f"(earlier output omitted; {job.output.total:,} bytes in total)\n" if omitted else ""
+            return f"{job.summary()}\n\n{note}{tail_lines(job.output, lines) or '(no output yet)'}"
+        if action == "kill":
+            if not job.running:
+                return f"Job already finished: {job.summary()}"
+            await self._manager.kill(job)
+            return f"Killed: {job.summary()}"
+        return f"Error: Unknown action {action}"
@@ -0,0 +1,327 @@
+"""Unified diff parsing and the `apply_patch` tool."""
+
+import os
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable
+
+from nanobot.agent.tools.base import Tool
+from nanobot.agent.tools.filesystem import _resolve_path
+from nanobot.agent.tools.iopool import io_pool
+from nanobot.utils.helpers import atomic_write_text
+
+_HUNK = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+class PatchError(Exception):
+    """The patch is malformed or does not apply."""
+
+
+@dataclass
+class Hunk:
+    old_start: int  # 1-based, as in the header
+    old: list[str] = field(default_factory=list)  # Context and removed lines
+    new: list[str] = field(default_factory=list)  # Context and added lines
+    # From "\ No newline at end of file": whether the new text ends with a
+    # newline (None when the hunk does not say)
+    eof_newline: bool | None = None
+
+    def no_newline(self, tag: str) -> None:
+        """Record a "\\ No newline at end of file" marker after a line tagged `tag`."""
+        if tag == "-":
+            # Only the old side lacked it, unless a "+" marker follows
+            if self.eof_newline is None:
+                self.eof_newline = True
+        elif tag in ("+", " "):
+            self.eof_newline = False
+
+
+@dataclass
+class FilePatch:
+    old_path: str | None  # None for a new file
+    new_path: str | None  # None for a deleted file
+    hunks: list[Hunk] = field(default_factory=list)
+
+    @property
+    def path(self) -> str:
+        return self.new_path or self.old_path or ""
+
+    @property
+    def renamed(self) -> bool:
+        return bool(self.old_path and self.new_path and self.old_path != self.new_path)
+
+
+def _strip_prefix(name: str) -> str | None:
+    name = name.split("\t", 1)[0].strip()
+    if name == "/dev/null":
+        return None
+    if name.startswith(("a/", "b/")):
+        name = name[2:]
+    return name
+
+
+def parse_patch(text: str) -> list[FilePatch]:
+    """
+    Parse a unified diff (as from `diff -u` or `git diff`) into per-file hunks.
+
+    Renames come from differing ---/+++ names or git's "rename from/to"
+    lines (a pure rename has no hunks).
+
+    Raises:
+        PatchError: No file headers, a hunk without a file, or a git copy.
+    """
+    files: list[FilePatch] = []
+    # Drop CRs so a diff taken from a CRLF file still matches its lines
+    lines = [line.removesuffix("\r") for line in _split_lines(text)]
+    rename: dict[str, str] = {}  # "from"/"to" of the current `diff --git` section
+    i = 0
+
+    def flush_rename() -> None:
+        # A rename without content changes has no ---/+++ headers
+        if "from" in rename and "to" in rename:
+            files.append(FilePatch(rename["from"], rename["to"]))
+        rename.clear()
+
+    while i < len(lines):
+        line = lines[i]
+        if line.startswith("diff --git "):
+            flush_rename()
+        elif line.startswith(("rename from ", "rename to ")):
+            rename[line.split(" ", 2)[1]] = line.split(" ", 2)[2].strip()
+        elif line.startswith(("copy from ", "copy to ")):
+            raise PatchError(f"file copies are not supported: {line[:80]!r}")
+        elif line.startswith("--- ") and i + 1 < len(lines) and lines[i + 1].startswith("+++ "):
+            rename.clear()
+            files.append(FilePatch(_strip_prefix(line[4:]), _strip_prefix(lines[i + 1][4:])))
+            i += 2
+            continue
+        m = _HUNK.match(line)
+        if m:
+            if not files:
+                raise PatchError("hunk before any ---/+++ file header")
+            hunk = Hunk(old_start=int(m.group(1)))
+            old_left = int(m.group(2) or 1)
+            new_left = int(m.group(4) or 1)
+            tag = " "
+            i += 1
+            # Also take a "\ No newline at end of file" right after the last line
+            while i < len(lines) and (old_left > 0 or new_left > 0 or lines[i].startswith("\\")):
+                body = lines[i]
+                if body.startswith("\\"):
+                    hunk.no_newline(tag)
+                    i += 1
+                    continue
+                tag, rest = (body[:1], body[1:]) if body else (" ", "")
+                if tag == " ":
+                    hunk.old.append(rest)
+                    hunk.new.append(rest)
+                    old_left -= 1
+                    new_left -= 1
+                elif tag == "-":
+                    hunk.old.append(rest)
+                    old_left -= 1
+                elif tag == "+":
+                    hunk.new.append(rest)
+                    new_left -= 1
+                else:
+                    raise PatchError(f"unexpected line in hunk: {body[:80]!r}")
+                i += 1
+            files[-1].hunks.append(hunk)
+            continue
+        i += 1
+    flush_rename()
+    if not files:
+        raise PatchError("no ---/+++ file headers found")
+    return files
+
+
+def apply_hunks(content: str, hunks: list[Hunk], name: str) -> str:
+    """
+    Apply hunks to `content`, locating each by its context nearest its stated line.
+
+    Raises:
+        PatchError: A hunk's context/removed lines are not in the file.
+    """
+    ends_with_newline = content.endswith("\n") or not content
+    crlf = "\n" in content and content.count("\r\n") == content.count("\n")
+    newline = "\r\n" if crlf else "\n"
+    lines = _split_lines(content, newline)
+    offset = 0  # Shift from earlier hunks' added/removed lines
+    for n, hunk in enumerate(hunks, 1):
+        # A pure insertion's old start is the line it goes after
+        start = hunk.old_start if not hunk.old else hunk.old_start - 1
+        expected = max(0, start + offset)
+        at = _find(lines, hunk.old, expected)
+        if at is None:
+            raise PatchError(f"{name}: hunk {n} (line {hunk.old_start}) does not match the file")
+        lines[at:at + len(hunk.old)] = hunk.new
+        offset += len(hunk.new) - len(hunk.old)
+        if hunk.eof_newline is not None and at + len(hunk.new) == len(lines):
+            ends_with_newline = hunk.eof_newline
+    text = newline.join(lines)
+    return text + newline if lines and ends_with_newline else text
+
+
+def _split_lines(text: str, newline: str = "\n") -> list[str]:
+    """
+    Lines of `text` without their `newline`, split on that alone.
+
+    Unlike `str.splitlines`, form feeds, NEL, U+2028 and the like stay
+    inside their line instead of being rewritten as line breaks.
+    """
+    if not text:
+        return []
+    lines = text.split(newline)
+    if lines[-1] == "":
+        lines.pop()
+    return lines
+
+
+def _find(lines: list[str], block: list[str], expected: int) -> int | None:
+    if not block:
+        return min(expected, len(lines))
+    # Search outward from the expected position so the closest match wins
+    for delta in range(max(expected, len(lines) - expected) + 1):
+        for at in (expected - delta, expected + delta) if delta else (expected,):
+            if 0 <= at <= len(lines) - len(block) and lines[at:at + len(block)] == block:
+                return at
+    return None
+
+
+class ApplyPatchTool(Tool):
+    """
+    Tool to apply a unified diff to one or more files atomically.
+
+    Every file's new content is computed in memory first; if any hunk does
+    not apply, nothing is touched. Files are then written one by one via
+    temp file + rename, and already-written files are restored if a later
+    write fails. Relative paths in the patch are taken from `base_dir`.
+    """
+
+    def __init__(
+        self,
+        base_dir: Path,
+        allowed_dir: Path | None = None,
+        on_change: Callable[[Path], None] | None = None,
+    ):
+        self.base_dir = base_dir
+        self._allowed_dir = allowed_dir
+        self._on_change = on_change
+
+    @property
+    def name(self) -> str:
+        return "apply_patch"
+
+    @property
+    def description(self) -> str:
+        return (
+            "Apply a unified diff (diff -u / git diff format) that may change, create, delete or rename several "
+            f"files. Relative paths are resolved from {self.base_dir}. All-or-nothing: if any hunk "
+            "does not apply, no file is changed."
+        )
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {
+                "patch": {
+                    "type": "string",
+                    "minLength": 1,
+                    "description": "The unified diff text, with ---/+++ headers and @@ hunks"
+                }
+            },
+            "required": ["patch"]
+        }
+
+    async def execute(self, patch: str, **kwargs: Any) -> str:
+        return await io_pool.run(self.name, self._apply, patch)
+
+    def _resolve(self, name: str) -> Path:
+        path = Path(name).expanduser()
+        return _resolve_path(str(path if path.is_absolute() else self.base_dir / path), self._allowed_dir)
+
+    @staticmethod
+    def _current(target: Path, staged: dict[Path, tuple[str | None, str | None]]) -> tuple[str | None, str | None]:
+        """(content before the patch, content after the files staged so far), None where missing."""
+        if target in staged:
+            return staged[target]
+        original = None
+        if target.exists():
+            # newline="": keep CRLF and lone CR as they are
+            with open(target, encoding="utf-8", newline="") as f:
+                original = f.read()
+        return original, original
+
+    def _stage_rename(self, fp: FilePatch, staged: dict[Path, tuple[str | None, str | None]]) -> str:
+        assert fp.old_path and fp.new_path
+        source, target = self._resolve(fp.old_path), self._resolve(fp.new_path)
+        source_original, content = self._current(source, staged)
+        target_original, existing = self._current(target, staged)
+        if content is None:
+            raise PatchError(f"{fp.old_path}: file not found")
+        if existing is not None:
+            raise PatchError(f"{fp.new_path}: file already exists")
+        new = apply_hunks(content, fp.hunks, fp.new_path) if fp.hunks else content
+        staged[source] = (source_original, None)
+        staged[target] = (target_original, new)
+        changes = f" ({len(fp.hunks)} hunks)" if fp.hunks else ""
+        return f"renamed {fp.old_path} -> {fp.new_path}{changes}"
+
+    def _apply(self, patch: str) -> str:
+        try:
+            # Stage: path -> (original content or None, new content or None)
+            staged: dict[Path, tuple[str | None, str | None]] = {}
+            summary = []
+            for fp in parse_patch(patch):
+                if fp.renamed:
+                    summary.append(self._stage_rename(fp, staged))
+                    continue
+                target = self._resolve(fp.path)
+                original, current = self._current(target, staged)
+                if fp.old_path is None:
+                    if current is not None:
+                        raise PatchError(f"{fp.path}: file already exists")
+                    new = apply_hunks("", fp.hunks, fp.path)
+                    summary.append(f"created {fp.path}")
+                elif current is None:
+                    raise PatchError(f"{fp.path}: file not found")
+                elif fp.new_path is None:
+                    new = None
+                    summary.append(f"deleted {fp.path}")
+                else:
+                    new = apply_hunks(current, fp.hunks, fp.path)
+                    summary.append(f"patched {fp.path} ({len(fp.hunks)} hunks)")
+                staged[target] = (original, new)
+        except PatchError as e:
+            return f"Error: {e}. No files were changed."
+        except PermissionError as e:
+            return f"Error: {e}"
+        except Exception as e:
+            return f"Error applying patch: {str(e)}"
+
+        written: list[tuple[Path, str | None]] = []
+        try:
+            for target, (original, new) in staged.items():
+                if new is None:
+                    target.unlink()
+                else:
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    atomic_write_text(target, new)
+                written.append((target, original))
+        except Exception as e:
+            for target, original in reversed(written):
+                try:
+                    if original is None:
+                        os.unlink(target)
+                    else:
+                        atomic_write_text(target, original)
+                except OSError:
+                    pass
+            return f"Error applying patch: {str(e)}. Changes were rolled back."
+
+        if self._on_change:
+            for target in staged:
+                self._on_change(target)
+        return "Successfully applied patch: " + "; ".join(summary)
@@ -1,10 +1,20 @@
 """Tool registry for dynamic tool management."""
 
+import json
+from functools import cached_property
 from typing import Any
 
 from nanobot.agent.tools.base import Tool
 
 
+class ToolDefinitions(list):
+    """Tool schemas in OpenAI format, with their JSON serialization computed once."""
+
+    @cached_property
+    def serialized(self) -> str:
+        return json.dumps(self, ensure_ascii=False, default=str)
+
+
 class ToolRegistry:
     """
     Registry for agent tools.
@@ -17,6 +27,7 @@ class ToolRegistry:
     # 好处：易于添加新工具，支持工具的统一验证和错误处理，提高系统可维护性
     def __init__(self):
         self._tools: dict[str, Tool] = {}
+        self._definitions: ToolDefinitions | None = None
         # 初始化工具注册表
         # 作用：创建空的工具字典，准备接收工具注册
         # 设计目的：提供轻量级启动，支持按需添加工具
@@ -29,6 +40,7 @@ class ToolRegistry:
         # 设计目的：支持集中式工具管理，便于工具查找和访问控制
         # 好处：确保工具的唯一性，支持工具状态管理，便于权限控制
         self._tools[tool.name] = tool
+        self._definitions = None
     
     def unregister(self, name: str) -> None:
         """Unregister a tool by name."""
@@ -37,6 +49,7 @@ class ToolRegistry:
         # 设计目的：支持动态工具管理，便于运行时调整可用工具集
         # 好处：提高系统灵活性，支持安全策略调整，便于资源回收
         self._tools.pop(name, None)
+        self._definitions = None
     
     def get(self, name: str) -> Tool | None:
         """Get a tool by name."""
@@ -54,13 +67,15 @@ class ToolRegistry:
         # 好处：提高代码安全性，便于错误预防，支持优雅降级
         return name in self._tools
     
-    def get_definitions(self) -> list[dict[str, Any]]:
-        """Get all tool definitions in OpenAI format."""
+    def get_definitions(self) -> ToolDefinitions:
+        """Get all tool definitions in OpenAI format (cached until tools change)."""
         # 获取所有工具定义（OpenAI格式）
         # 作用：生成符合OpenAI工具调用API的工具定义列表
         # 设计目的：标准化工具接口，支持与不同LLM提供商兼容
         # 好处：简化工具调用逻辑，提高系统互操作性，便于集成
-        return [tool.to_schema() for tool in self._tools.values()]
+        if self._definitions is None:
+            self._definitions = ToolDefinitions(tool.to_schema() for tool in self._tools.values())
+        return self._definitions
     
     async def execute(self, name: str, params: dict[str, Any]) -> str:
         """
@@ -0,0 +1,419 @@
+"""Indexed workspace search: a persistent trigram index plus the `search` tool."""
+
+import fnmatch
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterator
+
+from loguru import logger
+
+from nanobot.agent.tools.base import Tool
+from nanobot.agent.tools.fileread import SNIFF, is_binary
+from nanobot.agent.tools.iopool import io_pool
+from nanobot.utils.helpers import ensure_dir
+from nanobot.utils.ignore import IgnoreRules, walk
+from nanobot.utils.metrics import metrics
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    indexed INTEGER NOT NULL DEFAULT 0
+);
+"""
+# Contents with an FTS5 trigram index: LIKE/GLOB substring filters on it are
+# answered from the index; detail=none keeps it small (no positions needed)
+_FTS_SCHEMA = "CREATE VIRTUAL TABLE IF NOT EXISTS docs USING fts5(body, tokenize='trigram', detail='none')"
+# Regex syntax that makes the literal around it optional or alternative
+_UNSAFE_REGEX = re.compile(r"(?<!\\)[|?*{]")
+_REGEX_SPLIT = re.compile(r"\\.|\[[^\]]*\]|[.^$+()]")
+# Fragments the index can filter on. LIKE folds ASCII case only and treats
+# % and _ as wildcards (an ESCAPE clause disables the index); GLOB is exact
+_LIKE_PARTS = re.compile(r"[^%_\x80-\U0010ffff]{3,}")
+_GLOB_PARTS = re.compile(r"[^*?\[\]]{3,}")
+
+
+def required_literals(query: str, regex: bool) -> list[str]:
+    """Substrings every match must contain (empty when no prefilter is possible)."""
+    if not regex:
+        return [query]
+    if _UNSAFE_REGEX.search(query):
+        return []
+    return [part for part in _REGEX_SPLIT.split(query) if len(part) >= 3]
+
+
+@dataclass
+class FileHits:
+    """Matching lines of one file."""
+    path: str
+    lines: list[tuple[int, str]] = field(default_factory=list)
+    count: int = 0
+    score: float = 0.0
+
+
+class WorkspaceIndex:
+    """
+    Trigram index of the text files in a workspace, kept in SQLite.
+
+    File contents go into an FTS5 table with the trigram tokenizer, so the
+    literal parts of a query select candidate files straight from the
+    index; only those are matched line by line. The index lives on disk,
+    so a restart only reindexes files whose mtime or size changed. Without
+    FTS5 in the local SQLite build, files are tracked the same way but
+    every search reads them all from disk.
+
+    `refresh()` brings it up to date with an mtime scan of the workspace,
+    honouring .gitignore/.ignore/.nanobotignore; scans run at most every
+    `rescan_interval_s`. Paths passed to `mark_dirty()` (the write and
+    edit tools report theirs) are reindexed on the next refresh regardless.
+    Files over `max_file_bytes` and binary files are not indexed.
+
+    Metrics: search.index.files_indexed, search.index.scan_s, search.query_s.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        db_path: Path,
+        max_file_bytes: int = 1 << 20,
+        rescan_interval_s: float = 2.0,
+    ):
+        self.root = root.resolve()
+        self.db_path = db_path
+        self.max_file_bytes = max_file_bytes
+        self.rescan_interval_s = rescan_interval_s
+        self._db: sqlite3.Connection | None = None
+        self._fts = True
+        self._lock = threading.RLock()
+        self._last_scan: float | None = None
+        self._dirty: set[str] = set()
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            ensure_dir(self.db_path.parent)
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.executescript(_SCHEMA)
+            try:
+                self._db.execute(_FTS_SCHEMA)
+            except sqlite3.OperationalError as e:
+                logger.warning(f"SQLite FTS5 trigram index unavailable ({e}); search will scan files")
+                self._fts = False
+        return self._db
+
+    def mark_dirty(self, path: Path | str) -> None:
+        """Have `path` reindexed on the next refresh."""
+        try:
+            rel = Path(path).resolve().relative_to(self.root).as_posix()
+        except ValueError:
+            return
+        with self._lock:
+            self._dirty.add(rel)
+
+    def refresh(self, force: bool = False) -> int:
+        """Reindex changed files; returns how many files were (re)indexed or dropped."""
+        with self._lock:
+            db = self._conn()
+            if force or self._last_scan is None or time.monotonic() - self._last_scan >= self.rescan_interval_s:
+                changed = self._scan(db)
+                self._last_scan = time.monotonic()
+            else:
+                changed = 0
+                for rel in self._dirty:
+                    changed += self._update(db, rel)
+            self._dirty.clear()
+            db.commit()
+            return changed
+
+    def _scan(self, db: sqlite3.Connection) -> int:
+        start = time.perf_counter()
+        known = {path: (fid, mtime, size) for fid, path, mtime, size in db.execute(
+            "SELECT id, path, mtime_ns, size FROM files"
+        )}
+        changed = 0
+        for rel, entry, _ in walk(self.root, IgnoreRules(self.root)):
+            try:
+                st = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            old = known.pop(rel, None)
+            if old and old[1] == st.st_mtime_ns and old[2] == st.st_size:
+                continue
+            changed += self._index(db, rel, st.st_mtime_ns, st.st_size, old[0] if old else None)
+        for fid, _, _ in known.values():
+            self._drop(db, fid)
+            changed += 1
+        metrics.observe("search.index.scan_s", time.perf_counter() - start)
+        if changed:
+            logger.debug(f"Search index: {changed} files updated under {self.root}")
+        return changed
+
+    def _update(self, db: sqlite3.Connection, rel: str) -> int:
+        row = db.execute("SELECT id FROM files WHERE path = ?", (rel,)).fetchone()
+        try:
+            st = (self.root / rel).stat()
+        except OSError:
+            if row:
+                self._drop(db, row[0])
+                return 1
+            return 0
+        rules = IgnoreRules(self.root)
+        parts = rel.split("/")
+        for i in range(len(parts)):
+            rules.load_dir("/".join(parts[:i]))
+            if rules.ignored("/".join(parts[:i + 1]), is_dir=i < len(parts) - 1):
+                return 0
+        return self._index(db, rel, st.st_mtime_ns, st.st_size, row[0] if row else None)
+
+    def _index(self, db: sqlite3.Connection, rel: str, mtime_ns: int, size: int, fid: int | None) -> int:
+        # Oversized, binary and unreadable files stay listed as not indexed,
+        # so unchanged ones are not re-read on every scan
+        data = None
+        if size <= self.max_file_bytes:
+            try:
+                data = (self.root / rel).read_bytes()
+            except OSError:
+                pass
+        indexed = data is not None and not is_binary(data[:SNIFF])
+        if fid is not None:
+            db.execute(
+                "UPDATE files SET mtime_ns = ?, size = ?, indexed = ? WHERE id = ?", (mtime_ns, size, indexed, fid)
+            )
+            if self._fts:
+                db.execute("DELETE FROM docs WHERE rowid = ?", (fid,))
+        else:
+            fid = db.execute(
+                "INSERT INTO files (path, mtime_ns, size, indexed) VALUES (?, ?, ?, ?)", (rel, mtime_ns, size, indexed)
+            ).lastrowid
+        if indexed and self._fts:
+            db.execute(
+                "INSERT INTO docs (rowid, body) VALUES (?, ?)", (fid, data.decode("utf-8", errors="replace"))
+            )
+        metrics.incr("search.index.files_indexed")
+        return 1
+
+    def _drop(self, db: sqlite3.Connection, fid: int) -> None:
+        if self._fts:
+            db.execute("DELETE FROM docs WHERE rowid = ?", (fid,))
+        db.execute("DELETE FROM files WHERE id = ?", (fid,))
+
+    def candidates(self, literals: list[str], case_sensitive: bool = False) -> list[tuple[str, str]]:
+        """(path, text) of indexed files containing every literal (as far as the index can tell)."""
+        with self._lock:
+            db = self._conn()
+            if not self._fts:
+                paths = [p for (p,) in db.execute("SELECT path FROM files WHERE indexed ORDER BY path")]
+            else:
+                if case_sensitive:
+                    op, parts = "GLOB", [f"*{p}*" for lit in literals for p in _GLOB_PARTS.findall(lit)]
+                else:
+                    op, parts = "LIKE", [f"%{p}%" for lit in literals for p in _LIKE_PARTS.findall(lit)]
+                where = " AND ".join(f"d.body {op} ?" for _ in parts) or "1"
+                return db.execute(
+                    f"SELECT f.path, d.body FROM docs d JOIN files f ON f.id = d.rowid WHERE {where}", parts
+                ).fetchall()
+        out = []
+        for rel in paths:
+            try:
+                out.append((rel, (self.root / rel).read_text(encoding="utf-8", errors="replace")))
+            except OSError:
+                continue
+        return out
+
+    def search(
+        self,
+        query: str,
+        regex: bool = False,
+        case_sensitive: bool = False,
+        path: str = "",
+        glob: str = "",
+        max_per_file: int = 20,
+    ) -> list[FileHits]:
+        """
+        Matching lines per file, best-ranked file first.
+
+        Files rank by number of matching lines, plus a bonus for whole-word
+        matches and for the query appearing in the file name.
+
+        Raises:
+            re.error: `query` is not a valid regular expression.
+        """
+        start = time.perf_counter()
+        flags = re.MULTILINE | (0 if case_sensitive else re.IGNORECASE)
+        pattern = re.compile(query if regex else re.escape(query), flags)
+        word = re.compile(rf"\b(?:{pattern.pattern})\b", flags)
+        self.refresh()
+        prefix = path.strip("/")
+        results = []
+        for rel, text in self.candidates(required_literals(query, regex), case_sensitive):
+            if prefix and rel != prefix and not rel.startswith(prefix + "/"):
+                continue
+            if glob and not (fnmatch.fnmatch(rel, glob) or fnmatch.fnmatch(rel.rsplit("/", 1)[-1], glob)):
+                continue
+            starts = self._starts(text, query, pattern, regex, case_sensitive)
+            hits = self._match(rel, text, starts, pattern, word, max_per_file)
+            if hits:
+                results.append(hits)
+        results.sort(key=lambda h: (-h.score, len(h.path), h.path))
+        metrics.observe("search.query_s", time.perf_counter() - start)
+        return results
+
+    @staticmethod
+    def _starts(text: str, query: str, pattern: re.Pattern[str], regex: bool, case_sensitive: bool) -> Iterator[int]:
+        """Offsets of matches in `text`."""
+        # str.find is far faster than an IGNORECASE regex; lower() keeps
+        # offsets only for ASCII text
+        if not regex and (case_sensitive or text.isascii()):
+            hay, needle = (text, query) if case_sensitive else (text.lower(), query.lower())
+            i = hay.find(needle)
+            while i >= 0:
+                yield i
+                i = hay.find(needle, i + len(needle))
+        else:
+            for m in pattern.finditer(text):
+                yield m.start()
+
+    @staticmethod
+    def _match(
+        rel: str, text: str, starts: Iterator[int], pattern: re.Pattern[str], word: re.Pattern[str], limit: int
+    ) -> FileHits | None:
+        hits = FileHits(rel)
+        line_no, pos, last = 1, 0, 0
+        for begin in starts:
+            line_no += text.count("\n", pos, begin)
+            pos = begin
+            if line_no == last:
+                continue  # One hit per line
+            last = line_no
+            end = text.find("\n", begin)
+            line = text[text.rfind("\n", 0, begin) + 1:end if end >= 0 else len(text)]
+            hits.count += 1
+            hits.score += 1.5 if word.search(line) else 1.0
+            if len(hits.lines) < limit:
+                hits.lines.append((line_no, line.strip()[:200]))
+        if not hits.count:
+            return None
+        if pattern.search(rel.rsplit("/", 1)[-1]):
+            hits.score += 10
+        return hits
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            db = self._conn()
+            files, indexed = db.execute("SELECT COUNT(*), COALESCE(SUM(indexed), 0) FROM files").fetchone()
+        return {"files": files, "indexed": indexed, "fts": self._fts, "db": str(self.db_path)}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+def default_index_path(workspace: Path) -> Path:
+    """Per-workspace index file under ~/.nanobot/search."""
+    digest = hashlib.sha1(str(workspace.resolve()).encode()).hexdigest()[:12]
+    return Path.home() / ".nanobot" / "search" / f"{digest}.db"
+
+
+class SearchTool(Tool):
+    """Tool to search file contents across the workspace through the trigram index."""
+
+    def __init__(self, workspace: Path, index: WorkspaceIndex | None = None, max_results: int = 50):
+        self.index = index or WorkspaceIndex(workspace, default_index_path(workspace))
+        self.max_results = max_results
+
+    @property
+    def name(self) -> str:
+        return "search"
+
+    @property
+    def description(self) -> str:
+        return (
+            "Search file contents in the workspace (indexed, fast). Returns matching lines with "
+            "line numbers, best-matching files first. Prefer this over grep/find via exec."
+        )
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "minLength": 1,
+                    "description": "Text to find (literal unless regex is true)"
+                },
+                "regex": {
+                    "type": "boolean",
+                    "description": "Treat query as a Python regular expression"
+                },
+                "case_sensitive": {
+                    "type": "boolean",
+                    "description": "Match case exactly (default: ignore case)"
+                },
+                "path": {
+                    "type": "string",
+                    "description": "Only search under this workspace-relative directory or file"
+                },
+                "glob": {
+                    "type": "string",
+                    "description": "Only search files matching this pattern, e.g. *.py"
+                },
+                "max_results": {
+                    "type": "integer",
+                    "minimum": 1,
+                    "maximum": 500,
+                    "description": "Maximum matching lines to return (default 50)"
+                }
+            },
+            "required": ["query"]
+        }
+
+    async def execute(
+        self,
+        query: str,
+        regex: bool = False,
+        case_sensitive: bool = False,
+        path: str = "",
+        glob: str = "",
+        max_results: int | None = None,
+        **kwargs: Any,
+    ) -> str:
+        return await io_pool.run(
+            self.name, self._search, query, regex, case_sensitive, path, glob, max_results or self.max_results
+        )
+
+    def _search(self, query: str, regex: bool, case_sensitive: bool, path: str, glob: str, max_results: int) -> str:
+        try:
+            results = self.index.search(query, regex=regex, case_sensitive=case_sensitive, path=path, glob=glob)
+        except re.error as e:
+            return f"Error: invalid regex: {e}"
+        except Exception as e:
+            return f"Error searching workspace: {str(e)}"
+        if not results:
+            return f"No matches for {query!r}"
+
+        total = sum(h.count for h in results)
+        out, shown = [], 0
+        for hits in results:
+            if shown >= max_results:
+                break
+            lines = hits.lines[:max_results - shown]
+            out.append(hits.path)
+            out.extend(f"  {number}: {line}" for number, line in lines)
+            shown += len(lines)
+            if hits.count > len(lines):
+                out.append(f"  ... {hits.count - len(lines)} more in this file")
+        header = f"{total} matches in {len(results)} files"
+        if shown < total:
+            header += f" (showing {shown}; narrow with path/glob or a more specific query)"
+        return header + ":\n" + "\n".join(out)
@@ -3,14 +3,107 @@
 import asyncio
 import os
 import re
+import shlex
+import signal
+import time
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any, Awaitable, Callable
+
+from loguru import logger
 
 from nanobot.agent.tools.base import Tool
+from nanobot.bus.events import OutboundMessage
+from nanobot.providers.context import current_call
+
+if TYPE_CHECKING:
+    from nanobot.agent.tools.jobs import JobManager
+    from nanobot.agent.tools.shell_session import ShellSessionPool
+
+
+class OutputBuffer:
+    """
+    Bounded capture of a byte stream: keeps the first and last bytes.
+
+    Memory stays at `limit` bytes however much a command prints; the
+    middle is dropped and reported as omitted.
+    """
+
+    def __init__(self, limit: int = 10_000, head_ratio: float = 0.4):
+        self.limit = limit
+        self.head_limit = int(limit * head_ratio)
+        self.tail_limit = limit - self.head_limit
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.total = 0
+
+    def write(self, data: bytes) -> None:
+        self.total += len(data)
+        if len(self.head) < self.head_limit:
+            take = self.head_limit - len(self.head)
+            self.head += data[:take]
+            data = data[take:]
+        if len(data) >= self.tail_limit:
+            self.tail[:] = data[len(data) - self.tail_limit:]
+        elif data:
+            self.tail += data
+            if len(self.tail) > self.tail_limit:
+                del self.tail[:len(self.tail) - self.tail_limit]
+
+    @property
+    def omitted(self) -> int:
+        return self.total - len(self.head) - len(self.tail)
+
+    def last_line(self) -> str:
+        data = self.tail or self.head
+        lines = bytes(data).decode("utf-8", errors="replace").strip().splitlines()
+        return lines[-1][:200] if lines else ""
+
+    def text(self) -> str:
+        if not self.omitted:
+            return bytes(self.head + self.tail).decode("utf-8", errors="replace")
+        head = bytes(self.head).decode("utf-8", errors="replace")
+        tail = bytes(self.tail).decode("utf-8", errors="replace")
+        return f"{head}\n... ({self.omitted:,} bytes omitted) ...\n{tail}"
+
+
+def kill_process_group(process: asyncio.subprocess.Process) -> None:
+    """Kill a process started with start_new_session=True and everything it spawned."""
+    if process.returncode is not None:
+        return
+    try:
+        if os.name == "nt":
+            process.kill()
+        else:
+            os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+async def _pump(stream: asyncio.StreamReader | None, buf: OutputBuffer) -> None:
+    if stream is None:
+        return
+    while chunk := await stream.read(65536):
+        buf.write(chunk)
 
 
 class ExecTool(Tool):
-    """Tool to execute shell commands."""
+    """
+    Tool to execute shell commands.
+
+    Output is streamed into bounded head+tail buffers (`max_output` bytes
+    for stdout, half that for stderr) instead of being collected whole.
+    Each command runs in its own process group, so a timeout or a
+    cancelled turn kills everything it started. With
+    `progress_interval_s` > 0 and a `send_callback`, commands running
+    longer than that post their latest output line to the chat.
+
+    With `sessions`, commands run in one persistent shell per chat session
+    instead of a fresh `sh -c` each, so `cd`, `export` and activated
+    virtualenvs carry over between calls.
+
+    With `jobs`, `background=true` starts the command as a background job
+    and returns its id at once; the `jobs` tool checks on it.
+    """
     
     def __init__(
         self,
@@ -19,6 +112,11 @@ class ExecTool(Tool):
         deny_patterns: list[str] | None = None,
         allow_patterns: list[str] | None = None,
         restrict_to_workspace: bool = False,
+        max_output: int = 10_000,
+        progress_interval_s: float = 0,
+        send_callback: Callable[[OutboundMessage], Awaitable[None]] | None = None,
+        sessions: "ShellSessionPool | None" = None,
+        jobs: "JobManager | None" = None,
     ):
         self.timeout = timeout
         self.working_dir = working_dir
@@ -34,6 +132,11 @@ class ExecTool(Tool):
         ]
         self.allow_patterns = allow_patterns or []
         self.restrict_to_workspace = restrict_to_workspace
+        self.max_output = max_output
+        self.progress_interval_s = progress_interval_s
+        self._send_callback = send_callback
+        self.sessions = sessions
+        self.jobs = jobs
     
     @property
     def name(self) -> str:
@@ -41,11 +144,17 @@ class ExecTool(Tool):
     
     @property
     def description(self) -> str:
-        return "Execute a shell command and return its output. Use with caution."
+        desc = "Execute a shell command and return its output. Use with caution."
+        if self.jobs:
+            desc += (
+                " For long builds, tests or downloads set background=true: it returns a job id at once,"
+                " and the jobs tool shows status/output or kills it."
+            )
+        return desc
     
     @property
     def parameters(self) -> dict[str, Any]:
-        return {
+        params: dict[str, Any] = {
             "type": "object",
             "properties": {
                 "command": {
@@ -59,54 +168,184 @@ class ExecTool(Tool):
             },
             "required": ["command"]
         }
+        if self.jobs:
+            params["properties"]["background"] = {
+                "type": "boolean",
+                "description": "Run as a background job and return its id immediately"
+            }
+            params["properties"]["notify"] = {
+                "type": "boolean",
+                "description": "For background jobs: report back in this chat when it finishes (default true)"
+            }
+        return params
     
-    async def execute(self, command: str, working_dir: str | None = None, **kwargs: Any) -> str:
+    async def execute(
+        self,
+        command: str,
+        working_dir: str | None = None,
+        background: bool = False,
+        notify: bool = True,
+        **kwargs: Any,
+    ) -> str:
+        if background:
+            return await self._start_job(command, working_dir, notify)
+        if self.sessions:
+            return await self._run_in_session(command, working_dir)
         cwd = working_dir or self.working_dir or os.getcwd()
         guard_error = self._guard_command(command, cwd)
         if guard_error:
             return guard_error
-        
+        return await self._run_oneshot(command, cwd)
+
+    async def _run_oneshot(self, command: str, cwd: str) -> str:
         try:
             process = await asyncio.create_subprocess_shell(
                 command,
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE,
                 cwd=cwd,
+                start_new_session=os.name != "nt",
+            )
+        except Exception as e:
+            return f"Error executing command: {str(e)}"
+
+        stdout, stderr = OutputBuffer(self.max_output), OutputBuffer(self.max_output // 2)
+        progress = self._start_progress(command, stdout, stderr)
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(_pump(process.stdout, stdout), _pump(process.stderr, stderr), process.wait()),
+                timeout=self.timeout,
             )
-            
+        except asyncio.TimeoutError:
+            kill_process_group(process)
+            await process.wait()
+            return self._timed_out(stdout, stderr, "process group killed")
+        except Exception as e:
+            return f"Error executing command: {str(e)}"
+        finally:
+            # Also reached when the turn is cancelled: leave nothing running
+            kill_process_group(process)
+            if progress:
+                progress.cancel()
+
+        return self._format(stdout, stderr, process.returncode)
+
+    async def _run_in_session(self, command: str, working_dir: str | None) -> str:
+        """Run in the chat session's persistent shell, so cd/export/venvs carry over."""
+        from nanobot.agent.tools.shell_session import ShellExitedError, inside
+
+        assert self.sessions is not None
+        root = self.working_dir or os.getcwd()
+        key = current_call().session_key or "default"
+        try:
+            session = await self.sessions.acquire(key, root)
+        except Exception as e:
+            return f"Error starting shell: {str(e)}"
+        if session is None:
+            # Every shell is busy: don't queue behind another chat
+            cwd = working_dir or root
+            return self._guard_command(command, root) or await self._run_oneshot(command, cwd)
+        guard_error = self._guard_command(command, root)
+        if guard_error:
+            return guard_error
+        if working_dir:
+            # A persistent cd, like typing it in the shell
+            command = f"cd -- {shlex.quote(working_dir)} && {{\n{command}\n}}"
+
+        async with session.lock:
+            stdout, stderr = OutputBuffer(self.max_output), OutputBuffer(self.max_output // 2)
+            progress = self._start_progress(command, stdout, stderr)
+            returncode = None
             try:
-                stdout, stderr = await asyncio.wait_for(
-                    process.communicate(),
-                    timeout=self.timeout
-                )
+                returncode = await asyncio.wait_for(session.run(command, stdout, stderr), timeout=self.timeout)
             except asyncio.TimeoutError:
-                process.kill()
-                return f"Error: Command timed out after {self.timeout} seconds"
-            
-            output_parts = []
-            
-            if stdout:
-                output_parts.append(stdout.decode("utf-8", errors="replace"))
-            
-            if stderr:
-                stderr_text = stderr.decode("utf-8", errors="replace")
-                if stderr_text.strip():
-                    output_parts.append(f"STDERR:\n{stderr_text}")
-            
-            if process.returncode != 0:
-                output_parts.append(f"\nExit code: {process.returncode}")
-            
-            result = "\n".join(output_parts) if output_parts else "(no output)"
-            
-            # Truncate very long output
-            max_len = 10000
-            if len(result) > max_len:
-                result = result[:max_len] + f"\n... (truncated, {len(result) - max_len} more chars)"
-            
-            return result
-            
+                self.sessions.discard(key)
+                return self._timed_out(stdout, stderr, "shell killed; the next command starts a fresh one")
+            except ShellExitedError:
+                self.sessions.discard(key)
+                return self._format(stdout, stderr, None) + "\n\n(The shell exited; the next command starts a fresh one)"
+            except Exception as e:
+                self.sessions.discard(key)
+                return f"Error executing command: {str(e)}"
+            except BaseException:
+                # Cancelled turn: the shell is mid-command, so it cannot be reused
+                self.sessions.discard(key)
+                raise
+            finally:
+                if progress:
+                    progress.cancel()
+
+            result = self._format(stdout, stderr, returncode)
+            if self.restrict_to_workspace and not inside(session.cwd, root):
+                try:
+                    await asyncio.wait_for(
+                        session.run(f"cd -- {shlex.quote(root)}", OutputBuffer(0), OutputBuffer(0)), timeout=5,
+                    )
+                except BaseException:
+                    self.sessions.discard(key)
+                    raise
+                result += f"\n\n(Working directory reset to {root}: outside the workspace)"
+        return result
+
+    async def _start_job(self, command: str, working_dir: str | None, notify: bool) -> str:
+        if not self.jobs:
+            return "Error: Background jobs are not enabled"
+        cwd = working_dir or self.working_dir or os.getcwd()
+        guard_error = self._guard_command(command, cwd)
+        if guard_error:
+            return guard_error
+        try:
+            job = await self.jobs.start(command, cwd, notify=notify)
         except Exception as e:
-            return f"Error executing command: {str(e)}"
+            return f"Error starting background job: {str(e)}"
+        then = " You will be notified when it finishes." if job.notify else ""
+        return f"Started background job {job.id} (pid {job.process.pid}).{then} Use the jobs tool to check on it."
+
+    def _start_progress(self, command: str, stdout: OutputBuffer, stderr: OutputBuffer) -> asyncio.Task | None:
+        if self.progress_interval_s > 0 and self._send_callback:
+            return asyncio.create_task(self._report_progress(command, stdout, stderr))
+        return None
+
+    def _timed_out(self, stdout: OutputBuffer, stderr: OutputBuffer, action: str) -> str:
+        partial = self._format(stdout, stderr, None)
+        return f"Error: Command timed out after {self.timeout} seconds ({action})" + (
+            f"\n\nOutput so far:\n{partial}" if partial != "(no output)" else ""
+        )
+
+    @staticmethod
+    def _format(stdout: OutputBuffer, stderr: OutputBuffer, returncode: int | None) -> str:
+        output_parts = []
+        if stdout.total:
+            output_parts.append(stdout.text())
+        if stderr.total:
+            stderr_text = stderr.text()
+            if stderr_text.strip():
+                output_parts.append(f"STDERR:\n{stderr_text}")
+        if returncode:
+            output_parts.append(f"\nExit code: {returncode}")
+        return "\n".join(output_parts) if output_parts else "(no output)"
+
+    async def _report_progress(self, command: str, stdout: OutputBuffer, stderr: OutputBuffer) -> None:
+        """Post the latest output line to the originating chat while a command runs."""
+        ctx = current_call()
+        channel, chat_id = ctx.channel, ctx.chat_id
+        if channel == "system" and ":" in chat_id:
+            channel, chat_id = chat_id.split(":", 1)
+        if not channel or not chat_id:
+            return
+        started = time.monotonic()
+        short = command if len(command) <= 60 else command[:57] + "..."
+        while True:
+            await asyncio.sleep(self.progress_interval_s)
+            line = stdout.last_line() or stderr.last_line()
+            content = f"⏳ `{short}` still running ({time.monotonic() - started:.0f}s)"
+            if line:
+                content += f"\n{line}"
+            try:
+                await self._send_callback(OutboundMessage(channel=channel, chat_id=chat_id, content=content))
+            except Exception as e:
+                logger.debug(f"Exec progress update failed: {e}")
+                return
 
     def _guard_command(self, command: str, cwd: str) -> str | None:
         """Best-effort safety guard for potentially destructive commands."""
@@ -0,0 +1,222 @@
+"""Persistent per-session shells for the exec tool."""
+
+import asyncio
+import secrets
+import shlex
+import shutil
+import time
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+from nanobot.agent.tools.shell import OutputBuffer, kill_process_group
+from nanobot.utils.metrics import metrics
+
+
+class ShellExitedError(Exception):
+    """The shell process ended (e.g. the command ran `exit`)."""
+
+
+async def _read_until(stream: asyncio.StreamReader, marker: bytes, buf: OutputBuffer) -> bytes:
+    """
+    Copy `stream` into `buf` up to a "\\n<marker>" line; return the rest of that line.
+
+    Raises:
+        ShellExitedError: The stream ended before the marker.
+    """
+    needle = b"\n" + marker
+    pending = b""
+    while True:
+        chunk = await stream.read(65536)
+        if not chunk:
+            raise ShellExitedError()
+        pending += chunk
+        at = pending.find(needle)
+        if at >= 0:
+            end = pending.find(b"\n", at + len(needle))
+            while end < 0:
+                more = await stream.read(256)
+                if not more:
+                    raise ShellExitedError()
+                pending += more
+                end = pending.find(b"\n", at + len(needle))
+            buf.write(pending[:at])
+            return pending[at + len(needle):end]
+        # Hold back only a tail that could be the start of a marker split across reads
+        cut = pending.rfind(b"\n", max(0, len(pending) - len(needle) + 1))
+        if cut < 0 or not needle.startswith(pending[cut:]):
+            cut = len(pending)
+        buf.write(pending[:cut])
+        pending = pending[cut:]
+
+
+class ShellSession:
+    """
+    One long-lived shell whose state (cwd, variables, venvs) carries across commands.
+
+    Each command is passed single-quoted to `eval` with stdin from
+    /dev/null, so a syntax error cannot leave the shell waiting for more
+    input and commands cannot swallow the next ones. A random marker line
+    printed after it on stdout (with exit code and $PWD) and on stderr
+    tells where its output ends.
+    """
+
+    def __init__(self, key: str, cwd: str, shell: str | None = None):
+        self.key = key
+        self.cwd = cwd
+        self.shell = shell or shutil.which("bash") or "/bin/sh"
+        self.process: asyncio.subprocess.Process | None = None
+        self.lock = asyncio.Lock()
+        self.last_used = time.monotonic()
+        self.commands = 0
+        self._marker = f"__NANOBOT_DONE_{secrets.token_hex(8)}__".encode()
+
+    async def start(self) -> None:
+        args = [self.shell, "--noprofile", "--norc"] if self.shell.endswith("bash") else [self.shell]
+        self.process = await asyncio.create_subprocess_exec(
+            *args,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=self.cwd,
+            start_new_session=True,
+        )
+        metrics.incr("tool.exec.shells_started")
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.returncode is None
+
+    async def run(self, command: str, stdout: OutputBuffer, stderr: OutputBuffer) -> int:
+        """
+        Run `command` and return its exit code; cancellation/timeouts are the caller's.
+
+        Raises:
+            ShellExitedError: The shell died while running the command.
+        """
+        assert self.process and self.process.stdin and self.process.stdout and self.process.stderr
+        self.last_used = time.monotonic()
+        self.commands += 1
+        marker = self._marker.decode()
+        script = (
+            f"eval {shlex.quote(command)} </dev/null\n"
+            f"__nb_rc=$?; printf '\\n%s %d %s\\n' '{marker}' \"$__nb_rc\" \"$PWD\"; "
+            f"printf '\\n%s\\n' '{marker}' >&2\n"
+        )
+        try:
+            self.process.stdin.write(script.encode())
+            await self.process.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            raise ShellExitedError() from None
+        status, _ = await asyncio.gather(
+            _read_until(self.process.stdout, self._marker, stdout),
+            _read_until(self.process.stderr, self._marker, stderr),
+        )
+        self.last_used = time.monotonic()
+        rc, _, cwd = status.decode("utf-8", errors="replace").strip().partition(" ")
+        if cwd:
+            self.cwd = cwd
+        return int(rc)
+
+    def kill(self) -> None:
+        if self.process:
+            kill_process_group(self.process)
+
+    async def wait_closed(self) -> None:
+        if self.process:
+            await self.process.wait()
+
+
+class ShellSessionPool:
+    """
+    Live shells keyed by chat session, with idle reaping and a cap.
+
+    Shells idle for `idle_timeout_s` are closed by a background reaper.
+    When `max_sessions` shells exist, the least recently used idle one is
+    closed to make room; if all are busy, `acquire` returns None and the
+    caller falls back to a one-off shell.
+
+    Metrics: tool.exec.shells_started, tool.exec.shells_reaped, tool.exec.shells_evicted.
+    """
+
+    def __init__(self, max_sessions: int = 8, idle_timeout_s: float = 600.0):
+        self.max_sessions = max_sessions
+        self.idle_timeout_s = idle_timeout_s
+        self._sessions: dict[str, ShellSession] = {}
+        self._reaper: asyncio.Task | None = None
+
+    async def acquire(self, key: str, cwd: str) -> ShellSession | None:
+        """The live shell for `key`, started in `cwd` if there is none."""
+        session = self._sessions.get(key)
+        if session and session.alive:
+            return session
+        if len(self._sessions) >= self.max_sessions and not self._evict():
+            return None
+        session = ShellSession(key, cwd)
+        await session.start()
+        self._sessions[key] = session
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.create_task(self._reap_loop())
+        return session
+
+    def discard(self, key: str) -> None:
+        """Kill and forget the shell for `key` (after a timeout or crash)."""
+        session = self._sessions.pop(key, None)
+        if session:
+            session.kill()
+
+    def _evict(self) -> bool:
+        idle = [s for s in self._sessions.values() if not s.lock.locked()]
+        if not idle:
+            return False
+        victim = min(idle, key=lambda s: s.last_used)
+        logger.debug(f"Closing shell for {victim.key} to stay within {self.max_sessions} shells")
+        metrics.incr("tool.exec.shells_evicted")
+        self.discard(victim.key)
+        return True
+
+    def reap(self) -> int:
+        """Close shells idle for longer than `idle_timeout_s`; returns how many."""
+        now = time.monotonic()
+        stale = [
+            k for k, s in self._sessions.items()
+            if not s.alive or (not s.lock.locked() and now - s.last_used > self.idle_timeout_s)
+        ]
+        for key in stale:
+            self.discard(key)
+        if stale:
+            metrics.incr("tool.exec.shells_reaped", len(stale))
+        return len(stale)
+
+    async def _reap_loop(self) -> None:
+        while self._sessions:
+            await asyncio.sleep(max(1.0, self.idle_timeout_s / 4))
+            self.reap()
+
+    def status(self) -> dict[str, Any]:
+        now = time.monotonic()
+        return {
+            key: {"cwd": s.cwd, "commands": s.commands, "idle_s": round(now - s.last_used, 1), "busy": s.lock.locked()}
+            for key, s in self._sessions.items()
+        }
+
+    def close_all(self) -> None:
+        """Kill every shell (on shutdown, from `AgentLoop.stop`)."""
+        for key in list(self._sessions):
+            self.discard(key)
+        if self._reaper and not self._reaper.done():
+            self._reaper.cancel()
+
+    async def aclose(self) -> None:
+        """`close_all`, then wait for the shells to exit."""
+        sessions = list(self._sessions.values())
+        self.close_all()
+        await asyncio.gather(*(s.wait_closed() for s in sessions))
+
+
+def inside(path: str, root: str) -> bool:
+    """Whether `path` is `root` or below it."""
+    p, r = Path(path).resolve(), Path(root).resolve()
+    return p == r or r in p.parents
+
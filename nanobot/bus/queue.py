@@ -29,13 +29,26 @@ class MessageBus:
         self.inbound: asyncio.Queue[InboundMessage] = asyncio.Queue()
         self.outbound: asyncio.Queue[OutboundMessage] = asyncio.Queue()
         self._outbound_subscribers: dict[str, list[Callable[[OutboundMessage], Awaitable[None]]]] = {}
+        self._inbound_taps: list[Callable[[InboundMessage], None]] = []
         self._running = False
     
+    # 作用：注册入站消息监听回调（如流量录制）
+    # 设计目的：在消息发布时而非处理时观察，保留真实到达时间
+    # 好处：录制与智能体处理解耦，回调异常不影响消息投递
+    def tap_inbound(self, callback: Callable[[InboundMessage], None]) -> None:
+        """Call `callback` with every inbound message as it is published (e.g. to record arrivals)."""
+        self._inbound_taps.append(callback)
+
     # 作用：发布入站消息到队列（通道 -> 智能体）
     # 设计目的：异步入队操作，支持高并发消息发布
     # 好处：非阻塞发布，缓冲区管理，背压支持
     async def publish_inbound(self, msg: InboundMessage) -> None:
         """Publish a message from a channel to the agent."""
+        for tap in self._inbound_taps:
+            try:
+                tap(msg)
+            except Exception as e:
+                logger.error(f"Inbound tap failed: {e}")
         await self.inbound.put(msg)
     
     # 作用：消费入站消息队列（智能体获取消息）
@@ -3,13 +3,19 @@
 # 模块作用：通道抽象基类，定义所有聊天通道的统一接口
 # 设计目的：通过抽象类强制实现核心方法，保证通道一致性
 # 好处：接口标准化，易于扩展新通道，多态处理
+import asyncio
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 from typing import Any
 
 from loguru import logger
 
 from nanobot.bus.events import InboundMessage, OutboundMessage
 from nanobot.bus.queue import MessageBus
+from nanobot.channels.dedup import MessageDeduplicator
+from nanobot.channels.outbound import coalesce_messages, split_message
+from nanobot.utils.metrics import metrics
+from nanobot.utils.ratelimit import TokenBucket
 
 
 # 作用：聊天通道抽象基类，定义通道必须实现的核心方法
@@ -25,6 +31,15 @@ class BaseChannel(ABC):
     
     name: str = "base"
     
+    # Platform defaults for the outbound layer; overridable via config.outbound.
+    # None means unlimited.
+    max_message_length: int | None = None
+    send_rate: float | None = None  # messages/second for the whole channel
+    send_burst: int = 1
+    chat_send_rate: float | None = None  # messages/second per chat
+    chat_send_burst: int = 1
+    _MAX_CHAT_BUCKETS = 1024
+
     # 作用：初始化通道基类，存储配置和消息总线
     # 设计目的：统一初始化逻辑，提供基础状态管理
     # 好处：配置集中管理，状态跟踪，减少重复代码
@@ -39,6 +54,29 @@ class BaseChannel(ABC):
         self.config = config
         self.bus = bus
         self._running = False
+
+        outbound = getattr(config, "outbound", None)
+        self._coalesce_s = (getattr(outbound, "coalesce_ms", 0) or 0) / 1000
+        self._max_length = getattr(outbound, "max_length", None) or self.max_message_length
+        rate = getattr(outbound, "rate", None) or self.send_rate
+        burst = getattr(outbound, "burst", None) or self.send_burst
+        self._chat_rate = getattr(outbound, "chat_rate", None) or self.chat_send_rate
+        self._chat_burst = getattr(outbound, "chat_burst", None) or self.chat_send_burst
+        self._bucket = TokenBucket(rate, burst) if rate else None
+        self._chat_buckets: OrderedDict[str, TokenBucket] = OrderedDict()
+        self._pending: dict[str, list[OutboundMessage]] = {}
+        self._flush_tasks: dict[str, asyncio.Task] = {}
+
+        self._dedup: MessageDeduplicator | None = None
+        dedup = getattr(config, "dedup", None)
+        if dedup is not None and dedup.enabled:
+            path = None
+            if dedup.persist:
+                from nanobot.utils.helpers import get_data_path
+                path = get_data_path() / "dedup" / f"{self.name}.log"
+            self._dedup = MessageDeduplicator(
+                ttl_s=dedup.ttl_s, max_entries=dedup.max_entries, path=path
+            )
     
     # 作用：启动通道监听消息的抽象方法
     # 设计目的：强制实现连接建立和消息监听逻辑
@@ -76,6 +114,92 @@ class BaseChannel(ABC):
         """
         pass
     
+    # 作用：共享出站层入口，合并、拆分并限速后调用 send()
+    # 设计目的：按聊天排队，避免一个聊天的限速阻塞其他聊天
+    # 好处：减少平台API调用次数，避免触发平台限流
+    async def deliver(self, msg: OutboundMessage) -> None:
+        """
+        Queue a message for delivery through the shared outbound layer.
+
+        Messages are delivered per chat in order by a background task that
+        coalesces (when configured), splits to the platform length limit and
+        waits on the channel-wide and per-chat token buckets before calling
+        send(). Returns immediately.
+
+        Args:
+            msg: The message to deliver.
+        """
+        self._pending.setdefault(msg.chat_id, []).append(msg)
+        if msg.chat_id not in self._flush_tasks:
+            self._flush_tasks[msg.chat_id] = asyncio.create_task(self._flush_chat(msg.chat_id))
+
+    async def flush_outbound(self) -> None:
+        """Wait until all queued outbound messages have been sent."""
+        while self._flush_tasks:
+            await asyncio.gather(*list(self._flush_tasks.values()), return_exceptions=True)
+
+    def rendered_length(self, text: str) -> int:
+        """Length of `text` as the platform counts it after `send` converts it."""
+        return len(text)
+
+    async def _flush_chat(self, chat_id: str) -> None:
+        """Drain the pending queue for one chat."""
+        try:
+            while self._pending.get(chat_id):
+                if self._coalesce_s:
+                    await asyncio.sleep(self._coalesce_s)
+                    batch = coalesce_messages(self._pending.pop(chat_id))
+                else:
+                    batch = [self._pending[chat_id].pop(0)]
+                for msg in batch:
+                    for part in split_message(msg, self._max_length, self.rendered_length):
+                        await self._acquire_send_slot(chat_id)
+                        try:
+                            await self.send(part)
+                        except Exception as e:
+                            logger.error(f"Error sending to {self.name}:{chat_id}: {e}")
+        finally:
+            self._pending.pop(chat_id, None)
+            self._flush_tasks.pop(chat_id, None)
+
+    async def _acquire_send_slot(self, chat_id: str) -> None:
+        """Wait on the per-chat bucket, then the channel-wide bucket."""
+        if self._chat_rate:
+            bucket = self._chat_buckets.get(chat_id)
+            if bucket is None:
+                bucket = TokenBucket(self._chat_rate, self._chat_burst)
+                self._chat_buckets[chat_id] = bucket
+                while len(self._chat_buckets) > self._MAX_CHAT_BUCKETS:
+                    self._chat_buckets.popitem(last=False)
+            else:
+                self._chat_buckets.move_to_end(chat_id)
+            await bucket.acquire()
+        if self._bucket:
+            await self._bucket.acquire()
+
+    def _penalize(self, chat_id: str, seconds: float) -> None:
+        """Back off the chat's bucket after the platform reported a rate limit."""
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket:
+            bucket.penalize(seconds)
+        if self._bucket:
+            self._bucket.penalize(seconds)
+
+    # 作用：判断入站消息是否为平台重投递的重复消息
+    # 设计目的：按 chat_id + message_id 去重，与具体通道无关
+    # 好处：避免重复消息触发完整的LLM回合
+    def _dedup_key(self, chat_id: str, metadata: dict[str, Any] | None) -> str | None:
+        """Build the dedup key from the platform message ID, if there is one."""
+        message_id = (metadata or {}).get("message_id")
+        if message_id in (None, ""):
+            return None
+        return f"{chat_id}:{message_id}"
+
+    def is_duplicate(self, chat_id: str, metadata: dict[str, Any] | None) -> bool:
+        """Check (without recording) whether a message was already handled."""
+        key = self._dedup_key(chat_id, metadata)
+        return bool(self._dedup is not None and key and self._dedup.seen(key))
+
     # 作用：检查发送者是否有权限使用该通道
     # 设计目的：基于allow_list配置实现访问控制
     # 好处：灵活的权限管理，支持白名单，默认开放
@@ -118,7 +242,8 @@ class BaseChannel(ABC):
         """
         Handle an incoming message from the chat platform.
         
-        This method checks permissions and forwards to the bus.
+        This method checks permissions, drops redelivered duplicates
+        (keyed on metadata["message_id"]) and forwards to the bus.
         
         Args:
             sender_id: The sender's identifier.
@@ -134,6 +259,12 @@ class BaseChannel(ABC):
             )
             return
         
+        key = self._dedup_key(str(chat_id), metadata)
+        if self._dedup is not None and key and self._dedup.check_and_add(key):
+            metrics.incr(f"channel.{self.name}.duplicates_suppressed")
+            logger.debug(f"Suppressed duplicate message {key} on channel {self.name}")
+            return
+
         msg = InboundMessage(
             channel=self.name,
             sender_id=str(sender_id),
@@ -153,6 +284,11 @@ class BaseChannel(ABC):
         """Check if the channel is running."""
         return self._running
 
+    @property
+    def duplicates_suppressed(self) -> int:
+        """Number of inbound duplicates dropped since start."""
+        return self._dedup.suppressed if self._dedup is not None else 0
+
 
 # ============================================
 # 示例说明：BaseChannel 使用示例
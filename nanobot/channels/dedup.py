@@ -0,0 +1,111 @@
+"""Inbound message deduplication shared by all channels."""
+
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from loguru import logger
+
+
+class MessageDeduplicator:
+    """
+    Bounded TTL cache of recently seen platform message keys.
+
+    Platforms redeliver events (Telegram retries, Discord gateway replays,
+    WhatsApp bridge reconnects, Feishu at-least-once delivery); each
+    duplicate would otherwise cost a full agent turn.
+
+    When `path` is set, keys are appended to a small log file so that
+    redeliveries right after a restart are still suppressed. The log is
+    compacted on load.
+    """
+
+    def __init__(
+        self,
+        ttl_s: float = 3600,
+        max_entries: int = 5000,
+        path: Path | None = None,
+    ):
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self.path = path
+        self.suppressed = 0
+        self._seen: OrderedDict[str, float] = OrderedDict()
+        self._log_lines = 0
+        if path:
+            self._load()
+
+    def _expire(self, now: float) -> None:
+        cutoff = now - self.ttl_s
+        while self._seen:
+            key, ts = next(iter(self._seen.items()))
+            if ts >= cutoff and len(self._seen) <= self.max_entries:
+                break
+            self._seen.popitem(last=False)
+
+    def seen(self, key: str) -> bool:
+        """Check whether a key was seen within the TTL, without recording it."""
+        ts = self._seen.get(key)
+        return ts is not None and ts >= time.time() - self.ttl_s
+
+    def check_and_add(self, key: str) -> bool:
+        """
+        Record a key.
+
+        Returns:
+            True if the key is a duplicate (already seen within the TTL).
+        """
+        now = time.time()
+        self._expire(now)
+        if key in self._seen:
+            self.suppressed += 1
+            return True
+        self._seen[key] = now
+        self._expire(now)
+        if self.path:
+            self._append(key, now)
+        return False
+
+    def _append(self, key: str, ts: float) -> None:
+        if self._log_lines >= 2 * self.max_entries:
+            self._rewrite()
+        try:
+            with open(self.path, "a") as f:
+                f.write(f"{ts:.3f} {key}\n")
+            self._log_lines += 1
+        except OSError as e:
+            logger.warning(f"Failed to persist dedup key to {self.path}: {e}")
+
+    def _rewrite(self) -> None:
+        """Replace the log with the live entries only."""
+        try:
+            with open(self.path, "w") as f:
+                f.writelines(f"{ts:.3f} {key}\n" for key, ts in self._seen.items())
+            self._log_lines = len(self._seen)
+        except OSError as e:
+            logger.warning(f"Failed to compact dedup log {self.path}: {e}")
+
+    def _load(self) -> None:
+        """Load persisted keys, dropping expired ones, and rewrite a compacted log."""
+        if not self.path.exists():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            return
+        now = time.time()
+        try:
+            with open(self.path) as f:
+                for line in f:
+                    ts_str, _, key = line.rstrip("\n").partition(" ")
+                    try:
+                        ts = float(ts_str)
+                    except ValueError:
+                        continue
+                    if key and ts >= now - self.ttl_s:
+                        self._seen[key] = ts
+                        self._seen.move_to_end(key)
+            self._expire(now)
+        except OSError as e:
+            logger.warning(f"Failed to load dedup log {self.path}: {e}")
+        self._rewrite()
+
+    def __len__(self) -> int:
+        return len(self._seen)
@@ -24,6 +24,13 @@ class DiscordChannel(BaseChannel):
 
     name = "discord"
 
+    # 2000-char message limit; 50 req/s global, 5 messages per 5s per channel.
+    max_message_length = 2000
+    send_rate = 50.0
+    send_burst = 50
+    chat_send_rate = 1.0
+    chat_send_burst = 5
+
     def __init__(self, config: DiscordConfig, bus: MessageBus):
         super().__init__(config, bus)
         self.config: DiscordConfig = config
@@ -95,6 +102,7 @@ class DiscordChannel(BaseChannel):
                         data = response.json()
                         retry_after = float(data.get("retry_after", 1.0))
                         logger.warning(f"Discord rate limited, retrying in {retry_after}s")
+                        self._penalize(msg.chat_id, retry_after)
                         await asyncio.sleep(retry_after)
                         continue
                     response.raise_for_status()
@@ -4,7 +4,6 @@ import asyncio
 import json
 import re
 import threading
-from collections import OrderedDict
 from typing import Any
 
 from loguru import logger
@@ -53,13 +52,20 @@ class FeishuChannel(BaseChannel):
     
     name = "feishu"
     
+    # Card payloads are limited to ~30KB; the IM API allows ~50 QPS per app
+    # and 5 QPS per chat.
+    max_message_length = 20000
+    send_rate = 50.0
+    send_burst = 50
+    chat_send_rate = 5.0
+    chat_send_burst = 5
+
     def __init__(self, config: FeishuConfig, bus: MessageBus):
         super().__init__(config, bus)
         self.config: FeishuConfig = config
         self._client: Any = None
         self._ws_client: Any = None
         self._ws_thread: threading.Thread | None = None
-        self._processed_message_ids: OrderedDict[str, None] = OrderedDict()  # Ordered dedup cache
         self._loop: asyncio.AbstractEventLoop | None = None
     
     async def start(self) -> None:
@@ -255,15 +261,7 @@ class FeishuChannel(BaseChannel):
             message = event.message
             sender = event.sender
             
-            # Deduplication check
             message_id = message.message_id
-            if message_id in self._processed_message_ids:
-                return
-            self._processed_message_ids[message_id] = None
-            
-            # Trim cache: keep most recent 500 when exceeds 1000
-            while len(self._processed_message_ids) > 1000:
-                self._processed_message_ids.popitem(last=False)
             
             # Skip bot messages
             sender_type = sender.sender_type
@@ -274,6 +272,11 @@ class FeishuChannel(BaseChannel):
             chat_id = message.chat_id
             chat_type = message.chat_type  # "p2p" or "group"
             msg_type = message.message_type
+            reply_to = chat_id if chat_type == "group" else sender_id
+
+            # Skip redelivered events before reacting; BaseChannel records the ID
+            if self.is_duplicate(reply_to, {"message_id": message_id}):
+                return
             
             # Add reaction to indicate "seen"
             await self._add_reaction(message_id, "THUMBSUP")
@@ -291,7 +294,6 @@ class FeishuChannel(BaseChannel):
                 return
             
             # Forward to message bus
-            reply_to = chat_id if chat_type == "group" else sender_id
             await self._handle_message(
                 sender_id=sender_id,
                 chat_id=reply_to,
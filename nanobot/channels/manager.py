@@ -35,9 +35,38 @@ class ChannelManager:
         self.bus = bus
         self.channels: dict[str, BaseChannel] = {}
         self._dispatch_task: asyncio.Task | None = None
+        self.transcriber = self._init_transcriber()
         
         self._init_channels()
     
+    # 作用：创建所有通道共享的语音转写服务
+    # 设计目的：一个连接池、一个缓存、一个并发上限，而不是每条语音新建客户端
+    # 好处：复用连接，重复语音免费，后端可替换为本地服务
+    def _init_transcriber(self) -> Any:
+        """Shared voice transcription service, or None when no backend is configured."""
+        tc = self.config.transcription
+        api_key = tc.api_key or self.config.providers.groq.api_key
+        if not (api_key or tc.api_url):
+            return None
+        from nanobot.config.loader import get_data_dir
+        from nanobot.providers.transcription import (
+            GROQ_TRANSCRIPTION_URL,
+            TranscriptionService,
+            WhisperAPIBackend,
+        )
+        backend = WhisperAPIBackend(
+            api_key=api_key or None,
+            api_url=tc.api_url or GROQ_TRANSCRIPTION_URL,
+            model=tc.model,
+        )
+        return TranscriptionService(
+            backend,
+            cache_dir=get_data_dir() / "transcripts" if tc.cache else None,
+            chunk_bytes=int(tc.chunk_mb * 1024 * 1024),
+            chunk_seconds=tc.chunk_seconds,
+            max_concurrency=tc.max_concurrency,
+        )
+
     # 作用：根据配置初始化所有启用的通道
     # 设计目的：遍历配置通道，动态导入实现类，错误处理
     # 好处：模块化通道加载，依赖缺失不影响其他通道
@@ -51,7 +80,7 @@ class ChannelManager:
                 self.channels["telegram"] = TelegramChannel(
                     self.config.channels.telegram,
                     self.bus,
-                    groq_api_key=self.config.providers.groq.api_key,
+                    transcriber=self.transcriber,
                 )
                 logger.info("Telegram channel enabled")
             except ImportError as e:
@@ -139,10 +168,17 @@ class ChannelManager:
         # Stop all channels
         for name, channel in self.channels.items():
             try:
+                try:
+                    await asyncio.wait_for(channel.flush_outbound(), timeout=5.0)
+                except asyncio.TimeoutError:
+                    logger.warning(f"Dropping unsent messages for {name} on shutdown")
                 await channel.stop()
                 logger.info(f"Stopped {name} channel")
             except Exception as e:
                 logger.error(f"Error stopping {name}: {e}")
+
+        if self.transcriber:
+            await self.transcriber.aclose()
     
     # 作用：分发出站消息到对应通道的后台任务
     # 设计目的：持续监听出站队列，路由消息，错误处理
@@ -160,10 +196,7 @@ class ChannelManager:
                 
                 channel = self.channels.get(msg.channel)
                 if channel:
-                    try:
-                        await channel.send(msg)
-                    except Exception as e:
-                        logger.error(f"Error sending to {msg.channel}: {e}")
+                    await channel.deliver(msg)
                 else:
                     logger.warning(f"Unknown channel: {msg.channel}")
                     
@@ -187,7 +220,8 @@ class ChannelManager:
         return {
             name: {
                 "enabled": True,
-                "running": channel.is_running
+                "running": channel.is_running,
+                "duplicates_suppressed": channel.duplicates_suppressed,
             }
             for name, channel in self.channels.items()
         }
@@ -0,0 +1,87 @@
+"""Helpers for the shared outbound layer: coalescing and length splitting."""
+
+from dataclasses import replace
+from typing import Callable
+
+from nanobot.bus.events import OutboundMessage
+
+
+def coalesce_messages(messages: list[OutboundMessage]) -> list[OutboundMessage]:
+    """
+    Merge consecutive messages to the same chat into one.
+
+    Only runs of messages with the same `reply_to` are merged; content is
+    joined with a blank line and media lists are concatenated. Order is kept.
+    """
+    merged: list[OutboundMessage] = []
+    for msg in messages:
+        prev = merged[-1] if merged else None
+        if prev and prev.chat_id == msg.chat_id and prev.reply_to == msg.reply_to:
+            merged[-1] = replace(
+                prev,
+                content="\n\n".join(p for p in (prev.content, msg.content) if p),
+                media=prev.media + msg.media,
+                metadata={**msg.metadata, **prev.metadata},
+            )
+        else:
+            merged.append(msg)
+    return merged
+
+
+def _cut(text: str, limit: int) -> tuple[str, str]:
+    """First chunk of at most `limit` characters, broken at the nicest separator, and the rest."""
+    window = text[:limit]
+    for sep in ("\n\n", "\n", " "):
+        idx = window.rfind(sep)
+        if idx > 0:
+            return text[:idx].rstrip(), text[idx:].lstrip("\n ")
+    return window, text[limit:]
+
+
+def split_text(text: str, max_length: int, measure: Callable[[str], int] = len) -> list[str]:
+    """
+    Split text into chunks whose `measure` is at most `max_length`.
+
+    Prefers paragraph breaks, then line breaks, then spaces; falls back to a
+    hard cut when a single run has no break inside the limit. `measure`
+    defaults to the character count; channels that send a converted form
+    (e.g. Telegram HTML) pass the length after conversion, and chunks that
+    grow past the limit are re-cut shorter.
+    """
+    if max_length <= 0 or measure(text) <= max_length:
+        return [text]
+
+    chunks: list[str] = []
+    rest = text
+    while rest and measure(rest) > max_length:
+        limit = max_length
+        chunk, remainder = _cut(rest, limit)
+        while limit > 1 and (size := measure(chunk)) > max_length:
+            # Shrink in proportion to the overshoot
+            limit = max(1, min(limit - 1, limit * max_length // size))
+            chunk, remainder = _cut(rest, limit)
+        chunks.append(chunk)
+        rest = remainder
+    if rest:
+        chunks.append(rest)
+    return chunks
+
+
+def split_message(
+    msg: OutboundMessage,
+    max_length: int | None,
+    measure: Callable[[str], int] = len,
+) -> list[OutboundMessage]:
+    """Split a message into several that fit `max_length`. Media rides on the first part."""
+    if not max_length or measure(msg.content) <= max_length:
+        return [msg]
+    parts = split_text(msg.content, max_length, measure)
+    return [
+        replace(
+            msg,
+            content=part,
+            media=msg.media if i == 0 else [],
+            reply_to=msg.reply_to if i == 0 else None,
+        )
+        for i, part in enumerate(parts)
+    ]
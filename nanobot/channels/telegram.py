@@ -8,12 +8,14 @@ from typing import TYPE_CHECKING
 
 from loguru import logger
 from telegram import BotCommand, Update
+from telegram.error import RetryAfter
 from telegram.ext import Application, CommandHandler, MessageHandler, filters, ContextTypes
 
 from nanobot.bus.events import OutboundMessage
 from nanobot.bus.queue import MessageBus
 from nanobot.channels.base import BaseChannel
 from nanobot.config.schema import TelegramConfig
+from nanobot.providers.transcription import GroqTranscriptionProvider, TranscriptionService
 
 if TYPE_CHECKING:
     from nanobot.session.manager import SessionManager
@@ -91,6 +93,14 @@ class TelegramChannel(BaseChannel):
     
     name = "telegram"
     
+    # Telegram caps messages at 4096 chars, counted after the HTML conversion
+    # (see rendered_length). Bots may send ~30 msg/s overall and ~1 msg/s to a single chat.
+    max_message_length = 4096
+    send_rate = 30.0
+    send_burst = 30
+    chat_send_rate = 1.0
+    chat_send_burst = 3
+
     # Commands registered with Telegram's command menu
     BOT_COMMANDS = [
         BotCommand("start", "Start the bot"),
@@ -104,10 +114,14 @@ class TelegramChannel(BaseChannel):
         bus: MessageBus,
         groq_api_key: str = "",
         session_manager: SessionManager | None = None,
+        transcriber: TranscriptionService | None = None,
     ):
         super().__init__(config, bus)
         self.config: TelegramConfig = config
         self.groq_api_key = groq_api_key
+        if transcriber is None and groq_api_key:
+            transcriber = GroqTranscriptionProvider(api_key=groq_api_key)
+        self.transcriber = transcriber
         self.session_manager = session_manager
         self._app: Application | None = None
         self._chat_ids: dict[str, int] = {}  # Map sender_id to chat_id for replies
@@ -177,6 +191,10 @@ class TelegramChannel(BaseChannel):
             await self._app.shutdown()
             self._app = None
     
+    def rendered_length(self, text: str) -> int:
+        """Length as sent: the HTML form, or the raw text if the plain-text fallback kicks in."""
+        return max(len(_markdown_to_telegram_html(text)), len(text))
+
     async def send(self, msg: OutboundMessage) -> None:
         """Send a message through Telegram."""
         if not self._app:
@@ -188,11 +206,23 @@ class TelegramChannel(BaseChannel):
             chat_id = int(msg.chat_id)
             # Convert markdown to Telegram HTML
             html_content = _markdown_to_telegram_html(msg.content)
-            await self._app.bot.send_message(
-                chat_id=chat_id,
-                text=html_content,
-                parse_mode="HTML"
-            )
+            try:
+                await self._app.bot.send_message(
+                    chat_id=chat_id,
+                    text=html_content,
+                    parse_mode="HTML"
+                )
+            except RetryAfter as e:
+                # Flood control: back off the shared buckets and retry once
+                retry_after = float(e.retry_after)
+                logger.warning(f"Telegram flood limit hit, retrying in {retry_after}s")
+                self._penalize(msg.chat_id, retry_after)
+                await asyncio.sleep(retry_after)
+                await self._app.bot.send_message(
+                    chat_id=chat_id,
+                    text=html_content,
+                    parse_mode="HTML"
+                )
         except ValueError:
             logger.error(f"Invalid chat_id: {msg.chat_id}")
         except Exception as e:
@@ -314,10 +344,8 @@ class TelegramChannel(BaseChannel):
                 media_paths.append(str(file_path))
                 
                 # Handle voice transcription
-                if media_type == "voice" or media_type == "audio":
-                    from nanobot.providers.transcription import GroqTranscriptionProvider
-                    transcriber = GroqTranscriptionProvider(api_key=self.groq_api_key)
-                    transcription = await transcriber.transcribe(file_path)
+                if (media_type == "voice" or media_type == "audio") and self.transcriber:
+                    transcription = await self.transcriber.transcribe(file_path)
                     if transcription:
                         logger.info(f"Transcribed {media_type}: {transcription[:50]}...")
                         content_parts.append(f"[transcription: {transcription}]")
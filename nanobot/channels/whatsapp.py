@@ -22,6 +22,13 @@ class WhatsAppChannel(BaseChannel):
     
     name = "whatsapp"
     
+    # No published limits for WhatsApp Web; stay conservative to avoid bans.
+    max_message_length = 4096
+    send_rate = 10.0
+    send_burst = 10
+    chat_send_rate = 1.0
+    chat_send_burst = 3
+
     def __init__(self, config: WhatsAppConfig, bus: MessageBus):
         super().__init__(config, bus)
         self.config: WhatsAppConfig = config
@@ -149,22 +149,149 @@ This file stores important information that should persist across sessions.
         console.print("  [dim]Created memory/MEMORY.md[/dim]")
 
 
+def _stub_model(stub):
+    """StubModel for llm.backend = "stub"."""
+    from nanobot.providers.stub import StubModel, StubProfile
+    profile = StubProfile(
+        ttft_s=stub.ttft_s,
+        tokens_per_s=stub.tokens_per_s,
+        error_rate=stub.error_rate,
+        rate_limit_rate=stub.rate_limit_rate,
+        seed=stub.seed,
+    )
+    return StubModel.from_file(Path(stub.script), profile) if stub.script else StubModel(profile=profile)
+
+
+def _backend_provider(config, model: str, http_pool):
+    """The raw backend client(s) for `model`, load-balanced when replicas are configured."""
+    if config.llm.backend == "stub":
+        from nanobot.providers.stub import StubProvider
+        return StubProvider(_stub_model(config.llm.stub), default_model=model)
+    if config.llm.backend == "openai":
+        from nanobot.providers.openai_compat import OpenAICompatProvider
+        provider_cls = OpenAICompatProvider
+    else:
+        from nanobot.providers.litellm_provider import LiteLLMProvider
+        provider_cls = LiteLLMProvider
+
+    p = config.get_provider(model)
+    def make(api_base):
+        return provider_cls(
+            api_key=p.api_key if p else None,
+            api_base=api_base,
+            default_model=model,
+            extra_headers=p.extra_headers if p else None,
+            http_pool=http_pool,
+        )
+
+    api_base = config.get_api_base(model)
+    if not (p and p.api_bases):
+        return make(api_base)
+    from nanobot.providers.balancer import LoadBalancedProvider
+    bases = list(dict.fromkeys([b for b in [api_base, *p.api_bases] if b]))
+    lb = config.llm.balancer
+    return LoadBalancedProvider(
+        [(base, make(base)) for base in bases],
+        http_pool=http_pool,
+        health_interval=lb.health_interval_s,
+        sticky=lb.sticky,
+        max_skew=lb.max_skew,
+    )
+
+
+def _build_provider(config, model: str, http_pool, limiter=None, usage_store=None):
+    """Create one provider instance for `model` using the matching provider keys."""
+    provider = _backend_provider(config, model, http_pool)
+    if usage_store is not None:
+        from nanobot.usage import UsageTrackingProvider
+        provider = UsageTrackingProvider(provider, usage_store)
+    if limiter is not None:
+        from nanobot.providers.ratelimit import RateLimitedProvider
+        provider = RateLimitedProvider(provider, limiter)
+    return provider
+
+
+def _usage_store(config):
+    """Open the local usage store (~/.nanobot/usage)."""
+    from nanobot.config.loader import get_data_dir
+    from nanobot.usage import UsageStore
+    return UsageStore(get_data_dir() / "usage", retention_days=config.llm.usage.retention_days)
+
+
 def _make_provider(config):
-    """Create LiteLLMProvider from config. Exits if no API key found."""
-    from nanobot.providers.litellm_provider import LiteLLMProvider
+    """Create the configured LLM provider stack (cache, routing, failover, rate limits) from config. Exits if no API key found."""
+    from nanobot.providers.failover import Endpoint, FailoverProvider
+    from nanobot.providers.http_pool import HTTPPool
+    from nanobot.providers.registry import ProviderRegistry
     p = config.get_provider()
     model = config.agents.defaults.model
-    if not (p and p.api_key) and not model.startswith("bedrock/"):
+    if not (p and p.api_key) and not model.startswith("bedrock/") and config.llm.backend != "stub":
         console.print("[red]Error: No API key configured.[/red]")
         console.print("Set one in ~/.nanobot/config.json under providers section")
         raise typer.Exit(1)
-    return LiteLLMProvider(
-        api_key=p.api_key if p else None,
-        api_base=config.get_api_base(),
+    http_pool = HTTPPool.from_config(config.llm.http)
+
+    usage_store = _usage_store(config) if config.llm.usage.enabled else None
+
+    # One limiter shared by every endpoint so budgets hold across primary and fallbacks
+    limiter = None
+    if config.llm.rate_limits:
+        from nanobot.providers.ratelimit import RateLimit, RateLimiter
+        limiter = RateLimiter([RateLimit(**r.model_dump()) for r in config.llm.rate_limits])
+
+    # One isolated provider instance per model (credentials picked per model)
+    registry = ProviderRegistry(
+        lambda m: _build_provider(config, m, http_pool, limiter, usage_store),
         default_model=model,
-        extra_headers=p.extra_headers if p else None,
     )
 
+    fallbacks: dict[str, list[Endpoint]] = {}
+    for rule in config.llm.failover:
+        for fallback in rule.fallbacks:
+            fp = config.get_provider(fallback)
+            if not (fp and (fp.api_key or fp.api_base)):
+                console.print(f"[yellow]Warning: no provider configured for fallback model {fallback}, skipping[/yellow]")
+                continue
+            fallbacks.setdefault(rule.model, []).append(Endpoint(name=fallback, provider=registry, model=fallback))
+
+    retry = config.llm.retry
+    provider = FailoverProvider(
+        registry,
+        fallbacks=fallbacks,
+        max_retries=retry.max_retries,
+        backoff_base=retry.backoff_base_s,
+        backoff_max=retry.backoff_max_s,
+        hedge_after=retry.hedge_after_s,
+        failure_threshold=retry.circuit_failures,
+        reset_timeout=retry.circuit_reset_s,
+    )
+
+    # Cache below the router: keys then name the model that actually answered
+    cache = config.llm.cache
+    if cache.enabled:
+        from nanobot.config.loader import get_data_dir
+        from nanobot.providers.cache import CachingProvider, ResponseCache
+        provider = CachingProvider(
+            provider,
+            ResponseCache(
+                max_entries=cache.max_entries,
+                ttl_s=cache.ttl_s,
+                path=get_data_dir() / "llm_cache" if cache.persist else None,
+            ),
+            force=cache.force,
+        )
+
+    router = config.llm.router
+    if router.rules:
+        from nanobot.providers.router import RouterProvider, RouteRule
+        provider = RouterProvider(
+            provider,
+            rules=[RouteRule(**r.model_dump()) for r in router.rules if r.model],
+            escalate_on_error=router.escalate_on_error,
+            escalate_marker=router.escalate_marker,
+        )
+    return provider
+
 
 # ============================================================================
 # Gateway / Server
@@ -175,6 +302,7 @@ def _make_provider(config):
 def gateway(
     port: int = typer.Option(18790, "--port", "-p", help="Gateway port"),
     verbose: bool = typer.Option(False, "--verbose", "-v", help="Verbose output"),
+    record: Path = typer.Option(None, "--record", help="Record inbound/LLM/tool traffic to a JSONL log for `nanobot replay`"),
 ):
     """Start the nanobot gateway."""
     from nanobot.config.loader import load_config, get_data_dir
@@ -185,6 +313,7 @@ def gateway(
     from nanobot.cron.service import CronService
     from nanobot.cron.types import CronJob
     from nanobot.heartbeat.service import HeartbeatService
+    from nanobot.agent.tools.iopool import io_pool
     
     if verbose:
         import logging
@@ -197,10 +326,19 @@ def gateway(
     provider = _make_provider(config)
     session_manager = SessionManager(config.workspace_path)
     
+    recorder = None
+    if record:
+        from nanobot.replay.recorder import RecordingProvider, TrafficRecorder
+        recorder = TrafficRecorder(record)
+        provider = RecordingProvider(provider, recorder)
+        console.print(f"[green]✓[/green] Recording traffic to {record}")
+
     # Create cron service first (callback set after agent creation)
     cron_store_path = get_data_dir() / "cron" / "jobs.json"
     cron = CronService(cron_store_path)
     
+    io_pool.configure(config.tools.io_workers)
+
     # Create agent with cron service
     agent = AgentLoop(
         bus=bus,
@@ -208,11 +346,21 @@ def gateway(
         workspace=config.workspace_path,
         model=config.agents.defaults.model,
         max_iterations=config.agents.defaults.max_tool_iterations,
+        loop_warn_after=config.agents.defaults.loop_warn_after,
+        loop_stop_after=config.agents.defaults.loop_stop_after,
+        turn_timeout_s=config.agents.defaults.turn_timeout_s,
+        turn_token_budget=config.agents.defaults.turn_token_budget,
+        subagent_timeout_s=config.agents.defaults.subagent_timeout_s,
+        subagent_model=config.agents.defaults.subagent_model or None,
+        temperature=config.agents.defaults.temperature,
+        max_tokens=config.agents.defaults.max_tokens,
         brave_api_key=config.tools.web.search.api_key or None,
         exec_config=config.tools.exec,
+        search_config=config.tools.workspace_search,
         cron_service=cron,
         restrict_to_workspace=config.tools.restrict_to_workspace,
         session_manager=session_manager,
+        recorder=recorder,
     )
     
     # Set cron callback (needs agent)
@@ -268,12 +416,16 @@ def gateway(
                 agent.run(),
                 channels.start_all(),
             )
-        except KeyboardInterrupt:
+        except (KeyboardInterrupt, asyncio.CancelledError):
+            # asyncio.run() turns Ctrl+C into a cancellation of this task
             console.print("\nShutting down...")
             heartbeat.stop()
             cron.stop()
             agent.stop()
             await channels.stop_all()
+            await provider.aclose()
+            if recorder:
+                recorder.close()
     
     asyncio.run(run())
 
@@ -294,26 +446,43 @@ def agent(
     from nanobot.config.loader import load_config
     from nanobot.bus.queue import MessageBus
     from nanobot.agent.loop import AgentLoop
+    from nanobot.agent.tools.iopool import io_pool
+    from nanobot.providers.errors import LLMError
     
     config = load_config()
     
     bus = MessageBus()
     provider = _make_provider(config)
+    io_pool.configure(config.tools.io_workers)
     
     agent_loop = AgentLoop(
         bus=bus,
         provider=provider,
         workspace=config.workspace_path,
+        loop_warn_after=config.agents.defaults.loop_warn_after,
+        loop_stop_after=config.agents.defaults.loop_stop_after,
+        turn_timeout_s=config.agents.defaults.turn_timeout_s,
+        turn_token_budget=config.agents.defaults.turn_token_budget,
+        subagent_timeout_s=config.agents.defaults.subagent_timeout_s,
+        subagent_model=config.agents.defaults.subagent_model or None,
+        temperature=config.agents.defaults.temperature,
+        max_tokens=config.agents.defaults.max_tokens,
         brave_api_key=config.tools.web.search.api_key or None,
         exec_config=config.tools.exec,
+        search_config=config.tools.workspace_search,
         restrict_to_workspace=config.tools.restrict_to_workspace,
     )
     
     if message:
         # Single message mode
         async def run_once():
-            response = await agent_loop.process_direct(message, session_id)
-            console.print(f"\n{__logo__} {response}")
+            try:
+                response = await agent_loop.process_direct(message, session_id)
+                console.print(f"\n{__logo__} {response}")
+            except LLMError as e:
+                console.print(f"[red]LLM error ({e.kind}): {e}[/red]")
+            finally:
+                agent_loop.stop()
         
         asyncio.run(run_once())
     else:
@@ -329,13 +498,85 @@ def agent(
                     
                     response = await agent_loop.process_direct(user_input, session_id)
                     console.print(f"\n{__logo__} {response}\n")
+                except LLMError as e:
+                    console.print(f"[red]LLM error ({e.kind}): {e}[/red]\n")
                 except KeyboardInterrupt:
                     console.print("\nGoodbye!")
                     break
+            agent_loop.stop()
         
         asyncio.run(run_interactive())
 
 
+@app.command()
+def replay(
+    log_path: Path = typer.Argument(..., help="Traffic log written by `nanobot gateway --record`"),
+    speed: float = typer.Option(1.0, "--speed", help="Timing multiplier (1 = original, 10 = 10x faster, 0 = no waiting)"),
+    live_tools: bool = typer.Option(False, "--live-tools", help="Execute tools for real (in a scratch workspace) instead of serving recorded results"),
+    live_fallback: bool = typer.Option(False, "--live-fallback", help="Execute unmatched tool calls for real (in a scratch workspace) instead of failing them"),
+    match_tool_names: bool = typer.Option(False, "--match-tool-names", help="Serve a recorded result for the same tool when the arguments differ"),
+):
+    """Replay recorded traffic against the agent with recorded LLM responses."""
+    import json
+    import tempfile
+
+    from nanobot.agent.loop import AgentLoop
+    from nanobot.bus.queue import MessageBus
+    from nanobot.config.loader import load_config
+    from nanobot.replay.replayer import (
+        ReplayProvider,
+        ReplayToolRegistry,
+        TrafficLog,
+        TrafficReplayer,
+    )
+    from nanobot.session.manager import SessionManager
+
+    config = load_config()
+    log = TrafficLog.load(log_path)
+    console.print(
+        f"{__logo__} Replaying {len(log.inbound)} messages, {len(log.llm)} LLM calls, "
+        f"{len(log.tools)} tool results (speed={speed})"
+    )
+
+    model = config.agents.defaults.model
+    provider = ReplayProvider(log.llm, speed=speed, default_model=model)
+    with tempfile.TemporaryDirectory(prefix="nanobot-replay-") as tmp:
+        workspace = config.workspace_path
+        if live_tools or live_fallback:
+            # Real tool runs must never touch the real workspace
+            workspace = Path(tmp) / "workspace"
+            workspace.mkdir()
+            console.print(f"Live tools run in scratch workspace {workspace}")
+        agent_loop = AgentLoop(
+            bus=MessageBus(),
+            provider=provider,
+            workspace=workspace,
+            model=model,
+            max_iterations=config.agents.defaults.max_tool_iterations,
+            loop_warn_after=config.agents.defaults.loop_warn_after,
+            loop_stop_after=config.agents.defaults.loop_stop_after,
+            turn_timeout_s=config.agents.defaults.turn_timeout_s,
+            turn_token_budget=config.agents.defaults.turn_token_budget,
+            subagent_timeout_s=config.agents.defaults.subagent_timeout_s,
+            exec_config=config.tools.exec,
+            search_config=config.tools.workspace_search,
+            restrict_to_workspace=config.tools.restrict_to_workspace or live_tools or live_fallback,
+            session_manager=SessionManager(workspace, sessions_dir=Path(tmp) / "sessions"),
+        )
+        if not live_tools:
+            agent_loop.tools = ReplayToolRegistry(
+                agent_loop.tools,
+                log.tools,
+                speed=speed,
+                match_by_name=match_tool_names,
+                live_fallback=live_fallback,
+            )
+
+        report = asyncio.run(TrafficReplayer(agent_loop, log, speed=speed).run())
+
+    console.print_json(json.dumps(report.summary()))
+
+
 # ============================================================================
 # Channel Commands
 # ============================================================================
@@ -657,6 +898,102 @@ def status():
         vllm_status = f"[green]✓ {config.providers.vllm.api_base}[/green]" if has_vllm else "[dim]not set[/dim]"
         console.print(f"vLLM/Local: {vllm_status}")
 
+        if config.llm.usage.enabled:
+            from nanobot.usage.store import since_days
+            t = _usage_store(config).totals(since_days(1))
+            console.print(
+                f"LLM usage (24h): {t['calls']} calls, {t['errors']} errors, "
+                f"{t['total_tokens']:,} tokens ({t['cached_tokens']:,} cached), "
+                f"avg latency {t['latency_avg_s']}s, p95 {t['latency_p95_s']}s"
+            )
+
+
+# ============================================================================
+# Usage
+# ============================================================================
+
+
+@app.command()
+def usage(
+    days: float = typer.Option(1.0, "--days", "-d", help="Look back this many days"),
+    by: str = typer.Option("model", "--by", "-b", help="Group by: session, channel, sender, model, origin"),
+    limit: int = typer.Option(20, "--limit", "-n", help="Max rows"),
+):
+    """Show LLM usage and latency per model, session, channel, sender or origin."""
+    from nanobot.config.loader import load_config
+    from nanobot.usage.store import GROUP_KEYS, since_days
+
+    if by not in GROUP_KEYS:
+        console.print(f"[red]--by must be one of: {', '.join(GROUP_KEYS)}[/red]")
+        raise typer.Exit(1)
+
+    config = load_config()
+    rows = _usage_store(config).summarize(since_days(days), by=by)
+    if not rows:
+        console.print("No LLM calls recorded.")
+        return
+
+    table = Table(title=f"LLM usage, last {days:g} day(s), by {by}")
+    table.add_column(by.capitalize(), style="cyan")
+    table.add_column("Calls", justify="right")
+    table.add_column("Errors", justify="right")
+    table.add_column("Prompt", justify="right")
+    table.add_column("Completion", justify="right")
+    table.add_column("Cached", justify="right")
+    table.add_column("Latency total", justify="right")
+    table.add_column("Avg", justify="right")
+    table.add_column("p95", justify="right")
+
+    for r in rows[:limit]:
+        table.add_row(
+            r["key"],
+            str(r["calls"]),
+            str(r["errors"]),
+            f"{r['prompt_tokens']:,}",
+            f"{r['completion_tokens']:,}",
+            f"{r['cached_tokens']:,}",
+            f"{r['latency_total_s']:.1f}s",
+            f"{r['latency_avg_s']:.2f}s",
+            f"{r['latency_p95_s']:.2f}s",
+        )
+
+    console.print(table)
+
+
+@app.command("stub-llm")
+def stub_llm(
+    port: int = typer.Option(8800, "--port", "-p", help="Port to listen on"),
+    host: str = typer.Option("127.0.0.1", "--host", help="Interface to bind"),
+    script: Path | None = typer.Option(None, "--script", "-s", help='JSON file with {"rules": [...], "responses": [...]}'),
+    ttft: float = typer.Option(0.0, "--ttft", help="Seconds before the first token"),
+    tps: float = typer.Option(0.0, "--tps", help="Tokens per second after the first token (0 = instant)"),
+    error_rate: float = typer.Option(0.0, "--error-rate", help="Fraction of calls answered with a 500"),
+    rate_limit_rate: float = typer.Option(0.0, "--429-rate", help="Fraction of calls answered with a 429"),
+    retry_after: float = typer.Option(1.0, "--retry-after", help="Retry-After seconds sent with 429s"),
+    seed: int | None = typer.Option(None, "--seed", help="Seed for reproducible fault injection"),
+):
+    """Serve a scripted OpenAI-compatible LLM stand-in for offline testing."""
+    from nanobot.providers.stub import StubModel, StubProfile, StubServer
+
+    profile = StubProfile(
+        ttft_s=ttft,
+        tokens_per_s=tps,
+        error_rate=error_rate,
+        rate_limit_rate=rate_limit_rate,
+        retry_after_s=retry_after,
+        seed=seed,
+    )
+    model = StubModel.from_file(script, profile) if script else StubModel(profile=profile)
+    server = StubServer(model, host=host, port=port)
+    console.print(f"{__logo__} Stub LLM listening on {server.url}")
+    console.print(f'Point a provider at it, e.g. providers.vllm.apiBase = "{server.url}" with model "vllm/stub"')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        console.print(f"\nServed {model.calls} call(s)")
+    finally:
+        server.server_close()
+
 
 if __name__ == "__main__":
     app()
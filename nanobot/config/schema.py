@@ -5,11 +5,31 @@ from pydantic import BaseModel, Field
 from pydantic_settings import BaseSettings
 
 
+class OutboundConfig(BaseModel):
+    """Shared outbound delivery settings. Unset limits use the channel's platform defaults."""
+    coalesce_ms: int = 0  # Merge messages to the same chat arriving within this window (0 = off)
+    rate: float | None = None  # Messages per second across the whole channel
+    burst: int | None = None
+    chat_rate: float | None = None  # Messages per second per chat
+    chat_burst: int | None = None
+    max_length: int | None = None  # Split messages longer than this many characters
+
+
+class DedupConfig(BaseModel):
+    """Inbound deduplication of redelivered platform events, keyed on message_id."""
+    enabled: bool = True
+    ttl_s: int = 3600  # How long a message ID is remembered
+    max_entries: int = 5000
+    persist: bool = False  # Keep seen IDs across restarts (~/.nanobot/dedup/<channel>.log)
+
+
 class WhatsAppConfig(BaseModel):
     """WhatsApp channel configuration."""
     enabled: bool = False
     bridge_url: str = "ws://localhost:3001"
     allow_from: list[str] = Field(default_factory=list)  # Allowed phone numbers
+    outbound: OutboundConfig = Field(default_factory=OutboundConfig)
+    dedup: DedupConfig = Field(default_factory=DedupConfig)
 
 
 class TelegramConfig(BaseModel):
@@ -18,6 +38,8 @@ class TelegramConfig(BaseModel):
     token: str = ""  # Bot token from @BotFather
     allow_from: list[str] = Field(default_factory=list)  # Allowed user IDs or usernames
     proxy: str | None = None  # HTTP/SOCKS5 proxy URL, e.g. "http://127.0.0.1:7890" or "socks5://127.0.0.1:1080"
+    outbound: OutboundConfig = Field(default_factory=OutboundConfig)
+    dedup: DedupConfig = Field(default_factory=DedupConfig)
 
 
 class FeishuConfig(BaseModel):
@@ -28,6 +50,8 @@ class FeishuConfig(BaseModel):
     encrypt_key: str = ""  # Encrypt Key for event subscription (optional)
     verification_token: str = ""  # Verification Token for event subscription (optional)
     allow_from: list[str] = Field(default_factory=list)  # Allowed user open_ids
+    outbound: OutboundConfig = Field(default_factory=OutboundConfig)
+    dedup: DedupConfig = Field(default_factory=DedupConfig)
 
 
 class DiscordConfig(BaseModel):
@@ -37,6 +61,8 @@ class DiscordConfig(BaseModel):
     allow_from: list[str] = Field(default_factory=list)  # Allowed user IDs
     gateway_url: str = "wss://gateway.discord.gg/?v=10&encoding=json"
     intents: int = 37377  # GUILDS + GUILD_MESSAGES + DIRECT_MESSAGES + MESSAGE_CONTENT
+    outbound: OutboundConfig = Field(default_factory=OutboundConfig)
+    dedup: DedupConfig = Field(default_factory=DedupConfig)
 
 
 class ChannelsConfig(BaseModel):
@@ -51,9 +77,15 @@ class AgentDefaults(BaseModel):
     """Default agent configuration."""
     workspace: str = "~/.nanobot/workspace"
     model: str = "anthropic/claude-opus-4-5"
+    subagent_model: str = ""  # Model for spawned subagents (empty = same as model)
     max_tokens: int = 8192
     temperature: float = 0.7
     max_tool_iterations: int = 20
+    loop_warn_after: int = 3  # Hint the model after the same tool call(s) repeat this often (0 = off)
+    loop_stop_after: int = 5  # Force a final answer without tools after this many repeats (0 = off)
+    turn_timeout_s: float = 300.0  # Wall-clock limit per user message, including the final summary (0 = none)
+    turn_token_budget: int = 0  # Token limit per user message or subagent task (0 = none)
+    subagent_timeout_s: float = 900.0  # Wall-clock limit per subagent task (0 = none)
 
 
 class AgentsConfig(BaseModel):
@@ -66,6 +98,7 @@ class ProviderConfig(BaseModel):
     api_key: str = ""
     api_base: str | None = None
     extra_headers: dict[str, str] | None = None  # Custom headers (e.g. APP-Code for AiHubMix)
+    api_bases: list[str] = Field(default_factory=list)  # Extra replicas of api_base to load-balance over
 
 
 class ProvidersConfig(BaseModel):
@@ -83,6 +116,114 @@ class ProvidersConfig(BaseModel):
     aihubmix: ProviderConfig = Field(default_factory=ProviderConfig)  # AiHubMix API gateway
 
 
+class HttpPoolConfig(BaseModel):
+    """Pooled keep-alive HTTP transport used for LLM calls."""
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 120.0  # Seconds an idle connection is kept open
+    http2: bool = True  # Requires the 'h2' package; falls back to HTTP/1.1
+    connect_timeout: float = 10.0
+    read_timeout: float = 600.0
+    pool_timeout: float = 30.0  # Max wait for a free connection from the pool
+
+
+class RetryConfig(BaseModel):
+    """Retries, hedging and circuit breaking for LLM calls."""
+    max_retries: int = 2  # Per endpoint, for transient errors (429, 5xx, timeouts)
+    backoff_base_s: float = 0.5  # Exponential backoff: base * 2^attempt, with jitter
+    backoff_max_s: float = 8.0
+    hedge_after_s: float = 0.0  # Send a duplicate request if no answer after this long (0 = off)
+    circuit_failures: int = 5  # Consecutive failures before an endpoint is skipped
+    circuit_reset_s: float = 30.0  # How long an open circuit skips the endpoint
+
+
+class FailoverRule(BaseModel):
+    """Ordered fallback models for one primary model ("*" matches any model)."""
+    model: str = "*"
+    fallbacks: list[str] = Field(default_factory=list)  # e.g. ["openrouter/anthropic/claude-opus-4-5"]
+
+
+class RateLimitConfig(BaseModel):
+    """Client-side request/token budget for models whose name contains `model` ("*" = any)."""
+    model: str = "*"  # e.g. "anthropic/", "gpt-4o" or "*"
+    rpm: int = 0  # Requests per minute (0 = unlimited)
+    tpm: int = 0  # Tokens per minute, estimated from the request payload (0 = unlimited)
+    burst_s: float = 60.0  # Seconds of budget usable back-to-back; lower for per-second enforcement
+
+
+class RouteRuleConfig(BaseModel):
+    """Route matching calls to a cheaper model. Empty criteria match anything."""
+    model: str = ""  # Target model, e.g. "anthropic/claude-haiku-4-5"
+    channels: list[str] = Field(default_factory=list)  # e.g. ["telegram"]
+    origins: list[str] = Field(default_factory=list)  # user, cron, heartbeat, subagent, system
+    max_chars: int = 0  # Only when the latest user message is at most this long (0 = any)
+    tools: bool | None = None  # Only when tools are (true) / are not (false) offered
+
+
+class RouterConfig(BaseModel):
+    """Cheap-first model routing; the first matching rule wins."""
+    rules: list[RouteRuleConfig] = Field(default_factory=list)
+    escalate_on_error: bool = True  # Retry on the default model when the routed model fails
+    escalate_marker: str = "[ESCALATE]"  # Routed model may reply with this to hand over ("" = off)
+
+
+class ResponseCacheConfig(BaseModel):
+    """Exact-match cache of LLM responses (opt-in)."""
+    enabled: bool = False
+    ttl_s: int = 3600
+    max_entries: int = 512  # In-memory LRU size
+    persist: bool = True  # Also store entries on disk (~/.nanobot/llm_cache)
+    force: bool = False  # Cache even when temperature > 0
+
+
+class UsageConfig(BaseModel):
+    """Per-call usage and latency accounting (~/.nanobot/usage)."""
+    enabled: bool = True
+    retention_days: int = 30  # Daily files older than this are deleted (0 = keep forever)
+
+
+class BalancerConfig(BaseModel):
+    """Load balancing over a provider's api_base replicas (see ProviderConfig.api_bases)."""
+    sticky: bool = True  # Keep each session on one replica to reuse its prefix cache
+    max_skew: int = 4  # Leave the sticky replica when it has this many more in-flight calls than the least busy
+    health_interval_s: float = 10.0  # Probe interval for replicas marked down
+
+
+class StubLLMConfig(BaseModel):
+    """Offline stand-in used when llm.backend is "stub" (see `nanobot stub-llm`)."""
+    script: str = ""  # JSON file with {"rules": [...], "responses": [...]}; empty = echo
+    ttft_s: float = 0.0
+    tokens_per_s: float = 0.0  # 0 = instant
+    error_rate: float = 0.0  # Fraction of calls failing with a 500
+    rate_limit_rate: float = 0.0  # Fraction of calls failing with a 429
+    seed: int | None = None
+
+
+class LLMConfig(BaseModel):
+    """LLM call runtime settings shared by all providers."""
+    backend: str = "litellm"  # "litellm", "openai" (native OpenAI-compatible client, no LiteLLM import) or "stub" (offline)
+    http: HttpPoolConfig = Field(default_factory=HttpPoolConfig)
+    retry: RetryConfig = Field(default_factory=RetryConfig)
+    failover: list[FailoverRule] = Field(default_factory=list)
+    rate_limits: list[RateLimitConfig] = Field(default_factory=list)  # First matching rule applies
+    router: RouterConfig = Field(default_factory=RouterConfig)
+    cache: ResponseCacheConfig = Field(default_factory=ResponseCacheConfig)
+    usage: UsageConfig = Field(default_factory=UsageConfig)
+    balancer: BalancerConfig = Field(default_factory=BalancerConfig)
+    stub: StubLLMConfig = Field(default_factory=StubLLMConfig)
+
+
+class TranscriptionConfig(BaseModel):
+    """Voice message transcription through a Whisper-compatible API."""
+    api_url: str = ""  # Empty = Groq; any OpenAI-compatible /audio/transcriptions URL works
+    api_key: str = ""  # Empty = providers.groq.apiKey
+    model: str = "whisper-large-v3"
+    cache: bool = True  # Reuse transcripts of identical audio (~/.nanobot/transcripts)
+    chunk_mb: float = 8.0  # Split larger recordings (needs ffmpeg)
+    chunk_seconds: int = 300  # Segment length when splitting
+    max_concurrency: int = 4  # Parallel uploads across all channels
+
+
 class GatewayConfig(BaseModel):
     """Gateway/server configuration."""
     host: str = "0.0.0.0"
@@ -103,13 +244,31 @@ class WebToolsConfig(BaseModel):
 class ExecToolConfig(BaseModel):
     """Shell exec tool configuration."""
     timeout: int = 60
+    max_output: int = 10000  # Bytes of stdout kept (first 40% + last 60%); stderr gets half
+    progress_interval_s: int = 0  # Post progress to the chat every N seconds for long commands (0 = off)
+    persistent_shell: bool = False  # One long-lived shell per chat session; cd/export carry over
+    max_shells: int = 8  # Live persistent shells; the least recently used idle one is closed
+    shell_idle_timeout_s: int = 600  # Close a persistent shell after this long unused
+    background_jobs: bool = True  # exec(background=true) plus the `jobs` tool
+    job_timeout_s: int = 3600  # Kill background jobs running longer than this
+    max_jobs: int = 8  # Background jobs running at once
+    notify_jobs: bool = True  # Report finished background jobs back to the chat
+
+
+class WorkspaceSearchConfig(BaseModel):
+    """Indexed workspace `search` tool configuration."""
+    enabled: bool = True
+    max_file_kb: int = 1024  # Larger files are not indexed
+    rescan_interval_s: float = 2.0  # Minimum time between mtime scans of the workspace
 
 
 class ToolsConfig(BaseModel):
     """Tools configuration."""
     web: WebToolsConfig = Field(default_factory=WebToolsConfig)
     exec: ExecToolConfig = Field(default_factory=ExecToolConfig)
+    workspace_search: WorkspaceSearchConfig = Field(default_factory=WorkspaceSearchConfig)
     restrict_to_workspace: bool = False  # If true, restrict all tool access to workspace directory
+    io_workers: int = 8  # Worker threads for file tool I/O, shared by all turns
 
 
 class Config(BaseSettings):
@@ -117,6 +276,8 @@ class Config(BaseSettings):
     agents: AgentsConfig = Field(default_factory=AgentsConfig)
     channels: ChannelsConfig = Field(default_factory=ChannelsConfig)
     providers: ProvidersConfig = Field(default_factory=ProvidersConfig)
+    llm: LLMConfig = Field(default_factory=LLMConfig)
+    transcription: TranscriptionConfig = Field(default_factory=TranscriptionConfig)
     gateway: GatewayConfig = Field(default_factory=GatewayConfig)
     tools: ToolsConfig = Field(default_factory=ToolsConfig)
     
@@ -142,7 +303,8 @@ class Config(BaseSettings):
             "groq": p.groq, "moonshot": p.moonshot, "kimi": p.moonshot, "vllm": p.vllm,
         }
         for kw, provider in keyword_map.items():
-            if kw in model and provider.api_key:
+            # Local endpoints (vLLM) may need only api_base
+            if kw in model and (provider.api_key or (kw == "vllm" and (provider.api_base or provider.api_bases))):
                 return provider
         # Fallback: gateways first (can serve any model), then specific providers
         all_providers = [p.openrouter, p.aihubmix, p.anthropic, p.openai, p.deepseek,
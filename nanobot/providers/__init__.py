@@ -1,6 +1,28 @@
 """LLM provider abstraction module."""
 
+from typing import TYPE_CHECKING
+
 from nanobot.providers.base import LLMProvider, LLMResponse
-from nanobot.providers.litellm_provider import LiteLLMProvider
+from nanobot.providers.errors import LLMError
+from nanobot.providers.failover import FailoverProvider
+from nanobot.providers.registry import ProviderRegistry
+
+if TYPE_CHECKING:
+    from nanobot.providers.litellm_provider import LiteLLMProvider
+    from nanobot.providers.openai_compat import OpenAICompatProvider
+
+__all__ = [
+    "LLMProvider", "LLMResponse", "LLMError", "FailoverProvider", "ProviderRegistry",
+    "LiteLLMProvider", "OpenAICompatProvider",
+]
+
 
-__all__ = ["LLMProvider", "LLMResponse", "LiteLLMProvider"]
+def __getattr__(name: str):
+    # Importing litellm takes seconds; only pay for it when LiteLLMProvider is used.
+    if name == "LiteLLMProvider":
+        from nanobot.providers.litellm_provider import LiteLLMProvider
+        return LiteLLMProvider
+    if name == "OpenAICompatProvider":
+        from nanobot.providers.openai_compat import OpenAICompatProvider
+        return OpenAICompatProvider
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,168 @@
+"""Session-affine load balancing across replicas of one OpenAI-compatible backend."""
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+from loguru import logger
+
+from nanobot.providers.base import LLMProvider, LLMResponse
+from nanobot.providers.context import current_call
+from nanobot.providers.errors import LLMError
+from nanobot.providers.http_pool import HTTPPool
+from nanobot.utils.metrics import metrics
+
+
+@dataclass
+class Replica:
+    """One backend replica and its live routing state."""
+    url: str
+    provider: LLMProvider
+    outstanding: int = 0
+    healthy: bool = True
+    requests: int = 0
+    failures: int = 0
+    checked_at: float = 0.0
+
+
+class LoadBalancedProvider(LLMProvider):
+    """
+    Spreads calls over replicas (vLLM, Ollama, ...) serving the same models.
+
+    - Least outstanding requests: a new conversation goes to the healthy
+      replica with the fewest in-flight calls.
+    - Session affinity: later turns of the same session_key (from the
+      CallContext) stick to the replica that served it, so its KV prefix
+      cache is reused. Affinity is dropped when that replica is unhealthy
+      or has `max_skew` more in-flight calls than the least busy one.
+    - Health checks: a replica failing with a connection or server error
+      is marked down and probed with GET {url}/models every
+      `health_interval` seconds until it answers again.
+
+    Metrics: llm.lb.requests, llm.lb.sticky_hits, llm.lb.marked_down.
+    """
+
+    def __init__(
+        self,
+        replicas: list[tuple[str, LLMProvider]],
+        http_pool: HTTPPool | None = None,
+        health_interval: float = 10.0,
+        sticky: bool = True,
+        max_skew: int = 4,
+        max_sessions: int = 10000,
+    ):
+        if not replicas:
+            raise ValueError("at least one replica is required")
+        super().__init__(replicas[0][1].api_key, replicas[0][0])
+        self.replicas = [Replica(url=url.rstrip("/"), provider=p) for url, p in replicas]
+        self.http_pool = http_pool or HTTPPool(name="llm_health")
+        self.health_interval = health_interval
+        self.sticky = sticky
+        self.max_skew = max_skew
+        self.max_sessions = max_sessions
+        self._affinity: OrderedDict[str, int] = OrderedDict()
+        self._health_task: asyncio.Task[None] | None = None
+
+    def pick(self, session_key: str = "") -> Replica:
+        """Choose the replica for a call."""
+        candidates = [r for r in self.replicas if r.healthy] or self.replicas
+        least = min(candidates, key=lambda r: r.outstanding)
+
+        if self.sticky and session_key:
+            idx = self._affinity.get(session_key)
+            if idx is not None:
+                replica = self.replicas[idx]
+                if replica in candidates and replica.outstanding - least.outstanding <= self.max_skew:
+                    self._affinity.move_to_end(session_key)
+                    metrics.incr("llm.lb.sticky_hits")
+                    return replica
+            self._affinity[session_key] = self.replicas.index(least)
+            self._affinity.move_to_end(session_key)
+            while len(self._affinity) > self.max_sessions:
+                self._affinity.popitem(last=False)
+        return least
+
+    def _mark_down(self, replica: Replica, reason: str) -> None:
+        if replica.healthy:
+            replica.healthy = False
+            metrics.incr("llm.lb.marked_down")
+            logger.warning(f"LLM replica {replica.url} marked down: {reason}")
+        self._ensure_health_task()
+
+    def _ensure_health_task(self) -> None:
+        if self._health_task is None or self._health_task.done():
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    async def check(self, replica: Replica) -> bool:
+        """Probe one replica; updates and returns its health."""
+        replica.checked_at = time.monotonic()
+        try:
+            resp = await self.http_pool.client.get(f"{replica.url}/models", timeout=5.0)
+            ok = resp.status_code < 500
+        except Exception:
+            ok = False
+        if ok and not replica.healthy:
+            logger.info(f"LLM replica {replica.url} is back up")
+        replica.healthy = ok
+        return ok
+
+    async def _health_loop(self) -> None:
+        while any(not r.healthy for r in self.replicas):
+            await asyncio.sleep(self.health_interval)
+            await asyncio.gather(*(self.check(r) for r in self.replicas if not r.healthy))
+
+    async def chat(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None = None,
+        model: str | None = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+    ) -> LLMResponse:
+        replica = self.pick(current_call().session_key)
+        replica.outstanding += 1
+        replica.requests += 1
+        metrics.incr("llm.lb.requests")
+        try:
+            return await replica.provider.chat(
+                messages=messages,
+                tools=tools,
+                model=model,
+                max_tokens=max_tokens,
+                temperature=temperature,
+            )
+        except LLMError as e:
+            replica.failures += 1
+            if e.kind in ("connection", "timeout", "server"):
+                self._mark_down(replica, f"{e.kind}: {e}")
+            raise
+        finally:
+            replica.outstanding -= 1
+
+    def status(self) -> list[dict[str, Any]]:
+        """Per-replica routing state."""
+        return [
+            {
+                "url": r.url,
+                "healthy": r.healthy,
+                "outstanding": r.outstanding,
+                "requests": r.requests,
+                "failures": r.failures,
+            }
+            for r in self.replicas
+        ]
+
+    def get_default_model(self) -> str:
+        return self.replicas[0].provider.get_default_model()
+
+    async def aclose(self) -> None:
+        if self._health_task:
+            self._health_task.cancel()
+            self._health_task = None
+        closed: set[int] = set()
+        for r in self.replicas:
+            if id(r.provider) not in closed:
+                closed.add(id(r.provider))
+                await r.provider.aclose()
@@ -67,3 +67,7 @@ class LLMProvider(ABC):
     def get_default_model(self) -> str:
         """Get the default model for this provider."""
         pass
+
+    async def aclose(self) -> None:
+        """Release network resources (connection pools). Default: nothing to do."""
+        pass
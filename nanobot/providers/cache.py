@@ -0,0 +1,230 @@
+"""Exact-match LLM response cache."""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+from nanobot.providers.base import LLMProvider, LLMResponse, ToolCallRequest
+from nanobot.utils.metrics import metrics
+
+# The system prompt's clock line, e.g. "2026-10-19 08:41 (Monday)"
+_CLOCK = re.compile(r"\b(\d{4}-\d{2}-\d{2}) \d{2}:\d{2} (\(\w+\))")
+
+
+def _without_clock(messages: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Drop the minute from the system prompt's timestamp (keeping the date) so it doesn't defeat the cache."""
+    out = []
+    for msg in messages:
+        content = msg.get("content")
+        if msg.get("role") == "system" and isinstance(content, str):
+            msg = {**msg, "content": _CLOCK.sub(r"\1 \2", content)}
+        out.append(msg)
+    return out
+
+
+def cache_key(
+    model: str,
+    messages: list[dict[str, Any]],
+    tools: list[dict[str, Any]] | None,
+    max_tokens: int,
+    temperature: float,
+) -> str:
+    """Canonical sha256 of everything that determines a completion (the clock to the day)."""
+    payload = json.dumps(
+        {
+            "model": model,
+            "messages": _without_clock(messages),
+            "tools": tools or [],
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _to_dict(response: LLMResponse) -> dict[str, Any]:
+    return {
+        "content": response.content,
+        "tool_calls": [{"id": tc.id, "name": tc.name, "arguments": tc.arguments} for tc in response.tool_calls],
+        "finish_reason": response.finish_reason,
+        "usage": response.usage,
+    }
+
+
+def _from_dict(data: dict[str, Any]) -> LLMResponse:
+    return LLMResponse(
+        content=data.get("content"),
+        tool_calls=[ToolCallRequest(**tc) for tc in data.get("tool_calls", [])],
+        finish_reason=data.get("finish_reason", "stop"),
+        usage=data.get("usage", {}),
+    )
+
+
+class ResponseCache:
+    """
+    In-memory LRU of LLM responses with optional on-disk storage.
+
+    Entries expire `ttl_s` seconds after they were stored. On disk each
+    entry is one small JSON file under `path/<2-char prefix>/<key>.json`,
+    so a restart keeps warm answers for heartbeat and cron prompts.
+    """
+
+    def __init__(self, max_entries: int = 512, ttl_s: float = 3600.0, path: Path | None = None):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.path = Path(path).expanduser() if path else None
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+        if self.path:
+            self.path.mkdir(parents=True, exist_ok=True)
+            self.prune()
+
+    def _file(self, key: str) -> Path:
+        assert self.path is not None
+        return self.path / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> LLMResponse | None:
+        """Cached response for `key`, or None if missing or expired."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry[0] <= self.ttl_s:
+                    self._entries.move_to_end(key)
+                    return _from_dict(entry[1])
+                del self._entries[key]
+
+        if self.path is None:
+            return None
+        file = self._file(key)
+        try:
+            stored = json.loads(file.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return None
+        if now - stored["t"] > self.ttl_s:
+            file.unlink(missing_ok=True)
+            return None
+        self._remember(key, stored["t"], stored["response"])
+        return _from_dict(stored["response"])
+
+    def put(self, key: str, response: LLMResponse) -> None:
+        """Store a response."""
+        now = time.time()
+        data = _to_dict(response)
+        self._remember(key, now, data)
+        if self.path is None:
+            return
+        file = self._file(key)
+        try:
+            file.parent.mkdir(exist_ok=True)
+            tmp = file.with_suffix(".tmp")
+            tmp.write_text(json.dumps({"t": now, "response": data}, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, file)
+        except OSError as e:
+            logger.warning(f"LLM cache write failed: {e}")
+
+    def _remember(self, key: str, t: float, data: dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = (t, data)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def prune(self) -> int:
+        """Delete expired files from disk. Returns the number removed."""
+        if self.path is None:
+            return 0
+        cutoff = time.time() - self.ttl_s
+        removed = 0
+        for file in self.path.glob("*/*.json"):
+            try:
+                if file.stat().st_mtime < cutoff:
+                    file.unlink()
+                    removed += 1
+            except OSError:
+                continue
+        return removed
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class CachingProvider(LLMProvider):
+    """
+    Serves byte-identical requests from a ResponseCache.
+
+    Only deterministic calls are cached: when temperature > 0 the cache is
+    bypassed unless `force` is set. Keys use the model this provider is
+    asked for, so it belongs below any RouterProvider, where that is the
+    model that actually answers.
+
+    Metrics: llm.cache.hits, llm.cache.misses, llm.cache.bypassed.
+    """
+
+    def __init__(self, inner: LLMProvider, cache: ResponseCache, force: bool = False):
+        super().__init__(inner.api_key, inner.api_base)
+        self.inner = inner
+        self.cache = cache
+        self.force = force
+
+    async def chat(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None = None,
+        model: str | None = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+    ) -> LLMResponse:
+        model = model or self.get_default_model()
+        kwargs = {
+            "messages": messages,
+            "tools": tools,
+            "model": model,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+        }
+        if temperature > 0 and not self.force:
+            metrics.incr("llm.cache.bypassed")
+            return await self.inner.chat(**kwargs)
+
+        key = cache_key(model, messages, tools, max_tokens, temperature)
+        cached = self.cache.get(key)
+        if cached is not None:
+            metrics.incr("llm.cache.hits")
+            logger.debug(f"LLM cache hit {key[:12]}")
+            return cached
+
+        metrics.incr("llm.cache.misses")
+        response = await self.inner.chat(**kwargs)
+        if response.finish_reason != "error":
+            self.cache.put(key, response)
+        return response
+
+    def stats(self) -> dict[str, float]:
+        hits = metrics.counter("llm.cache.hits")
+        misses = metrics.counter("llm.cache.misses")
+        return {
+            "hits": hits,
+            "misses": misses,
+            "bypassed": metrics.counter("llm.cache.bypassed"),
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "entries": len(self.cache),
+        }
+
+    def get_default_model(self) -> str:
+        return self.inner.get_default_model()
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
@@ -0,0 +1,60 @@
+"""Per-turn call context visible to provider wrappers."""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Iterator
+
+from nanobot.bus.events import InboundMessage
+
+
+@dataclass
+class CallContext:
+    """
+    Who an LLM call is made for.
+
+    Set by the agent loop for the duration of a turn and read by provider
+    wrappers (routing, usage accounting) without widening the
+    `LLMProvider.chat` signature. Being a ContextVar, it follows asyncio
+    tasks, so concurrent subagents each see their own context.
+    """
+    origin: str = "user"  # user, cron, heartbeat, subagent, system
+    channel: str = ""
+    chat_id: str = ""
+    sender_id: str = ""
+    session_key: str = ""
+    escalated: bool = False  # Set by the router once a turn moved to the large model
+
+    @classmethod
+    def from_inbound(cls, msg: InboundMessage) -> "CallContext":
+        default_origin = "system" if msg.channel == "system" else "user"
+        return cls(
+            origin=msg.metadata.get("origin", default_origin),
+            channel=msg.channel,
+            chat_id=msg.chat_id,
+            sender_id=msg.sender_id,
+            session_key=msg.metadata.get("session_key", msg.session_key),
+        )
+
+
+_current: ContextVar[CallContext | None] = ContextVar("nanobot_call_context", default=None)
+
+
+def current_call() -> CallContext:
+    """The active call context (an empty one outside of any turn)."""
+    return _current.get() or CallContext()
+
+
+def set_call_context(ctx: CallContext) -> None:
+    """Make `ctx` the active call context for the rest of the current task."""
+    _current.set(ctx)
+
+
+@contextmanager
+def call_context(ctx: CallContext) -> Iterator[CallContext]:
+    """Make `ctx` the active call context inside the block."""
+    token = _current.set(ctx)
+    try:
+        yield ctx
+    finally:
+        _current.reset(token)
@@ -0,0 +1,143 @@
+"""Typed LLM call failures."""
+
+import asyncio
+from typing import Any
+
+
+class LLMError(Exception):
+    """
+    A failed LLM call.
+
+    Attributes:
+        retryable: The same endpoint may succeed if called again (429, 5xx, timeouts).
+        failover: Another endpoint/model may succeed (everything except malformed requests).
+        status_code: HTTP status if one was returned.
+        retry_after: Server-suggested wait in seconds, if any.
+    """
+
+    retryable = False
+    failover = True
+    kind = "error"  # Short label used in metrics
+
+    def __init__(
+        self,
+        message: str,
+        status_code: int | None = None,
+        retry_after: float | None = None,
+        provider: str | None = None,
+    ):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.provider = provider
+
+
+class LLMRateLimitError(LLMError):
+    """429 Too Many Requests."""
+    retryable = True
+    kind = "rate_limit"
+
+
+class LLMTimeoutError(LLMError):
+    """The request timed out."""
+    retryable = True
+    kind = "timeout"
+
+
+class LLMConnectionError(LLMError):
+    """The endpoint could not be reached."""
+    retryable = True
+    kind = "connection"
+
+
+class LLMServerError(LLMError):
+    """5xx from the provider, including Anthropic's 529 Overloaded."""
+    retryable = True
+    kind = "server"
+
+
+class LLMAuthError(LLMError):
+    """401/403: bad or missing credentials. Not retried, but another provider may work."""
+    kind = "auth"
+
+
+class LLMBadRequestError(LLMError):
+    """4xx caused by the request itself; retrying or failing over will not help."""
+    failover = False
+    kind = "bad_request"
+
+
+class LLMUnavailableError(LLMError):
+    """Every endpoint in the failover chain failed or had its circuit open."""
+    kind = "unavailable"
+
+    def __init__(self, message: str, errors: list[LLMError] | None = None):
+        last = errors[-1] if errors else None
+        super().__init__(
+            message,
+            status_code=last.status_code if last else None,
+            retry_after=last.retry_after if last else None,
+        )
+        self.errors = errors or []
+
+
+def parse_retry_after(value: Any) -> float | None:
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def error_from_status(
+    status_code: int,
+    message: str,
+    retry_after: float | None = None,
+    provider: str | None = None,
+) -> LLMError:
+    """Map an HTTP status code to the matching LLMError subclass."""
+    if status_code == 429:
+        cls: type[LLMError] = LLMRateLimitError
+    elif status_code == 408:
+        cls = LLMTimeoutError
+    elif status_code >= 500:
+        cls = LLMServerError
+    elif status_code in (401, 403):
+        cls = LLMAuthError
+    elif status_code in (400, 413, 422):
+        cls = LLMBadRequestError
+    else:
+        cls = LLMError
+    return cls(message, status_code=status_code, retry_after=retry_after, provider=provider)
+
+
+# Exception class names (LiteLLM, OpenAI SDK, httpx) that carry no status code
+_TIMEOUT_NAMES = {"Timeout", "APITimeoutError", "TimeoutException", "ReadTimeout", "ConnectTimeout", "PoolTimeout"}
+_CONNECTION_NAMES = {"APIConnectionError", "ConnectError", "RemoteProtocolError", "ReadError", "WriteError"}
+
+
+def classify_error(exc: BaseException, provider: str | None = None) -> LLMError:
+    """
+    Convert any exception raised by a provider SDK into an LLMError.
+
+    Works by duck typing (`status_code`, `response.headers`, class names) so
+    that this module does not need to import LiteLLM or the OpenAI SDK.
+    """
+    if isinstance(exc, LLMError):
+        return exc
+
+    message = str(exc) or type(exc).__name__
+    names = {cls.__name__ for cls in type(exc).__mro__}
+
+    if isinstance(exc, (asyncio.TimeoutError, TimeoutError)) or names & _TIMEOUT_NAMES:
+        return LLMTimeoutError(message, status_code=408, provider=provider)
+    if names & _CONNECTION_NAMES or isinstance(exc, ConnectionError):
+        return LLMConnectionError(message, provider=provider)
+
+    response = getattr(exc, "response", None)
+    status = getattr(exc, "status_code", None) or getattr(response, "status_code", None)
+    if isinstance(status, int):
+        headers = getattr(response, "headers", None) or {}
+        retry_after = parse_retry_after(headers.get("retry-after")) if hasattr(headers, "get") else None
+        return error_from_status(status, message, retry_after=retry_after, provider=provider)
+
+    return LLMError(message, provider=provider)
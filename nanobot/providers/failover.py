@@ -0,0 +1,245 @@
+"""Retries, hedged requests and multi-provider failover for LLM calls."""
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from loguru import logger
+
+from nanobot.providers.base import LLMProvider, LLMResponse
+from nanobot.providers.errors import LLMError, LLMUnavailableError, classify_error
+from nanobot.utils.metrics import metrics
+
+
+class CircuitBreaker:
+    """
+    Per-endpoint circuit breaker.
+
+    After `failure_threshold` consecutive transient failures the circuit
+    opens and calls are skipped for `reset_timeout` seconds. Then a single
+    probe is let through (half-open); its outcome closes or re-opens the
+    circuit.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Whether a call may be made now (claims the probe slot when half-open)."""
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def release_probe(self) -> None:
+        """Free the half-open probe slot without counting a result (e.g. the probe was cancelled)."""
+        self._probing = False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probing = False
+        if self._opened_at is not None or self.failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+
+
+@dataclass
+class Endpoint:
+    """One link of a failover chain: a provider plus the model to ask it for."""
+    name: str
+    provider: LLMProvider
+    model: str | None = None  # None = the model requested by the caller
+
+
+class FailoverProvider(LLMProvider):
+    """
+    Wraps a primary provider with retries, hedging and ordered failover.
+
+    For each requested model the chain is the primary provider followed by
+    `fallbacks[model]` (or `fallbacks["*"]`). Every endpoint is tried in
+    order; transient errors (429, 5xx, timeouts) are retried on the same
+    endpoint with exponential backoff and jitter, honouring Retry-After.
+    Malformed-request errors are raised immediately. When every endpoint
+    fails, LLMUnavailableError is raised; no error text is ever returned as
+    assistant content.
+
+    With `hedge_after` > 0, a call that has not answered after that many
+    seconds gets a duplicate request on the next healthy endpoint (or the
+    same one) and whichever answers first wins.
+
+    Metrics: llm.retries, llm.failovers, llm.errors.<kind>, llm.circuit_open,
+    llm.hedge.launched, llm.hedge.won.
+    """
+
+    def __init__(
+        self,
+        primary: LLMProvider,
+        fallbacks: dict[str, list[Endpoint]] | None = None,
+        max_retries: int = 2,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        hedge_after: float = 0.0,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+    ):
+        super().__init__(primary.api_key, primary.api_base)
+        self.primary = primary
+        self.fallbacks = fallbacks or {}
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge_after = hedge_after
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    def breaker(self, name: str) -> CircuitBreaker:
+        """The circuit breaker for an endpoint, created on first use."""
+        if name not in self._breakers:
+            self._breakers[name] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+        return self._breakers[name]
+
+    def chain(self, model: str) -> list[Endpoint]:
+        """Ordered endpoints to try for `model`."""
+        extra = self.fallbacks.get(model, self.fallbacks.get("*", []))
+        return [Endpoint(name=f"primary:{model}", provider=self.primary, model=model), *extra]
+
+    def _backoff(self, attempt: int, error: LLMError) -> float:
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        delay = random.uniform(delay / 2, delay)
+        if error.retry_after is not None:
+            delay = max(delay, min(error.retry_after, self.backoff_max))
+        return delay
+
+    async def chat(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None = None,
+        model: str | None = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+    ) -> LLMResponse:
+        model = model or self.get_default_model()
+        kwargs = {"messages": messages, "tools": tools, "max_tokens": max_tokens, "temperature": temperature}
+        chain = self.chain(model)
+        errors: list[LLMError] = []
+
+        for index, endpoint in enumerate(chain):
+            breaker = self.breaker(endpoint.name)
+            if not breaker.allow():
+                metrics.incr("llm.circuit_open")
+                logger.debug(f"LLM endpoint {endpoint.name} skipped: circuit open")
+                continue
+            if errors:
+                metrics.incr("llm.failovers")
+                logger.warning(f"LLM failover to {endpoint.name} after: {errors[-1]}")
+
+            for attempt in range(self.max_retries + 1):
+                try:
+                    return await self._attempt(endpoint, chain[index + 1:], model, kwargs)
+                except LLMError as e:
+                    errors.append(e)
+                    metrics.incr(f"llm.errors.{e.kind}")
+                    if e.retryable:
+                        breaker.record_failure()
+                    if not e.failover:
+                        raise
+                    if not e.retryable or attempt == self.max_retries or not breaker.allow():
+                        break
+                    delay = self._backoff(attempt, e)
+                    metrics.incr("llm.retries")
+                    logger.warning(f"LLM call to {endpoint.name} failed ({e.kind}), retrying in {delay:.1f}s: {e}")
+                    await asyncio.sleep(delay)
+
+        last = f": {errors[-1]}" if errors else " (all circuits open)"
+        raise LLMUnavailableError(f"All {len(chain)} LLM endpoint(s) failed for {model}{last}", errors)
+
+    async def _call(self, endpoint: Endpoint, model: str, kwargs: dict[str, Any]) -> LLMResponse:
+        breaker = self.breaker(endpoint.name)
+        try:
+            response = await endpoint.provider.chat(model=endpoint.model or model, **kwargs)
+        except BaseException as e:
+            # However the call ended (cancelled by a hedge or a deadline
+            # included), a half-open breaker must get its probe slot back;
+            # the caller counts retryable errors as failures
+            breaker.release_probe()
+            if isinstance(e, Exception):
+                raise classify_error(e) from e
+            raise
+        breaker.record_success()
+        return response
+
+    async def _attempt(
+        self,
+        endpoint: Endpoint,
+        rest: list[Endpoint],
+        model: str,
+        kwargs: dict[str, Any],
+    ) -> LLMResponse:
+        """One attempt on `endpoint`, hedged onto the next healthy endpoint when slow."""
+        if self.hedge_after <= 0:
+            return await self._call(endpoint, model, kwargs)
+
+        first = asyncio.create_task(self._call(endpoint, model, kwargs))
+        tasks = [first]
+        try:
+            done, _ = await asyncio.wait({first}, timeout=self.hedge_after)
+            if done:
+                return first.result()
+
+            hedge_endpoint = next((e for e in rest if self.breaker(e.name).state == "closed"), endpoint)
+            metrics.incr("llm.hedge.launched")
+            logger.debug(f"LLM call to {endpoint.name} slow, hedging on {hedge_endpoint.name}")
+            second = asyncio.create_task(self._call(hedge_endpoint, model, kwargs))
+            tasks.append(second)
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is second:
+                            metrics.incr("llm.hedge.won")
+                        return task.result()
+            # Both failed: surface the primary's error
+            return first.result()
+        finally:
+            # Also reached when the caller is cancelled (e.g. a turn budget running out)
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def get_default_model(self) -> str:
+        return self.primary.get_default_model()
+
+    def status(self) -> dict[str, str]:
+        """Circuit state per endpoint that has been used."""
+        return {name: b.state for name, b in self._breakers.items()}
+
+    async def aclose(self) -> None:
+        providers = [self.primary, *(e.provider for eps in self.fallbacks.values() for e in eps)]
+        closed: set[int] = set()
+        for provider in providers:
+            if id(provider) not in closed:
+                closed.add(id(provider))
+                await provider.aclose()
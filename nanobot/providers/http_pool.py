@@ -0,0 +1,118 @@
+"""Long-lived pooled HTTP client for LLM calls."""
+
+import time
+from typing import Any
+
+import httpx
+from loguru import logger
+
+from nanobot.utils.metrics import metrics
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class HTTPPool:
+    """
+    Owns one keep-alive `httpx.AsyncClient` shared by every call a provider makes.
+
+    Back-to-back tool iterations then reuse warm connections instead of
+    paying TCP + TLS setup each time. Connection setup is observed through
+    httpcore trace events, so the metrics distinguish requests served on a
+    reused connection from ones that had to open a new one:
+
+    - llm.http.requests / llm.http.connections_opened / llm.http.tls_handshakes
+    - llm.http.connect_s (summary of connect + TLS time for new connections)
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 120.0,
+        http2: bool = True,
+        connect_timeout: float = 10.0,
+        read_timeout: float = 600.0,
+        pool_timeout: float = 30.0,
+        name: str = "llm",
+    ):
+        if http2 and not HTTP2_AVAILABLE:
+            logger.warning("HTTP/2 requested but 'h2' is not installed; using HTTP/1.1. Run: pip install h2")
+            http2 = False
+        self.name = name
+        self.http2 = http2
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = httpx.Timeout(
+            read_timeout, connect=connect_timeout, write=read_timeout, pool=pool_timeout
+        )
+        self._client: httpx.AsyncClient | None = None
+
+    @classmethod
+    def from_config(cls, config: Any, name: str = "llm") -> "HTTPPool":
+        """Build from an HttpPoolConfig."""
+        return cls(
+            max_connections=config.max_connections,
+            max_keepalive_connections=config.max_keepalive_connections,
+            keepalive_expiry=config.keepalive_expiry,
+            http2=config.http2,
+            connect_timeout=config.connect_timeout,
+            read_timeout=config.read_timeout,
+            pool_timeout=config.pool_timeout,
+            name=name,
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The shared client, created on first use (and again if it was closed)."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=self.http2,
+                limits=self.limits,
+                timeout=self.timeout,
+                event_hooks={"request": [self._on_request]},
+            )
+        return self._client
+
+    async def _on_request(self, request: httpx.Request) -> None:
+        metrics.incr(f"{self.name}.http.requests")
+        started: dict[str, float] = {}
+        prefix = self.name
+
+        async def trace(event: str, info: dict[str, Any]) -> None:
+            # Only fired when httpcore opens a new connection
+            if event == "connection.connect_tcp.started":
+                started["t"] = time.monotonic()
+            elif event == "connection.connect_tcp.complete":
+                metrics.incr(f"{prefix}.http.connections_opened")
+                if request.url.scheme == "http" and "t" in started:
+                    metrics.observe(f"{prefix}.http.connect_s", time.monotonic() - started.pop("t"))
+            elif event == "connection.start_tls.complete":
+                metrics.incr(f"{prefix}.http.tls_handshakes")
+                if "t" in started:
+                    metrics.observe(f"{prefix}.http.connect_s", time.monotonic() - started.pop("t"))
+
+        request.extensions["trace"] = trace
+
+    def stats(self) -> dict[str, float]:
+        """Requests vs. new connections; `reused` counts requests on warm connections."""
+        requests = metrics.counter(f"{self.name}.http.requests")
+        opened = metrics.counter(f"{self.name}.http.connections_opened")
+        return {
+            "requests": requests,
+            "connections_opened": opened,
+            "tls_handshakes": metrics.counter(f"{self.name}.http.tls_handshakes"),
+            "reused": max(0, requests - opened),
+        }
+
+    async def aclose(self) -> None:
+        """Close the client and its connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
@@ -1,13 +1,15 @@
 """LiteLLM provider implementation for multi-provider support."""
 from loguru import logger
 from math import log
-import os
 from typing import Any
 
 import litellm
 from litellm import acompletion
+from litellm.llms.custom_httpx.http_handler import AsyncHTTPHandler
 
 from nanobot.providers.base import LLMProvider, LLMResponse, ToolCallRequest
+from nanobot.providers.errors import classify_error
+from nanobot.providers.http_pool import HTTPPool
 
 
 class LiteLLMProvider(LLMProvider):
@@ -15,7 +17,15 @@ class LiteLLMProvider(LLMProvider):
     LLM provider using LiteLLM for multi-provider support.
     
     Supports OpenRouter, Anthropic, OpenAI, Gemini, and many other providers through
-    a unified interface.
+    a unified interface. Each instance keeps its own credentials and endpoint,
+    passed per call rather than through environment variables.
+
+    One limitation: LiteLLM's OpenAI-SDK routes only take an HTTP client
+    through the process-global `litellm.aclient_session`. The first provider
+    with an `http_pool` claims it, and later providers with a different
+    pool share that client for those routes (native Anthropic calls always
+    use their own pool). The CLI builds every provider on one pool, so
+    this only matters when wiring providers by hand.
     """
     
     def __init__(
@@ -24,10 +34,15 @@ class LiteLLMProvider(LLMProvider):
         api_base: str | None = None,
         default_model: str = "anthropic/claude-opus-4-5",
         extra_headers: dict[str, str] | None = None,
+        http_pool: HTTPPool | None = None,
     ):
         super().__init__(api_key, api_base)
         self.default_model = default_model
         self.extra_headers = extra_headers or {}
+        # Long-lived keep-alive client; None leaves connection handling to LiteLLM
+        self.http_pool = http_pool
+        self._anthropic_handler: AsyncHTTPHandler | None = None
+        self._warned_shared_session = False
         
         # Detect OpenRouter by api_key prefix or explicit api_base
         self.is_openrouter = (
@@ -46,39 +61,6 @@ class LiteLLMProvider(LLMProvider):
         # Track if using custom endpoint (vLLM, etc.)
         self.is_vllm = bool(api_base) and not self.is_openrouter and not self.is_aihubmix
         
-        # Configure LiteLLM based on provider
-        if api_key:
-            if self.is_openrouter:
-                # OpenRouter mode - set key
-                os.environ["OPENROUTER_API_KEY"] = api_key
-            elif self.is_aihubmix:
-                # AiHubMix gateway - OpenAI-compatible
-                os.environ["OPENAI_API_KEY"] = api_key
-            elif self.is_vllm:
-                # vLLM/custom endpoint - uses OpenAI-compatible API
-                os.environ["HOSTED_VLLM_API_KEY"] = api_key
-            elif "deepseek" in default_model:
-                os.environ.setdefault("DEEPSEEK_API_KEY", api_key)
-            elif "anthropic" in default_model:
-                os.environ.setdefault("ANTHROPIC_API_KEY", api_key)
-            elif "openai" in default_model or "gpt" in default_model:
-                os.environ.setdefault("OPENAI_API_KEY", api_key)
-            elif "gemini" in default_model.lower():
-                os.environ.setdefault("GEMINI_API_KEY", api_key)
-            elif "zhipu" in default_model or "glm" in default_model or "zai" in default_model:
-                os.environ.setdefault("ZAI_API_KEY", api_key)
-                os.environ.setdefault("ZHIPUAI_API_KEY", api_key)
-            elif "dashscope" in default_model or "qwen" in default_model.lower():
-                os.environ.setdefault("DASHSCOPE_API_KEY", api_key)
-            elif "groq" in default_model:
-                os.environ.setdefault("GROQ_API_KEY", api_key)
-            elif "moonshot" in default_model or "kimi" in default_model:
-                os.environ.setdefault("MOONSHOT_API_KEY", api_key)
-                os.environ.setdefault("MOONSHOT_API_BASE", api_base or "https://api.moonshot.cn/v1")
-        
-        if api_base:
-            litellm.api_base = api_base
-        
         # Disable LiteLLM logging noise
         litellm.suppress_debug_info = True
     
@@ -102,6 +84,9 @@ class LiteLLMProvider(LLMProvider):
         
         Returns:
             LLMResponse with content and/or tool calls.
+
+        Raises:
+            LLMError: Typed failure (rate limit, timeout, server error, ...).
         """
         # Use default model if not specified
         model = model or self.default_model
@@ -141,9 +126,14 @@ class LiteLLMProvider(LLMProvider):
             "temperature": temperature,
         }
         
-        # Pass api_base directly for custom endpoints (vLLM, etc.)
+        # Credentials and endpoint are passed per call (never via os.environ or
+        # litellm.api_base) so providers for different models can coexist
+        if self.api_key:
+            kwargs["api_key"] = self.api_key
         if self.api_base:
             kwargs["api_base"] = self.api_base
+        elif model.startswith("moonshot/"):
+            kwargs["api_base"] = "https://api.moonshot.cn/v1"
         
         # Pass extra headers (e.g. APP-Code for AiHubMix)
         if self.extra_headers:
@@ -153,19 +143,50 @@ class LiteLLMProvider(LLMProvider):
             kwargs["tools"] = tools
             kwargs["tool_choice"] = "auto"
         
+        if self.http_pool:
+            await self._attach_http_pool(model, kwargs)
+
         # 打印debug log日志,除message外的信息
         logger.debug(f"LiteLLM param in  =======>>>>>> model: {model} max_tokens: {max_tokens} temperature: {temperature} api_base: {self.api_base} ")
 
         try:
             response = await acompletion(**kwargs)
-            return self._parse_response(response)
         except Exception as e:
-            # Return error as content for graceful handling
-            return LLMResponse(
-                content=f"Error calling LLM: {str(e)}",
-                finish_reason="error",
-            )
+            raise classify_error(e, provider="litellm") from e
+        return self._parse_response(response)
     
+    async def _attach_http_pool(self, model: str, kwargs: dict[str, Any]) -> None:
+        """
+        Route the call through our pooled client.
+
+        OpenAI-SDK based routes (OpenAI, OpenRouter, vLLM, DeepSeek, ...) pick up
+        litellm.aclient_session, which is only claimed while no other open
+        client holds it; native Anthropic calls take an AsyncHTTPHandler
+        wrapping our client via `client=`.
+        """
+        client = self.http_pool.client
+        current = litellm.aclient_session
+        if current is None or current.is_closed:
+            litellm.aclient_session = client
+        elif current is not client and not self._warned_shared_session:
+            self._warned_shared_session = True
+            logger.warning("litellm.aclient_session belongs to another HTTP pool; OpenAI-style routes will share it")
+        if model.startswith("anthropic/") or (model.startswith("claude") and "/" not in model):
+            if self._anthropic_handler is None:
+                self._anthropic_handler = AsyncHTTPHandler(timeout=self.http_pool.timeout)
+                # Drop the client the handler built for itself before swapping ours in
+                await self._anthropic_handler.client.aclose()
+            if self._anthropic_handler.client is not client:
+                self._anthropic_handler.client = client
+            kwargs["client"] = self._anthropic_handler
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client."""
+        if self.http_pool:
+            await self.http_pool.aclose()
+            if litellm.aclient_session is not None and litellm.aclient_session.is_closed:
+                litellm.aclient_session = None
+
     def _parse_response(self, response: Any) -> LLMResponse:
         """Parse LiteLLM response into our standard format."""
         choice = response.choices[0]
@@ -196,6 +217,11 @@ class LiteLLMProvider(LLMProvider):
                 "completion_tokens": response.usage.completion_tokens,
                 "total_tokens": response.usage.total_tokens,
             }
+            # Prompt-cache hits (OpenAI-style details; LiteLLM maps Anthropic cache reads here too)
+            details = getattr(response.usage, "prompt_tokens_details", None)
+            cached = getattr(details, "cached_tokens", None) or getattr(response.usage, "cache_read_input_tokens", None)
+            if isinstance(cached, int) and cached:
+                usage["cached_tokens"] = cached
         
         return LLMResponse(
             content=message.content,
@@ -0,0 +1,197 @@
+"""Native provider for OpenAI-compatible chat-completions endpoints (no LiteLLM)."""
+
+import json
+from typing import Any
+
+from loguru import logger
+
+from nanobot.providers.base import LLMProvider, LLMResponse, ToolCallRequest
+from nanobot.providers.errors import (
+    LLMServerError,
+    classify_error,
+    error_from_status,
+    parse_retry_after,
+)
+from nanobot.providers.http_pool import HTTPPool
+
+# Default endpoints when api_base is not configured, matched by model keyword
+DEFAULT_API_BASES = {
+    "openrouter": "https://openrouter.ai/api/v1",
+    "aihubmix": "https://aihubmix.com/v1",
+    "deepseek": "https://api.deepseek.com/v1",
+    "moonshot": "https://api.moonshot.cn/v1",
+    "kimi": "https://api.moonshot.cn/v1",
+    "dashscope": "https://dashscope.aliyuncs.com/compatible-mode/v1",
+    "qwen": "https://dashscope.aliyuncs.com/compatible-mode/v1",
+    "groq": "https://api.groq.com/openai/v1",
+    "openai": "https://api.openai.com/v1",
+    "gpt": "https://api.openai.com/v1",
+}
+
+# LiteLLM-style routing prefixes that the endpoint itself does not understand
+ROUTING_PREFIXES = (
+    "openrouter/", "hosted_vllm/", "openai/", "deepseek/", "moonshot/",
+    "dashscope/", "groq/", "ollama/", "vllm/", "aihubmix/",
+)
+
+
+class OpenAICompatProvider(LLMProvider):
+    """
+    Lightweight provider speaking the OpenAI chat-completions wire format.
+
+    Works with OpenAI, OpenRouter, DeepSeek, Moonshot, DashScope, Groq,
+    vLLM, Ollama and other compatible servers. It only depends on httpx, so
+    it avoids the multi-second, several-hundred-MB import of LiteLLM.
+    Requests go through a pooled keep-alive HTTPPool.
+    """
+
+    def __init__(
+        self,
+        api_key: str | None = None,
+        api_base: str | None = None,
+        default_model: str = "gpt-4o",
+        extra_headers: dict[str, str] | None = None,
+        http_pool: HTTPPool | None = None,
+    ):
+        super().__init__(api_key, api_base)
+        self.default_model = default_model
+        self.extra_headers = extra_headers or {}
+        self.http_pool = http_pool or HTTPPool()
+
+    def _resolve_base(self, model: str) -> str:
+        if self.api_base:
+            return self.api_base.rstrip("/")
+        model_lower = model.lower()
+        for keyword, url in DEFAULT_API_BASES.items():
+            if keyword in model_lower:
+                return url
+        return DEFAULT_API_BASES["openai"]
+
+    @staticmethod
+    def _wire_model(model: str) -> str:
+        """Strip a LiteLLM routing prefix (e.g. 'openrouter/anthropic/x' -> 'anthropic/x')."""
+        for prefix in ROUTING_PREFIXES:
+            if model.startswith(prefix):
+                return model[len(prefix):]
+        return model
+
+    def _build_request(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None,
+        model: str,
+        max_tokens: int,
+        temperature: float,
+    ) -> tuple[str, dict[str, str], dict[str, Any]]:
+        # kimi-k2.5 only supports temperature=1.0
+        if "kimi-k2.5" in model.lower():
+            temperature = 1.0
+
+        payload: dict[str, Any] = {
+            "model": self._wire_model(model),
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+        }
+        if tools:
+            payload["tools"] = tools
+            payload["tool_choice"] = "auto"
+
+        headers = {"Content-Type": "application/json", **self.extra_headers}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        url = f"{self._resolve_base(model)}/chat/completions"
+        return url, headers, payload
+
+    async def chat(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None = None,
+        model: str | None = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+    ) -> LLMResponse:
+        """
+        Send a chat completion request to the OpenAI-compatible endpoint.
+
+        Args:
+            messages: List of message dicts with 'role' and 'content'.
+            tools: Optional list of tool definitions in OpenAI format.
+            model: Model identifier; LiteLLM routing prefixes are stripped.
+            max_tokens: Maximum tokens in response.
+            temperature: Sampling temperature.
+
+        Returns:
+            LLMResponse with content and/or tool calls.
+
+        Raises:
+            LLMError: Typed failure (rate limit, timeout, server error, ...).
+        """
+        model = model or self.default_model
+        url, headers, payload = self._build_request(messages, tools, model, max_tokens, temperature)
+        logger.debug(f"OpenAI-compatible request: model={payload['model']} url={url}")
+
+        try:
+            response = await self.http_pool.client.post(url, headers=headers, json=payload)
+        except Exception as e:
+            raise classify_error(e, provider="openai") from e
+        if response.status_code >= 400:
+            raise error_from_status(
+                response.status_code,
+                f"HTTP {response.status_code}: {response.text[:500]}",
+                retry_after=parse_retry_after(response.headers.get("retry-after")),
+                provider="openai",
+            )
+        try:
+            return self._parse_response(response.json())
+        except (ValueError, KeyError, IndexError, TypeError, AttributeError) as e:
+            # A proxy's HTML page, an {"error": ...} body or no choices: treat
+            # as a server fault so retries and failover still apply
+            raise LLMServerError(
+                f"Unusable response (HTTP {response.status_code}, {type(e).__name__}): {response.text[:500]}",
+                status_code=response.status_code,
+                provider="openai",
+            ) from e
+
+    def _parse_response(self, data: dict[str, Any]) -> LLMResponse:
+        """Parse a chat-completions JSON body into our standard format."""
+        choice = data["choices"][0]
+        message = choice.get("message") or {}
+
+        tool_calls = []
+        for tc in message.get("tool_calls") or []:
+            fn = tc.get("function") or {}
+            args = fn.get("arguments") or {}
+            if isinstance(args, str):
+                try:
+                    args = json.loads(args) if args else {}
+                except json.JSONDecodeError:
+                    args = {"raw": args}
+            tool_calls.append(ToolCallRequest(id=tc.get("id", ""), name=fn.get("name", ""), arguments=args))
+
+        usage = {}
+        if data.get("usage"):
+            u = data["usage"]
+            usage = {
+                "prompt_tokens": u.get("prompt_tokens", 0),
+                "completion_tokens": u.get("completion_tokens", 0),
+                "total_tokens": u.get("total_tokens", 0),
+            }
+            cached = (u.get("prompt_tokens_details") or {}).get("cached_tokens")
+            if cached:
+                usage["cached_tokens"] = cached
+
+        return LLMResponse(
+            content=message.get("content"),
+            tool_calls=tool_calls,
+            finish_reason=choice.get("finish_reason") or "stop",
+            usage=usage,
+        )
+
+    def get_default_model(self) -> str:
+        """Get the default model."""
+        return self.default_model
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client."""
+        await self.http_pool.aclose()
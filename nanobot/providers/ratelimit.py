@@ -0,0 +1,165 @@
+"""Client-side RPM/TPM limiting for LLM calls."""
+
+import json
+from dataclasses import dataclass
+from typing import Any
+
+from loguru import logger
+
+from nanobot.providers.base import LLMProvider, LLMResponse
+from nanobot.providers.errors import LLMRateLimitError
+from nanobot.utils.metrics import metrics
+from nanobot.utils.ratelimit import TokenBucket
+
+# Rough characters-per-token ratio for English/code; good enough for budgeting
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(
+    messages: list[dict[str, Any]],
+    tools: list[dict[str, Any]] | None = None,
+    max_tokens: int = 0,
+) -> int:
+    """
+    Estimate the tokens a request will count against a TPM budget.
+
+    Prompt tokens are approximated from the text length of message contents
+    and tool definitions; `max_tokens` is added because most providers
+    reserve the full completion budget up front.
+    """
+    chars = 0
+    for msg in messages:
+        content = msg.get("content")
+        if isinstance(content, str):
+            chars += len(content)
+        elif isinstance(content, list):
+            for part in content:
+                if isinstance(part, dict) and isinstance(part.get("text"), str):
+                    chars += len(part["text"])
+        if msg.get("tool_calls"):
+            chars += len(json.dumps(msg["tool_calls"], default=str))
+    if tools:
+        # ToolRegistry definitions carry their serialization; avoid redoing it per call
+        chars += len(getattr(tools, "serialized", None) or json.dumps(tools, default=str))
+    # Per-message framing overhead
+    return chars // CHARS_PER_TOKEN + 4 * len(messages) + max_tokens
+
+
+@dataclass
+class RateLimit:
+    """Budget for models whose name contains `model` ("*" = any)."""
+    model: str = "*"
+    rpm: int = 0  # 0 = unlimited
+    tpm: int = 0  # 0 = unlimited
+    burst_s: float = 60.0  # Seconds of budget that may be spent back-to-back
+
+    def matches(self, model: str) -> bool:
+        return self.model == "*" or self.model.lower() in model.lower()
+
+
+class RateLimiter:
+    """
+    Shared request and token buckets, one pair per configured rule.
+
+    Buckets hold `burst_s` worth of budget (a full minute by default; lower
+    it for providers that enforce limits per second) and refill
+    continuously. Waiters queue in FIFO order (see TokenBucket), so
+    concurrent chats, cron jobs and subagents are served fairly instead of
+    failing with 429s.
+
+    Metrics: llm.ratelimit.wait_s (summary), llm.ratelimit.throttled,
+    llm.ratelimit.penalties.
+    """
+
+    def __init__(self, limits: list[RateLimit]):
+        self.limits = limits
+        self._rpm: dict[str, TokenBucket] = {}
+        self._tpm: dict[str, TokenBucket] = {}
+        for limit in limits:
+            if limit.rpm > 0:
+                rate = limit.rpm / 60.0
+                self._rpm[limit.model] = TokenBucket(rate, capacity=max(1.0, rate * limit.burst_s))
+            if limit.tpm > 0:
+                rate = limit.tpm / 60.0
+                self._tpm[limit.model] = TokenBucket(rate, capacity=max(1.0, rate * limit.burst_s))
+
+    def rule_for(self, model: str) -> RateLimit | None:
+        """First rule matching `model`."""
+        return next((limit for limit in self.limits if limit.matches(model)), None)
+
+    async def acquire(self, model: str, tokens: int) -> float:
+        """
+        Wait until `model` may send a request costing `tokens`.
+
+        Returns:
+            Seconds spent waiting.
+        """
+        rule = self.rule_for(model)
+        if rule is None:
+            return 0.0
+        waited = 0.0
+        if rule.model in self._rpm:
+            waited += await self._rpm[rule.model].acquire(1)
+        if rule.model in self._tpm:
+            waited += await self._tpm[rule.model].acquire(tokens)
+        metrics.observe("llm.ratelimit.wait_s", waited)
+        if waited > 0:
+            metrics.incr("llm.ratelimit.throttled")
+            logger.debug(f"Rate limit: waited {waited:.2f}s for {model}")
+        return waited
+
+    def settle(self, model: str, estimated: int, actual: int) -> None:
+        """Refund the TPM bucket when the real usage was below the estimate."""
+        rule = self.rule_for(model)
+        if rule and rule.model in self._tpm and 0 < actual < estimated:
+            self._tpm[rule.model].refund(estimated - actual)
+
+    def penalize(self, model: str, seconds: float) -> None:
+        """Hold back further requests for `model` after the server returned 429."""
+        rule = self.rule_for(model)
+        if rule is None:
+            return
+        metrics.incr("llm.ratelimit.penalties")
+        for buckets in (self._rpm, self._tpm):
+            if rule.model in buckets:
+                buckets[rule.model].penalize(seconds)
+
+
+class RateLimitedProvider(LLMProvider):
+    """Provider wrapper that waits for RPM/TPM budget before each call."""
+
+    def __init__(self, inner: LLMProvider, limiter: RateLimiter):
+        super().__init__(inner.api_key, inner.api_base)
+        self.inner = inner
+        self.limiter = limiter
+
+    async def chat(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None = None,
+        model: str | None = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+    ) -> LLMResponse:
+        model = model or self.get_default_model()
+        estimated = estimate_tokens(messages, tools, max_tokens)
+        await self.limiter.acquire(model, estimated)
+        try:
+            response = await self.inner.chat(
+                messages=messages,
+                tools=tools,
+                model=model,
+                max_tokens=max_tokens,
+                temperature=temperature,
+            )
+        except LLMRateLimitError as e:
+            self.limiter.penalize(model, e.retry_after or 1.0)
+            raise
+        self.limiter.settle(model, estimated, response.usage.get("total_tokens", 0))
+        return response
+
+    def get_default_model(self) -> str:
+        return self.inner.get_default_model()
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
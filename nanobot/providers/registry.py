@@ -0,0 +1,68 @@
+"""Per-model provider instances with isolated credentials."""
+
+from typing import Any, Callable
+
+from loguru import logger
+
+from nanobot.providers.base import LLMProvider, LLMResponse
+
+
+class ProviderRegistry(LLMProvider):
+    """
+    Dispatches each call to a provider instance dedicated to its model.
+
+    Instances are created on first use by `factory(model)`, which picks the
+    matching API key, base URL and headers for that model. Because every
+    instance carries its own configuration, the main agent, subagents,
+    heartbeat and routed or fallback models can target different backends
+    (e.g. a hosted model and a local vLLM) concurrently in one process.
+    """
+
+    def __init__(self, factory: Callable[[str], LLMProvider], default_model: str):
+        super().__init__()
+        self.factory = factory
+        self.default_model = default_model
+        self._providers: dict[str, LLMProvider] = {}
+
+    def get(self, model: str | None = None) -> LLMProvider:
+        """The provider instance for `model`, created on first use."""
+        model = model or self.default_model
+        provider = self._providers.get(model)
+        if provider is None:
+            provider = self.factory(model)
+            self._providers[model] = provider
+            logger.debug(f"Provider registry: new {type(provider).__name__} for {model}")
+        return provider
+
+    def register(self, model: str, provider: LLMProvider) -> None:
+        """Use an explicit provider instance for `model`."""
+        self._providers[model] = provider
+
+    @property
+    def models(self) -> list[str]:
+        """Models with an instantiated provider."""
+        return list(self._providers)
+
+    async def chat(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None = None,
+        model: str | None = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+    ) -> LLMResponse:
+        model = model or self.default_model
+        return await self.get(model).chat(
+            messages=messages,
+            tools=tools,
+            model=model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+        )
+
+    def get_default_model(self) -> str:
+        return self.default_model
+
+    async def aclose(self) -> None:
+        for provider in self._providers.values():
+            await provider.aclose()
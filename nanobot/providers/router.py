@@ -0,0 +1,146 @@
+"""Cheap-first model routing with escalation to the requested model."""
+
+from dataclasses import dataclass, field
+from typing import Any
+
+from loguru import logger
+
+from nanobot.providers.base import LLMProvider, LLMResponse
+from nanobot.providers.context import CallContext, current_call
+from nanobot.providers.errors import LLMError
+from nanobot.utils.metrics import metrics
+
+
+def _last_user_text(messages: list[dict[str, Any]]) -> str:
+    for msg in reversed(messages):
+        if msg.get("role") == "user":
+            content = msg.get("content")
+            if isinstance(content, list):
+                return " ".join(p.get("text", "") for p in content if isinstance(p, dict))
+            return content or ""
+    return ""
+
+
+@dataclass
+class RouteRule:
+    """
+    Send matching calls to `model`. Empty/None criteria match anything.
+
+    - channels: inbound channel names ("telegram", "cli", ...)
+    - origins: "user", "cron", "heartbeat", "subagent", "system"
+    - max_chars: only when the latest user message is at most this long
+    - tools: only when tool definitions are (True) / are not (False) sent
+    """
+    model: str
+    channels: list[str] = field(default_factory=list)
+    origins: list[str] = field(default_factory=list)
+    max_chars: int = 0
+    tools: bool | None = None
+
+    def matches(self, ctx: CallContext, chars: int, has_tools: bool) -> bool:
+        if self.channels and ctx.channel not in self.channels:
+            return False
+        if self.origins and ctx.origin not in self.origins:
+            return False
+        if self.max_chars and chars > self.max_chars:
+            return False
+        if self.tools is not None and self.tools != has_tools:
+            return False
+        return True
+
+
+class RouterProvider(LLMProvider):
+    """
+    Picks a (usually smaller) model per call from ordered rules.
+
+    The first matching rule wins; with no match the requested model is used
+    unchanged. A routed call escalates to the requested model when the
+    small model fails with an LLMError, returns nothing, or answers with
+    `escalate_marker` (it is told it may do so via the system prompt). Once
+    a turn has escalated, its remaining calls stay on the large model.
+
+    Metrics: llm.router.routed, llm.router.escalations.
+    """
+
+    def __init__(
+        self,
+        inner: LLMProvider,
+        rules: list[RouteRule],
+        escalate_on_error: bool = True,
+        escalate_marker: str = "[ESCALATE]",
+    ):
+        super().__init__(inner.api_key, inner.api_base)
+        self.inner = inner
+        self.rules = rules
+        self.escalate_on_error = escalate_on_error
+        self.escalate_marker = escalate_marker
+
+    def select(
+        self,
+        model: str,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None,
+        ctx: CallContext | None = None,
+    ) -> str:
+        """Model to use for this call."""
+        ctx = ctx or current_call()
+        if ctx.escalated:
+            return model
+        chars = len(_last_user_text(messages))
+        for rule in self.rules:
+            if rule.matches(ctx, chars, bool(tools)):
+                return rule.model
+        return model
+
+    def _with_hint(self, messages: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        if not self.escalate_marker or not messages or messages[0].get("role") != "system":
+            return messages
+        hint = (
+            f"\n\nIf this request needs deeper reasoning than you can provide, "
+            f"reply with exactly {self.escalate_marker} and nothing else."
+        )
+        return [{**messages[0], "content": (messages[0].get("content") or "") + hint}, *messages[1:]]
+
+    def _wants_escalation(self, response: LLMResponse) -> bool:
+        if response.has_tool_calls:
+            return False
+        content = (response.content or "").strip()
+        return not content or bool(self.escalate_marker and content.startswith(self.escalate_marker))
+
+    async def chat(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None = None,
+        model: str | None = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+    ) -> LLMResponse:
+        requested = model or self.get_default_model()
+        ctx = current_call()
+        routed = self.select(requested, messages, tools, ctx)
+        kwargs = {"tools": tools, "max_tokens": max_tokens, "temperature": temperature}
+        if routed == requested:
+            return await self.inner.chat(messages=messages, model=requested, **kwargs)
+
+        metrics.incr("llm.router.routed")
+        try:
+            response = await self.inner.chat(messages=self._with_hint(messages), model=routed, **kwargs)
+        except LLMError as e:
+            if not (self.escalate_on_error and e.failover):
+                raise
+            reason = f"{routed} failed ({e.kind})"
+        else:
+            if not self._wants_escalation(response):
+                return response
+            reason = f"{routed} asked to escalate"
+
+        metrics.incr("llm.router.escalations")
+        logger.info(f"Router: escalating to {requested}: {reason}")
+        ctx.escalated = True
+        return await self.inner.chat(messages=messages, model=requested, **kwargs)
+
+    def get_default_model(self) -> str:
+        return self.inner.get_default_model()
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
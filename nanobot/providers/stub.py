@@ -0,0 +1,335 @@
+"""Scripted LLM stand-in for offline tests and load tests.
+
+`StubModel` decides what to answer and how slowly; `StubProvider` serves it
+in-process and `StubServer` serves it over the OpenAI chat-completions wire
+format, so the real HTTP providers, retries and channels can be exercised
+without network access or an API key.
+"""
+
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+from nanobot.providers.base import LLMProvider, LLMResponse, ToolCallRequest
+from nanobot.providers.errors import LLMError, LLMRateLimitError, LLMServerError
+
+
+@dataclass
+class StubRule:
+    """
+    Answer for user messages matching `match` (regex, case-insensitive; "" = any).
+
+    With `tool_calls`, the first reply requests those tools and `content` is
+    sent once their results come back. `{input}` in content or string
+    arguments is replaced by the user message, `{tool_result}` in content by
+    the latest tool result.
+    """
+    match: str = ""
+    content: str = "{input}"
+    tool_calls: list[dict[str, Any]] = field(default_factory=list)  # [{"name": ..., "arguments": {...}}]
+
+    def matches(self, text: str) -> bool:
+        return not self.match or re.search(self.match, text, re.IGNORECASE) is not None
+
+
+@dataclass
+class StubProfile:
+    """Latency and fault injection."""
+    ttft_s: float = 0.0  # Delay before the first token
+    tokens_per_s: float = 0.0  # Generation speed after the first token (0 = instant)
+    error_rate: float = 0.0  # Fraction of calls failing with a 500
+    rate_limit_rate: float = 0.0  # Fraction of calls failing with a 429
+    retry_after_s: float = 1.0  # Retry-After sent with injected 429s
+    seed: int | None = None
+
+
+def _text(content: Any) -> str:
+    if isinstance(content, list):
+        return " ".join(p.get("text", "") for p in content if isinstance(p, dict))
+    return content or ""
+
+
+def _count_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class StubModel:
+    """
+    Rule-based or scripted responder with injectable latency and faults.
+
+    When `responses` is given they are returned in order (cycling), each a
+    dict with "content" and/or "tool_calls". Otherwise the first matching
+    rule answers the latest user message; without a match the message is
+    echoed back.
+    """
+
+    def __init__(
+        self,
+        rules: list[StubRule] | None = None,
+        responses: list[dict[str, Any]] | None = None,
+        profile: StubProfile | None = None,
+    ):
+        self.rules = rules or []
+        self.responses = responses or []
+        self.profile = profile or StubProfile()
+        self.calls = 0
+        self._scripted = 0
+        self._random = random.Random(self.profile.seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path: Path, profile: StubProfile | None = None) -> "StubModel":
+        """Load {"rules": [...], "responses": [...]} from a JSON script."""
+        data = json.loads(Path(path).expanduser().read_text(encoding="utf-8"))
+        return cls(
+            rules=[StubRule(**r) for r in data.get("rules", [])],
+            responses=data.get("responses", []),
+            profile=profile,
+        )
+
+    def fault(self) -> LLMError | None:
+        """Draw the injected failure for one call, if any."""
+        p = self.profile
+        with self._lock:
+            self.calls += 1
+            roll = self._random.random()
+        if roll < p.rate_limit_rate:
+            return LLMRateLimitError("stub: injected rate limit", status_code=429, retry_after=p.retry_after_s, provider="stub")
+        if roll < p.rate_limit_rate + p.error_rate:
+            return LLMServerError("stub: injected server error", status_code=500, provider="stub")
+        return None
+
+    def respond(self, messages: list[dict[str, Any]]) -> LLMResponse:
+        """The reply to a conversation."""
+        if self.responses:
+            with self._lock:
+                scripted = self.responses[self._scripted % len(self.responses)]
+                self._scripted += 1
+            return self._build(scripted.get("content"), scripted.get("tool_calls", []), messages, "")
+
+        last_user = next((m for m in reversed(messages) if m.get("role") == "user"), {})
+        text = _text(last_user.get("content"))
+        tail = messages[messages.index(last_user) + 1:] if last_user else []
+        tool_results = [_text(m.get("content")) for m in tail if m.get("role") == "tool"]
+
+        rule = next((r for r in self.rules if r.matches(text)), StubRule())
+        if rule.tool_calls and not tool_results:
+            return self._build(None, rule.tool_calls, messages, text)
+        content = rule.content.replace("{input}", text)
+        content = content.replace("{tool_result}", tool_results[-1] if tool_results else "")
+        return self._build(content, [], messages, text)
+
+    def _build(
+        self,
+        content: str | None,
+        calls: list[dict[str, Any]],
+        messages: list[dict[str, Any]],
+        text: str,
+    ) -> LLMResponse:
+        tool_calls = [
+            ToolCallRequest(
+                id=f"call_{uuid.uuid4().hex[:12]}",
+                name=c["name"],
+                arguments={
+                    k: v.replace("{input}", text) if isinstance(v, str) else v
+                    for k, v in c.get("arguments", {}).items()
+                },
+            )
+            for c in calls
+        ]
+        completion = _count_tokens((content or "") + json.dumps([c.arguments for c in tool_calls]))
+        prompt = sum(_count_tokens(_text(m.get("content"))) + 4 for m in messages)
+        return LLMResponse(
+            content=content,
+            tool_calls=tool_calls,
+            finish_reason="tool_calls" if tool_calls else "stop",
+            usage={"prompt_tokens": prompt, "completion_tokens": completion, "total_tokens": prompt + completion},
+        )
+
+    def generation_time(self, response: LLMResponse) -> float:
+        """Seconds from first to last token."""
+        tps = self.profile.tokens_per_s
+        return response.usage.get("completion_tokens", 0) / tps if tps > 0 else 0.0
+
+
+class StubProvider(LLMProvider):
+    """In-process provider answering from a StubModel."""
+
+    def __init__(self, model: StubModel | None = None, default_model: str = "stub"):
+        super().__init__()
+        self.model = model or StubModel()
+        self.default_model = default_model
+
+    async def chat(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None = None,
+        model: str | None = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+    ) -> LLMResponse:
+        error = self.model.fault()
+        await asyncio.sleep(self.model.profile.ttft_s)
+        if error:
+            raise error
+        response = self.model.respond(messages)
+        await asyncio.sleep(self.model.generation_time(response))
+        return response
+
+    def get_default_model(self) -> str:
+        return self.default_model
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "StubServer"
+
+    def _send_json(self, status: int, payload: dict[str, Any], headers: dict[str, str] | None = None) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json(200, {"object": "list", "data": [{"id": "stub", "object": "model"}]})
+        else:
+            self._send_json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length)
+        if self.path.rstrip("/").endswith("/audio/transcriptions"):
+            time.sleep(self.server.model.profile.ttft_s)
+            self._send_json(200, {"text": f"stub transcription of {length} bytes"})
+            return
+        try:
+            request = json.loads(body or b"{}")
+        except json.JSONDecodeError:
+            self._send_json(400, {"error": {"message": "invalid JSON"}})
+            return
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "not found"}})
+            return
+
+        stub = self.server.model
+        error = stub.fault()
+        time.sleep(stub.profile.ttft_s)
+        if error:
+            headers = {"Retry-After": f"{error.retry_after:g}"} if error.retry_after is not None else None
+            self._send_json(error.status_code or 500, {"error": {"message": str(error), "type": error.kind}}, headers)
+            return
+
+        response = stub.respond(request.get("messages", []))
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        model = request.get("model", "stub")
+        if request.get("stream"):
+            self._stream(response, completion_id, model)
+            return
+        time.sleep(stub.generation_time(response))
+        self._send_json(200, {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": self._message(response), "finish_reason": response.finish_reason}],
+            "usage": response.usage,
+        })
+
+    @staticmethod
+    def _message(response: LLMResponse) -> dict[str, Any]:
+        message: dict[str, Any] = {"role": "assistant", "content": response.content}
+        if response.tool_calls:
+            message["tool_calls"] = [
+                {"id": tc.id, "type": "function", "function": {"name": tc.name, "arguments": json.dumps(tc.arguments)}}
+                for tc in response.tool_calls
+            ]
+        return message
+
+    def _stream(self, response: LLMResponse, completion_id: str, model: str) -> None:
+        """Server-sent events, one word per chunk, paced at tokens_per_s."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def chunk(delta: dict[str, Any], finish: str | None = None) -> None:
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+            }
+            self.wfile.write(f"data: {json.dumps(payload)}\n\n".encode())
+            self.wfile.flush()
+
+        words = re.findall(r"\S+\s*", response.content or "")
+        pause = self.server.model.generation_time(response) / max(1, len(words))
+        chunk({"role": "assistant"})
+        for word in words:
+            chunk({"content": word})
+            time.sleep(pause)
+        if response.tool_calls:
+            tool_calls = self._message(response)["tool_calls"]
+            chunk({"tool_calls": [{"index": i, **tc} for i, tc in enumerate(tool_calls)]})
+        chunk({}, response.finish_reason)
+        self.wfile.write(b"data: [DONE]\n\n")
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug(f"stub LLM: {format % args}")
+
+
+class StubServer(ThreadingHTTPServer):
+    """
+    OpenAI-compatible endpoint backed by a StubModel.
+
+    Serves POST {base}/chat/completions (plain and `stream: true`),
+    POST {base}/audio/transcriptions and GET {base}/models on any base path,
+    so `url` can be used as the api_base of a provider. Injected 429s carry
+    a Retry-After header.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, model: StubModel | None = None, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), _StubHandler)
+        self.model = model or StubModel()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "StubServer":
+        """Serve from a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, name="stub-llm", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._thread:
+            self.shutdown()
+            self._thread = None
+        self.server_close()
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
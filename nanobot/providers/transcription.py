@@ -1,65 +1,249 @@
-"""Voice transcription provider using Groq."""
+"""Voice transcription: pooled Whisper-compatible backends, caching and chunking."""
 
+import asyncio
+import hashlib
 import os
+import shutil
+import subprocess
+import tempfile
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any
+from typing import Callable
 
-import httpx
 from loguru import logger
 
+from nanobot.providers.http_pool import HTTPPool
+from nanobot.utils.helpers import ensure_dir
+from nanobot.utils.metrics import metrics
 
-class GroqTranscriptionProvider:
+GROQ_TRANSCRIPTION_URL = "https://api.groq.com/openai/v1/audio/transcriptions"
+
+
+class TranscriptionBackend(ABC):
+    """Turns one audio payload into text."""
+
+    @abstractmethod
+    async def transcribe_bytes(self, data: bytes, filename: str) -> str:
+        """
+        Transcribe audio held in memory.
+
+        Args:
+            data: Encoded audio (ogg, mp3, m4a, wav, ...).
+            filename: Name whose extension tells the backend the format.
+
+        Returns:
+            Transcribed text.
+        """
+        pass
+
+    async def aclose(self) -> None:
+        """Release pooled connections."""
+        pass
+
+
+class WhisperAPIBackend(TranscriptionBackend):
     """
-    Voice transcription provider using Groq's Whisper API.
-    
-    Groq offers extremely fast transcription with a generous free tier.
+    OpenAI-compatible /audio/transcriptions endpoint.
+
+    Defaults to Groq's Whisper; point `api_url` at any compatible server
+    (OpenAI, a local faster-whisper server, `nanobot stub-llm`) to swap it.
+    Uploads go through one pooled keep-alive client.
     """
-    
-    def __init__(self, api_key: str | None = None):
-        self.api_key = api_key or os.environ.get("GROQ_API_KEY")
-        self.api_url = "https://api.groq.com/openai/v1/audio/transcriptions"
-    
+
+    def __init__(
+        self,
+        api_key: str | None = None,
+        api_url: str = GROQ_TRANSCRIPTION_URL,
+        model: str = "whisper-large-v3",
+        http_pool: HTTPPool | None = None,
+        timeout: float = 60.0,
+    ):
+        self.api_key = api_key
+        self.api_url = api_url
+        self.model = model
+        self.timeout = timeout
+        self.http_pool = http_pool or HTTPPool(http2=False, name="transcription")
+
+    async def transcribe_bytes(self, data: bytes, filename: str) -> str:
+        headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+        response = await self.http_pool.client.post(
+            self.api_url,
+            headers=headers,
+            files={"file": (filename, data), "model": (None, self.model)},
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        return response.json().get("text", "")
+
+    async def aclose(self) -> None:
+        await self.http_pool.aclose()
+
+
+def ffmpeg_split(path: Path, segment_s: int, out_dir: Path) -> list[Path]:
+    """
+    Cut an audio file into `segment_s`-second pieces without re-encoding.
+
+    Returns:
+        Segment paths in order, or [path] when ffmpeg is not installed.
+    """
+    ffmpeg = shutil.which("ffmpeg")
+    if not ffmpeg:
+        logger.debug("ffmpeg not found; transcribing long audio in one request")
+        return [path]
+    pattern = out_dir / f"part%04d{path.suffix}"
+    subprocess.run(
+        [ffmpeg, "-loglevel", "error", "-i", str(path), "-f", "segment",
+         "-segment_time", str(segment_s), "-c", "copy", str(pattern)],
+        check=True,
+        timeout=120,
+    )
+    return sorted(out_dir.glob(f"part*{path.suffix}")) or [path]
+
+
+class TranscriptionService:
+    """
+    Shared transcription front-end for all channels.
+
+    - Results are cached by SHA-256 of the audio bytes (in memory, and on
+      disk under `cache_dir`), so forwarded or re-sent voice notes are free.
+    - Recordings larger than `chunk_bytes` are split into `chunk_seconds`
+      segments (ffmpeg) and transcribed concurrently, at most
+      `max_concurrency` uploads at a time across the whole service.
+    - Failures are logged and yield "" so callers fall back to the raw file.
+
+    Metrics: transcription.requests, transcription.cache_hits,
+    transcription.chunks, transcription.errors, transcription.latency_s.
+    """
+
+    def __init__(
+        self,
+        backend: TranscriptionBackend,
+        cache_dir: Path | None = None,
+        max_cache_entries: int = 256,
+        chunk_bytes: int = 8 * 1024 * 1024,
+        chunk_seconds: int = 300,
+        max_concurrency: int = 4,
+        splitter: Callable[[Path, int, Path], list[Path]] = ffmpeg_split,
+    ):
+        self.backend = backend
+        self.cache_dir = ensure_dir(Path(cache_dir).expanduser()) if cache_dir else None
+        self.max_cache_entries = max_cache_entries
+        self.chunk_bytes = chunk_bytes
+        self.chunk_seconds = chunk_seconds
+        self.splitter = splitter
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._cache: OrderedDict[str, str] = OrderedDict()
+        self._inflight: dict[str, asyncio.Future[str]] = {}
+
+    def _cache_get(self, key: str) -> str | None:
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        if self.cache_dir:
+            file = self.cache_dir / f"{key}.txt"
+            if file.exists():
+                text = file.read_text(encoding="utf-8")
+                self._cache_put(key, text, persist=False)
+                return text
+        return None
+
+    def _cache_put(self, key: str, text: str, persist: bool = True) -> None:
+        self._cache[key] = text
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_cache_entries:
+            self._cache.popitem(last=False)
+        if persist and self.cache_dir:
+            try:
+                (self.cache_dir / f"{key}.txt").write_text(text, encoding="utf-8")
+            except OSError as e:
+                logger.warning(f"Transcription cache write failed: {e}")
+
     async def transcribe(self, file_path: str | Path) -> str:
         """
-        Transcribe an audio file using Groq.
-        
+        Transcribe an audio file.
+
         Args:
             file_path: Path to the audio file.
-            
+
         Returns:
-            Transcribed text.
+            Transcribed text, or "" on failure.
         """
-        if not self.api_key:
-            logger.warning("Groq API key not configured for transcription")
-            return ""
-        
         path = Path(file_path)
-        if not path.exists():
-            logger.error(f"Audio file not found: {file_path}")
+        try:
+            data = await asyncio.to_thread(path.read_bytes)
+        except OSError as e:
+            logger.error(f"Audio file not readable: {e}")
             return ""
-        
+
+        key = hashlib.sha256(data).hexdigest()
+        cached = self._cache_get(key)
+        if cached is not None:
+            metrics.incr("transcription.cache_hits")
+            return cached
+        # Identical audio arriving concurrently shares one upload
+        if key in self._inflight:
+            return await asyncio.shield(self._inflight[key])
+
+        future: asyncio.Future[str] = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        text = ""
         try:
-            async with httpx.AsyncClient() as client:
-                with open(path, "rb") as f:
-                    files = {
-                        "file": (path.name, f),
-                        "model": (None, "whisper-large-v3"),
-                    }
-                    headers = {
-                        "Authorization": f"Bearer {self.api_key}",
-                    }
-                    
-                    response = await client.post(
-                        self.api_url,
-                        headers=headers,
-                        files=files,
-                        timeout=60.0
-                    )
-                    
-                    response.raise_for_status()
-                    data = response.json()
-                    return data.get("text", "")
-                    
+            text = await self._transcribe_uncached(path, data)
+            if text:
+                self._cache_put(key, text)
+        finally:
+            future.set_result(text)
+            del self._inflight[key]
+        return text
+
+    async def _transcribe_uncached(self, path: Path, data: bytes) -> str:
+        start = time.monotonic()
+        try:
+            if len(data) <= self.chunk_bytes:
+                text = await self._upload(data, path.name)
+            else:
+                text = await self._transcribe_chunked(path)
         except Exception as e:
-            logger.error(f"Groq transcription error: {e}")
+            metrics.incr("transcription.errors")
+            logger.error(f"Transcription error: {e}")
+            return ""
+        metrics.observe("transcription.latency_s", time.monotonic() - start)
+        return text
+
+    async def _upload(self, data: bytes, filename: str) -> str:
+        async with self._semaphore:
+            metrics.incr("transcription.requests")
+            return (await self.backend.transcribe_bytes(data, filename)).strip()
+
+    async def _transcribe_chunked(self, path: Path) -> str:
+        with tempfile.TemporaryDirectory(prefix="nanobot-audio-") as tmp:
+            parts = await asyncio.to_thread(self.splitter, path, self.chunk_seconds, Path(tmp))
+            metrics.incr("transcription.chunks", len(parts))
+            payloads = [await asyncio.to_thread(p.read_bytes) for p in parts]
+            texts = await asyncio.gather(*(
+                self._upload(data, part.name) for part, data in zip(parts, payloads)
+            ))
+        return " ".join(t for t in texts if t)
+
+    async def aclose(self) -> None:
+        await self.backend.aclose()
+
+
+class GroqTranscriptionProvider(TranscriptionService):
+    """
+    Voice transcription provider using Groq's Whisper API.
+
+    Groq offers extremely fast transcription with a generous free tier.
+    """
+
+    def __init__(self, api_key: str | None = None, **kwargs):
+        self.api_key = api_key or os.environ.get("GROQ_API_KEY")
+        super().__init__(WhisperAPIBackend(api_key=self.api_key), **kwargs)
+
+    async def transcribe(self, file_path: str | Path) -> str:
+        if not self.api_key:
+            logger.warning("Groq API key not configured for transcription")
             return ""
+        return await super().transcribe(file_path)
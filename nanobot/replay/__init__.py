@@ -0,0 +1,13 @@
+"""Record-and-replay of bus traffic for reproducible benchmarks."""
+
+from nanobot.replay.recorder import RecordingProvider, TrafficRecorder
+from nanobot.replay.replayer import ReplayProvider, ReplayToolRegistry, TrafficLog, TrafficReplayer
+
+__all__ = [
+    "RecordingProvider",
+    "ReplayProvider",
+    "ReplayToolRegistry",
+    "TrafficLog",
+    "TrafficRecorder",
+    "TrafficReplayer",
+]
@@ -0,0 +1,186 @@
+"""Traffic recorder: captures inbound messages, LLM calls and tool results."""
+
+import gzip
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+from typing import IO, Any
+
+from loguru import logger
+
+from nanobot.bus.events import InboundMessage
+from nanobot.providers.base import LLMProvider, LLMResponse, ToolCallRequest
+
+
+def request_fingerprint(
+    messages: list[dict[str, Any]],
+    tools: list[dict[str, Any]] | None,
+    model: str | None,
+) -> str:
+    """Stable short hash of an LLM request payload."""
+    payload = json.dumps(
+        {"model": model, "messages": messages, "tools": tools or []},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def tool_fingerprint(name: str, arguments: dict[str, Any]) -> str:
+    """Stable short hash of a tool invocation."""
+    payload = json.dumps({"name": name, "args": arguments}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def response_to_dict(response: LLMResponse) -> dict[str, Any]:
+    """Serialize an LLMResponse for the log."""
+    data: dict[str, Any] = {"content": response.content, "finish_reason": response.finish_reason}
+    if response.tool_calls:
+        data["tool_calls"] = [
+            {"id": tc.id, "name": tc.name, "arguments": tc.arguments}
+            for tc in response.tool_calls
+        ]
+    if response.usage:
+        data["usage"] = response.usage
+    return data
+
+
+def response_from_dict(data: dict[str, Any]) -> LLMResponse:
+    """Rebuild an LLMResponse from a log entry."""
+    return LLMResponse(
+        content=data.get("content"),
+        tool_calls=[ToolCallRequest(**tc) for tc in data.get("tool_calls", [])],
+        finish_reason=data.get("finish_reason", "stop"),
+        usage=data.get("usage", {}),
+    )
+
+
+def open_log(path: Path, mode: str) -> IO[str]:
+    """Open a traffic log, transparently gzipped when the name ends in .gz."""
+    if path.suffix == ".gz":
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class TrafficRecorder:
+    """
+    Append-only JSONL log of bus traffic for later replay.
+
+    Each line is one event with a relative timestamp `t` (seconds since the
+    recorder was created) and a kind `k`:
+
+    - "inbound": a user message as received from a channel
+    - "llm": one provider call (request fingerprint, latency, response)
+    - "tool": one tool execution (name, arguments, result, latency)
+
+    LLM requests are stored as a fingerprint plus message count rather than
+    the full prompt, which grows quadratically over a turn; pass
+    `full_requests=True` to keep the complete payload.
+    """
+
+    def __init__(self, path: Path, full_requests: bool = False):
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.full_requests = full_requests
+        self._start = time.monotonic()
+        self._lock = threading.Lock()
+        self._file: IO[str] | None = open_log(self.path, "a")
+        logger.info(f"Recording traffic to {self.path}")
+
+    def _write(self, kind: str, data: dict[str, Any]) -> None:
+        if self._file is None:
+            return
+        entry = {"t": round(time.monotonic() - self._start, 4), "k": kind, **data}
+        line = json.dumps(entry, ensure_ascii=False, separators=(",", ":"), default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def record_inbound(self, msg: InboundMessage) -> None:
+        """Record a user message as it arrives (system messages are the agent's own)."""
+        if msg.channel == "system":
+            return
+        self._write("inbound", {
+            "channel": msg.channel,
+            "sender_id": msg.sender_id,
+            "chat_id": msg.chat_id,
+            "content": msg.content,
+            "media": msg.media,
+            "metadata": msg.metadata,
+        })
+
+    def record_llm(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None,
+        model: str | None,
+        response: LLMResponse,
+        latency: float,
+    ) -> None:
+        """Record one provider call."""
+        data: dict[str, Any] = {
+            "fp": request_fingerprint(messages, tools, model),
+            "model": model,
+            "n_messages": len(messages),
+            "latency": round(latency, 4),
+            "response": response_to_dict(response),
+        }
+        if self.full_requests:
+            data["request"] = {"messages": messages, "tools": tools}
+        self._write("llm", data)
+
+    def record_tool(self, name: str, arguments: dict[str, Any], result: str, latency: float) -> None:
+        """Record one tool execution."""
+        self._write("tool", {
+            "fp": tool_fingerprint(name, arguments),
+            "name": name,
+            "args": arguments,
+            "result": result,
+            "latency": round(latency, 4),
+        })
+
+    def close(self) -> None:
+        """Flush and close the log."""
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+
+class RecordingProvider(LLMProvider):
+    """Provider wrapper that records every call to a TrafficRecorder."""
+
+    def __init__(self, inner: LLMProvider, recorder: TrafficRecorder):
+        super().__init__(inner.api_key, inner.api_base)
+        self.inner = inner
+        self.recorder = recorder
+
+    async def chat(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None = None,
+        model: str | None = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+    ) -> LLMResponse:
+        start = time.monotonic()
+        response = await self.inner.chat(
+            messages=messages,
+            tools=tools,
+            model=model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+        )
+        self.recorder.record_llm(
+            messages, tools, model or self.get_default_model(), response, time.monotonic() - start
+        )
+        return response
+
+    def get_default_model(self) -> str:
+        return self.inner.get_default_model()
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
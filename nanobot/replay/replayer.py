@@ -0,0 +1,283 @@
+"""Replay recorded traffic against an AgentLoop without network access."""
+
+import asyncio
+import json
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+from nanobot.agent.tools.registry import ToolRegistry
+from nanobot.bus.events import InboundMessage
+from nanobot.providers.base import LLMProvider, LLMResponse
+from nanobot.replay.recorder import (
+    open_log,
+    request_fingerprint,
+    response_from_dict,
+    tool_fingerprint,
+)
+
+
+@dataclass
+class TrafficLog:
+    """A parsed traffic log, split by event kind."""
+    inbound: list[dict[str, Any]] = field(default_factory=list)
+    llm: list[dict[str, Any]] = field(default_factory=list)
+    tools: list[dict[str, Any]] = field(default_factory=list)
+
+    @classmethod
+    def load(cls, path: Path) -> "TrafficLog":
+        log = cls()
+        buckets = {"inbound": log.inbound, "llm": log.llm, "tool": log.tools}
+        with open_log(Path(path).expanduser(), "r") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                bucket = buckets.get(entry.get("k"))
+                if bucket is not None:
+                    bucket.append(entry)
+        return log
+
+
+def _sleep_for(seconds: float, speed: float) -> float:
+    """Scale a recorded duration by the replay speed (0 = no waiting)."""
+    return seconds / speed if speed > 0 else 0.0
+
+
+class ReplayProvider(LLMProvider):
+    """
+    Serves recorded LLM responses locally.
+
+    A request is matched to a recording by its payload fingerprint first.
+    When the prompt differs from the recording (which is the point when
+    evaluating context-building changes), the next unused response in
+    recorded order is served instead. Recorded latency is reproduced,
+    scaled by `speed`.
+    """
+
+    def __init__(self, entries: list[dict[str, Any]], speed: float = 1.0, default_model: str = "replay"):
+        super().__init__()
+        self.entries = entries
+        self.speed = speed
+        self.default_model = default_model
+        self._by_fp: dict[str, deque[int]] = defaultdict(deque)
+        for i, entry in enumerate(entries):
+            self._by_fp[entry.get("fp", "")].append(i)
+        self._used: set[int] = set()
+        self._cursor = 0
+        self.stats = {"exact": 0, "fallback": 0, "miss": 0}
+
+    def _next_unused(self) -> int | None:
+        while self._cursor < len(self.entries) and self._cursor in self._used:
+            self._cursor += 1
+        return self._cursor if self._cursor < len(self.entries) else None
+
+    async def chat(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None = None,
+        model: str | None = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+    ) -> LLMResponse:
+        fp = request_fingerprint(messages, tools, model or self.default_model)
+        candidates = self._by_fp.get(fp)
+        while candidates and candidates[0] in self._used:
+            candidates.popleft()
+        if candidates:
+            idx = candidates.popleft()
+            self.stats["exact"] += 1
+        else:
+            idx = self._next_unused()
+            if idx is None:
+                self.stats["miss"] += 1
+                return LLMResponse(content="[replay: no recorded response left]", finish_reason="error")
+            self.stats["fallback"] += 1
+        self._used.add(idx)
+
+        entry = self.entries[idx]
+        delay = _sleep_for(entry.get("latency", 0.0), self.speed)
+        if delay:
+            await asyncio.sleep(delay)
+        return response_from_dict(entry["response"])
+
+    def get_default_model(self) -> str:
+        return self.default_model
+
+
+class ReplayToolRegistry(ToolRegistry):
+    """
+    Tool registry that answers with recorded results.
+
+    A call is matched to a recording by its (name, arguments) fingerprint.
+    With `match_by_name`, a call whose arguments differ from every
+    recording takes the next recorded result for the same tool instead
+    (logged, and counted as "by_name"). Unmatched calls return an error
+    unless `live_fallback` is set, in which case the real tool runs; only
+    enable that with a scratch workspace, since tools write files and run
+    commands for real.
+    """
+
+    def __init__(
+        self,
+        inner: ToolRegistry,
+        entries: list[dict[str, Any]],
+        speed: float = 1.0,
+        match_by_name: bool = False,
+        live_fallback: bool = False,
+    ):
+        super().__init__()
+        for name in inner.tool_names:
+            self.register(inner.get(name))
+        self.speed = speed
+        self.match_by_name = match_by_name
+        self.live_fallback = live_fallback
+        self._by_fp: dict[str, deque[dict[str, Any]]] = defaultdict(deque)
+        self._by_name: dict[str, deque[dict[str, Any]]] = defaultdict(deque)
+        for entry in entries:
+            self._by_fp[entry["fp"]].append(entry)
+            self._by_name[entry["name"]].append(entry)
+        self.stats = {"replayed": 0, "by_name": 0, "missing": 0, "live": 0}
+
+    def _take(self, name: str, params: dict[str, Any]) -> dict[str, Any] | None:
+        exact = self._by_fp.get(tool_fingerprint(name, params))
+        by_name = self._by_name.get(name)
+        if exact:
+            entry = exact.popleft()
+            by_name.remove(entry)
+            self.stats["replayed"] += 1
+            return entry
+        if self.match_by_name and by_name:
+            entry = by_name.popleft()
+            self._by_fp[entry["fp"]].remove(entry)
+            logger.warning(
+                f"Replay: {name} called with {params!r}, serving the result recorded for {entry['args']!r}"
+            )
+            self.stats["by_name"] += 1
+            return entry
+        return None
+
+    async def execute(self, name: str, params: dict[str, Any]) -> str:
+        entry = self._take(name, params)
+        if entry is None:
+            if self.live_fallback:
+                self.stats["live"] += 1
+                return await super().execute(name, params)
+            self.stats["missing"] += 1
+            return f"Error: No recorded result for {name} with these arguments (replay)"
+        delay = _sleep_for(entry.get("latency", 0.0), self.speed)
+        if delay:
+            await asyncio.sleep(delay)
+        return entry["result"]
+
+
+@dataclass
+class ReplayReport:
+    """Outcome of a replay run."""
+    turns: int = 0
+    replied: int = 0
+    extra_outbound: int = 0
+    wall_time_s: float = 0.0
+    latencies_s: list[float] = field(default_factory=list)
+    llm: dict[str, int] = field(default_factory=dict)
+    tools: dict[str, int] = field(default_factory=dict)
+
+    def percentile(self, p: float) -> float:
+        if not self.latencies_s:
+            return 0.0
+        data = sorted(self.latencies_s)
+        return data[min(len(data) - 1, int(round(p / 100 * (len(data) - 1))))]
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "turns": self.turns,
+            "replied": self.replied,
+            "extra_outbound": self.extra_outbound,
+            "wall_time_s": round(self.wall_time_s, 3),
+            "latency_p50_s": round(self.percentile(50), 4),
+            "latency_p95_s": round(self.percentile(95), 4),
+            "latency_max_s": round(max(self.latencies_s, default=0.0), 4),
+            "llm": self.llm,
+            "tools": self.tools,
+        }
+
+
+class TrafficReplayer:
+    """
+    Drive an AgentLoop with recorded inbound traffic.
+
+    Inbound messages are published to the agent's bus at their recorded
+    offsets divided by `speed` (1.0 = original timing, 10 = ten times
+    faster, 0 = as fast as possible). The time from publishing a message
+    to the first outbound reply for the same chat is reported as the turn
+    latency.
+    """
+
+    def __init__(self, agent: Any, log: TrafficLog, speed: float = 1.0, drain_timeout: float = 30.0):
+        self.agent = agent
+        self.log = log
+        self.speed = speed
+        self.drain_timeout = drain_timeout
+
+    async def run(self) -> ReplayReport:
+        bus = self.agent.bus
+        report = ReplayReport(turns=len(self.log.inbound))
+        pending: dict[tuple[str, str], deque[float]] = defaultdict(deque)
+        last_progress = time.monotonic()
+
+        async def collect() -> None:
+            nonlocal last_progress
+            while True:
+                out = await bus.consume_outbound()
+                last_progress = time.monotonic()
+                queue = pending.get((out.channel, out.chat_id))
+                if queue:
+                    report.latencies_s.append(time.monotonic() - queue.popleft())
+                    report.replied += 1
+                else:
+                    report.extra_outbound += 1
+
+        agent_task = asyncio.create_task(self.agent.run())
+        collector = asyncio.create_task(collect())
+        start = time.monotonic()
+        try:
+            for entry in self.log.inbound:
+                delay = _sleep_for(entry.get("t", 0.0), self.speed) - (time.monotonic() - start)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                msg = InboundMessage(
+                    channel=entry["channel"],
+                    sender_id=entry["sender_id"],
+                    chat_id=entry["chat_id"],
+                    content=entry["content"],
+                    media=entry.get("media") or [],
+                    metadata=entry.get("metadata") or {},
+                )
+                pending[(msg.channel, msg.chat_id)].append(time.monotonic())
+                await bus.publish_inbound(msg)
+
+            last_progress = time.monotonic()
+            while any(pending.values()) or bus.inbound_size:
+                if time.monotonic() - last_progress > self.drain_timeout:
+                    logger.warning("Replay drain timed out with unanswered messages")
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            report.wall_time_s = time.monotonic() - start
+            self.agent.stop()
+            collector.cancel()
+            await asyncio.gather(agent_task, collector, return_exceptions=True)
+
+        if isinstance(self.agent.provider, ReplayProvider):
+            report.llm = dict(self.agent.provider.stats)
+        if isinstance(self.agent.tools, ReplayToolRegistry):
+            report.tools = dict(self.agent.tools.stats)
+        return report
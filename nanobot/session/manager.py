@@ -86,9 +86,9 @@ class SessionManager:
     # 作用：初始化会话管理器，设置会话目录和缓存
     # 设计目的：使用用户主目录存储会话，与工作空间分离
     # 好处：会话数据与用户绑定，支持多工作空间共享会话
-    def __init__(self, workspace: Path):
+    def __init__(self, workspace: Path, sessions_dir: Path | None = None):
         self.workspace = workspace
-        self.sessions_dir = ensure_dir(Path.home() / ".nanobot" / "sessions")
+        self.sessions_dir = ensure_dir(sessions_dir or Path.home() / ".nanobot" / "sessions")
         self._cache: dict[str, Session] = {}
     
     # 作用：根据会话键生成安全的文件路径
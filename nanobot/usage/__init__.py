@@ -0,0 +1,6 @@
+"""LLM usage and latency accounting."""
+
+from nanobot.usage.store import UsageRecord, UsageStore
+from nanobot.usage.tracker import UsageTrackingProvider
+
+__all__ = ["UsageRecord", "UsageStore", "UsageTrackingProvider"]
@@ -0,0 +1,196 @@
+"""Local store of per-call LLM usage and latency."""
+
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import IO, Any
+
+from loguru import logger
+
+from nanobot.utils.helpers import ensure_dir
+
+# Compact on-disk field names
+_FIELDS = {
+    "t": "ts", "s": "session", "c": "channel", "u": "sender", "o": "origin", "m": "model",
+    "p": "prompt_tokens", "x": "completion_tokens", "k": "cached_tokens",
+    "l": "latency_s", "f": "ttft_s", "e": "error",
+}
+GROUP_KEYS = ("session", "channel", "sender", "model", "origin")
+
+
+@dataclass
+class UsageRecord:
+    """One provider call."""
+    ts: float
+    model: str
+    session: str = ""
+    channel: str = ""
+    sender: str = ""
+    origin: str = ""
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    latency_s: float = 0.0
+    ttft_s: float | None = None  # Only known for streamed calls
+    error: str = ""  # LLMError kind when the call failed
+
+    def to_line(self) -> str:
+        data: dict[str, Any] = {}
+        for short, name in _FIELDS.items():
+            value = getattr(self, name)
+            if value in ("", 0, None) and short not in ("t", "m"):
+                continue
+            data[short] = round(value, 4) if isinstance(value, float) else value
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+    @classmethod
+    def from_line(cls, line: str) -> "UsageRecord":
+        data = json.loads(line)
+        return cls(**{_FIELDS[k]: v for k, v in data.items() if k in _FIELDS})
+
+
+@dataclass
+class UsageSummary:
+    """Aggregate over a group of calls."""
+    key: str
+    calls: int = 0
+    errors: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    latencies: list[float] = field(default_factory=list)
+    ttfts: list[float] = field(default_factory=list)
+
+    def add(self, r: UsageRecord) -> None:
+        self.calls += 1
+        self.errors += 1 if r.error else 0
+        self.prompt_tokens += r.prompt_tokens
+        self.completion_tokens += r.completion_tokens
+        self.cached_tokens += r.cached_tokens
+        self.latencies.append(r.latency_s)
+        if r.ttft_s is not None:
+            self.ttfts.append(r.ttft_s)
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    @staticmethod
+    def _pct(values: list[float], p: float) -> float:
+        if not values:
+            return 0.0
+        data = sorted(values)
+        return data[min(len(data) - 1, int(round(p / 100 * (len(data) - 1))))]
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "key": self.key,
+            "calls": self.calls,
+            "errors": self.errors,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cached_tokens": self.cached_tokens,
+            "total_tokens": self.total_tokens,
+            "latency_total_s": round(sum(self.latencies), 3),
+            "latency_avg_s": round(sum(self.latencies) / len(self.latencies), 3) if self.latencies else 0.0,
+            "latency_p95_s": round(self._pct(self.latencies, 95), 3),
+            "ttft_avg_s": round(sum(self.ttfts) / len(self.ttfts), 3) if self.ttfts else None,
+        }
+
+
+class UsageStore:
+    """
+    Append-only JSONL files, one per day (usage-YYYY-MM-DD.jsonl).
+
+    Each line is one call with short keys, so a busy day stays in the low
+    megabytes. Files older than `retention_days` are deleted on start.
+    """
+
+    def __init__(self, path: Path, retention_days: int = 30):
+        self.path = ensure_dir(Path(path).expanduser())
+        self.retention_days = retention_days
+        self._lock = threading.Lock()
+        self._file: IO[str] | None = None
+        self._file_day = ""
+        self._purge()
+
+    def _day_file(self, day: str) -> Path:
+        return self.path / f"usage-{day}.jsonl"
+
+    def _purge(self) -> None:
+        if self.retention_days <= 0:
+            return
+        cutoff = (datetime.now() - timedelta(days=self.retention_days)).strftime("%Y-%m-%d")
+        for file in self.path.glob("usage-*.jsonl"):
+            if file.stem[len("usage-"):] < cutoff:
+                file.unlink(missing_ok=True)
+
+    def record(self, rec: UsageRecord) -> None:
+        """Append one call."""
+        day = datetime.fromtimestamp(rec.ts).strftime("%Y-%m-%d")
+        line = rec.to_line() + "\n"
+        with self._lock:
+            try:
+                if self._file is None or day != self._file_day:
+                    if self._file:
+                        self._file.close()
+                    self._file = open(self._day_file(day), "a", encoding="utf-8")
+                    self._file_day = day
+                self._file.write(line)
+                self._file.flush()
+            except OSError as e:
+                logger.warning(f"Usage store write failed: {e}")
+
+    def records(self, since: float = 0.0) -> list[UsageRecord]:
+        """All calls at or after `since` (epoch seconds)."""
+        first_day = datetime.fromtimestamp(since).strftime("%Y-%m-%d") if since else ""
+        out: list[UsageRecord] = []
+        for file in sorted(self.path.glob("usage-*.jsonl")):
+            if file.stem[len("usage-"):] < first_day:
+                continue
+            with open(file, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        rec = UsageRecord.from_line(line)
+                    except (json.JSONDecodeError, TypeError):
+                        continue
+                    if rec.ts >= since:
+                        out.append(rec)
+        return out
+
+    def summarize(self, since: float = 0.0, by: str = "model") -> list[dict[str, Any]]:
+        """
+        Aggregate calls per `by` ("session", "channel", "sender", "model" or "origin").
+
+        Returns:
+            Summaries sorted by total latency, the largest first.
+        """
+        if by not in GROUP_KEYS:
+            raise ValueError(f"by must be one of {', '.join(GROUP_KEYS)}")
+        groups: dict[str, UsageSummary] = {}
+        for rec in self.records(since):
+            key = getattr(rec, by) or "-"
+            groups.setdefault(key, UsageSummary(key)).add(rec)
+        rows = [g.to_dict() for g in groups.values()]
+        return sorted(rows, key=lambda r: r["latency_total_s"], reverse=True)
+
+    def totals(self, since: float = 0.0) -> dict[str, Any]:
+        """One summary over every call since `since`."""
+        total = UsageSummary("total")
+        for rec in self.records(since):
+            total.add(rec)
+        return total.to_dict()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+
+def since_days(days: float) -> float:
+    """Epoch timestamp `days` ago."""
+    return time.time() - days * 86400
@@ -0,0 +1,74 @@
+"""Provider wrapper that records usage and latency of every call."""
+
+import time
+from typing import Any
+
+from nanobot.providers.base import LLMProvider, LLMResponse
+from nanobot.providers.context import current_call
+from nanobot.providers.errors import LLMError
+from nanobot.usage.store import UsageRecord, UsageStore
+from nanobot.utils.metrics import metrics
+
+
+class UsageTrackingProvider(LLMProvider):
+    """
+    Records each call (tokens, latency, failures) to a UsageStore.
+
+    Session, channel, sender and origin come from the active CallContext.
+    Wrap the concrete provider, inside rate limiting, so that recorded
+    latency is the provider's own and the model is the one actually called.
+    """
+
+    def __init__(self, inner: LLMProvider, store: UsageStore):
+        super().__init__(inner.api_key, inner.api_base)
+        self.inner = inner
+        self.store = store
+
+    async def chat(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None = None,
+        model: str | None = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+    ) -> LLMResponse:
+        model = model or self.get_default_model()
+        ctx = current_call()
+        start = time.monotonic()
+        rec = UsageRecord(
+            ts=time.time(),
+            model=model,
+            session=ctx.session_key,
+            channel=ctx.channel,
+            sender=ctx.sender_id,
+            origin=ctx.origin,
+        )
+        try:
+            response = await self.inner.chat(
+                messages=messages,
+                tools=tools,
+                model=model,
+                max_tokens=max_tokens,
+                temperature=temperature,
+            )
+        except Exception as e:
+            rec.latency_s = time.monotonic() - start
+            rec.error = e.kind if isinstance(e, LLMError) else "error"
+            self.store.record(rec)
+            raise
+
+        rec.latency_s = time.monotonic() - start
+        rec.prompt_tokens = response.usage.get("prompt_tokens", 0)
+        rec.completion_tokens = response.usage.get("completion_tokens", 0)
+        rec.cached_tokens = response.usage.get("cached_tokens", 0)
+        self.store.record(rec)
+        metrics.observe("llm.latency_s", rec.latency_s)
+        metrics.incr("llm.tokens.prompt", rec.prompt_tokens)
+        metrics.incr("llm.tokens.completion", rec.completion_tokens)
+        return response
+
+    def get_default_model(self) -> str:
+        return self.inner.get_default_model()
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
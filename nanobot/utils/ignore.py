@@ -0,0 +1,216 @@
+"""gitignore-style exclusion rules and an ignore-aware directory walker."""
+
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+
+# Always skipped, whatever the ignore files say
+DEFAULT_PATTERNS = (
+    ".git/", ".hg/", ".svn/", "node_modules/", "__pycache__/", ".venv/", "venv/",
+    ".mypy_cache/", ".pytest_cache/", ".ruff_cache/", ".tox/", "*.pyc", ".DS_Store",
+)
+IGNORE_FILES = (".gitignore", ".ignore", ".nanobotignore")
+
+
+def _translate(pattern: str) -> str:
+    """Glob with gitignore semantics (`*` stays within a segment, `**` crosses) to a regex."""
+    out, i, n = [], 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif c == "*":
+            out.append("[^/]*")
+            i += 1
+        elif c == "?":
+            out.append("[^/]")
+            i += 1
+        elif c == "[":
+            end = pattern.find("]", i + 1)
+            if end < 0:
+                out.append(re.escape(c))
+                i += 1
+            else:
+                body = pattern[i + 1:end].replace("\\", "\\\\")
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append(f"[{body}]")
+                i = end + 1
+        else:
+            out.append(re.escape(c))
+            i += 1
+    return "".join(out)
+
+
+def compile_glob(pattern: str) -> re.Pattern[str]:
+    """
+    Regex for a glob over "/"-separated relative paths.
+
+    As in .gitignore, a pattern without "/" matches the name at any depth
+    ("*.py"); one with "/" matches from the root ("src/**/test_*.py").
+    """
+    pattern = pattern.strip().lstrip("/")
+    if "/" not in pattern:
+        pattern = "**/" + pattern
+    return re.compile(_translate(pattern) + r"\Z")
+
+
+@dataclass
+class Rule:
+    """One ignore pattern, scoped to the directory of the file it came from."""
+    regex: re.Pattern[str]
+    base: str  # Directory the rule applies under ("" = root)
+    negate: bool
+    dir_only: bool
+    anchored: bool  # Matched against the path below `base`, not just the name
+
+    @classmethod
+    def parse(cls, line: str, base: str = "") -> "Rule | None":
+        line = line.rstrip("\n").rstrip()
+        if not line or line.startswith("#"):
+            return None
+        negate = line.startswith("!")
+        if negate:
+            line = line[1:]
+        if line.startswith("\\"):
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            return None
+        anchored = "/" in line
+        line = line.lstrip("/")
+        return cls(re.compile(_translate(line) + r"\Z"), base, negate, dir_only, anchored)
+
+    def matches(self, rel: str, is_dir: bool) -> bool:
+        if self.dir_only and not is_dir:
+            return False
+        if self.base:
+            if not rel.startswith(self.base + "/"):
+                return False
+            rel = rel[len(self.base) + 1:]
+        target = rel if self.anchored else rel.rsplit("/", 1)[-1]
+        return self.regex.match(target) is not None
+
+
+class IgnoreRules:
+    """
+    Decides which workspace paths to skip, like git does.
+
+    Patterns come from `patterns` (applied everywhere) and from ignore
+    files (.gitignore, .ignore, .nanobotignore) in each directory, loaded
+    as the walk reaches it. Later and deeper rules win; `!pattern`
+    re-includes. Paths are relative to `root` with "/" separators.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        patterns: tuple[str, ...] | list[str] = DEFAULT_PATTERNS,
+        ignore_files: tuple[str, ...] = IGNORE_FILES,
+    ):
+        self.root = root
+        self.ignore_files = ignore_files
+        self.rules: list[Rule] = [r for p in patterns if (r := Rule.parse(p))]
+        self._loaded: set[str] = set()
+
+    def load_dir(self, rel_dir: str) -> None:
+        """Read the ignore files of one directory (once)."""
+        if rel_dir in self._loaded:
+            return
+        self._loaded.add(rel_dir)
+        directory = self.root / rel_dir if rel_dir else self.root
+        for name in self.ignore_files:
+            try:
+                text = (directory / name).read_text(encoding="utf-8", errors="replace")
+            except OSError:
+                continue
+            self.rules.extend(r for line in text.splitlines() if (r := Rule.parse(line, rel_dir)))
+
+    def ignored(self, rel: str, is_dir: bool = False) -> bool:
+        """Whether `rel` is excluded (its parent directories are not checked)."""
+        result = False
+        for rule in self.rules:
+            if rule.negate == result and rule.matches(rel, is_dir):
+                result = not rule.negate
+        return result
+
+
+def rules_root(path: Path, workspace: Path | None = None) -> Path:
+    """
+    Directory whose ignore files apply to `path`: the enclosing git
+    repository, else `workspace` when `path` is inside it, else `path`.
+
+    The search for ".git" stops at `workspace`, so a repository around the
+    workspace (a dotfiles repo in $HOME, say) does not hide its files.
+    """
+    stop = workspace if workspace and path.is_relative_to(workspace) else None
+    for parent in (path, *path.parents):
+        if (parent / ".git").exists() or parent == stop:
+            return parent
+    return path
+
+
+def walk(
+    root: Path,
+    rules: IgnoreRules | None = None,
+    max_depth: int | None = None,
+    include_dirs: bool = False,
+) -> Iterator[tuple[str, os.DirEntry, int]]:
+    """
+    Yield (relative path, entry, depth) below `root` in pre-order, pruning ignored directories.
+
+    Entries are sorted by name within a directory, each directory (when
+    `include_dirs`) comes right before its contents, symlinked directories
+    are not followed and unreadable ones are skipped. Depth 1 is the
+    direct children of `root`. `rules` may be rooted above `root` (at the
+    repository root, say): paths are then matched relative to `rules.root`
+    and the ignore files of the directories in between apply too.
+    """
+    prefix = ""
+    if rules and root != rules.root:
+        prefix = root.relative_to(rules.root).as_posix()
+        parts = prefix.split("/")
+        for i in range(len(parts)):
+            rules.load_dir("/".join(parts[:i]))
+
+    def full(rel: str) -> str:
+        return f"{prefix}/{rel}" if prefix and rel else prefix or rel
+
+    def scan(rel_dir: str) -> Iterator[os.DirEntry]:
+        if rules:
+            rules.load_dir(full(rel_dir))
+        try:
+            with os.scandir(root / rel_dir if rel_dir else root) as it:
+                return iter(sorted(it, key=lambda e: e.name))
+        except OSError:
+            return iter(())
+
+    stack: list[tuple[str, Iterator[os.DirEntry]]] = [("", scan(""))]
+    while stack:
+        rel_dir, entries = stack[-1]
+        entry = next(entries, None)
+        if entry is None:
+            stack.pop()
+            continue
+        depth = len(stack)
+        rel = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+        try:
+            is_dir = entry.is_dir(follow_symlinks=False)
+        except OSError:
+            continue
+        if rules and rules.ignored(full(rel), is_dir):
+            continue
+        if is_dir:
+            if include_dirs:
+                yield rel, entry, depth
+            if max_depth is None or depth < max_depth:
+                stack.append((rel, scan(rel)))
+        else:
+            yield rel, entry, depth
@@ -0,0 +1,60 @@
+"""In-process counters and timing summaries."""
+
+import threading
+from collections import defaultdict
+from typing import Any
+
+
+class Metrics:
+    """
+    Minimal process-wide metrics registry.
+
+    Counters are monotonically increasing numbers; observations keep a
+    count/sum/max summary. Names are dotted strings, e.g.
+    "channel.telegram.duplicates_suppressed". Thread-safe so it can be
+    updated from executor threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: dict[str, float] = defaultdict(float)
+        self._summaries: dict[str, dict[str, float]] = {}
+
+    def incr(self, name: str, value: float = 1) -> None:
+        """Increment a counter."""
+        with self._lock:
+            self._counters[name] += value
+
+    def observe(self, name: str, value: float) -> None:
+        """Record one observation (e.g. a latency in seconds)."""
+        with self._lock:
+            s = self._summaries.get(name)
+            if s is None:
+                self._summaries[name] = {"count": 1, "sum": value, "max": value}
+            else:
+                s["count"] += 1
+                s["sum"] += value
+                s["max"] = max(s["max"], value)
+
+    def counter(self, name: str) -> float:
+        """Current value of a counter (0 if never incremented)."""
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def snapshot(self, prefix: str = "") -> dict[str, Any]:
+        """Return a copy of all counters and summaries whose name starts with `prefix`."""
+        with self._lock:
+            data: dict[str, Any] = {k: v for k, v in self._counters.items() if k.startswith(prefix)}
+            for k, s in self._summaries.items():
+                if k.startswith(prefix):
+                    data[k] = {**s, "avg": s["sum"] / s["count"] if s["count"] else 0.0}
+            return data
+
+    def reset(self) -> None:
+        """Clear all metrics."""
+        with self._lock:
+            self._counters.clear()
+            self._summaries.clear()
+
+
+metrics = Metrics()
@@ -0,0 +1,66 @@
+"""Async token-bucket rate limiting."""
+
+import asyncio
+import time
+
+
+class TokenBucket:
+    """
+    Async token bucket.
+
+    Tokens refill continuously at `rate` per second up to `capacity`.
+    `acquire()` waits until enough tokens are available; waiters are
+    served in FIFO order so a burst of callers queues fairly.
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    @property
+    def tokens(self) -> float:
+        """Currently available tokens."""
+        self._refill()
+        return self._tokens
+
+    def penalize(self, seconds: float) -> None:
+        """Drain the bucket so the next acquire waits at least `seconds` (e.g. after a 429)."""
+        self._refill()
+        self._tokens = min(self._tokens, -seconds * self.rate)
+
+    def refund(self, amount: float) -> None:
+        """Return unused tokens (e.g. when a cost estimate turned out too high)."""
+        self._refill()
+        self._tokens = min(self.capacity, self._tokens + amount)
+
+    async def acquire(self, amount: float = 1.0) -> float:
+        """
+        Take `amount` tokens, waiting if necessary.
+
+        Requests larger than the capacity are clamped to the capacity so
+        they can still proceed once the bucket is full.
+
+        Returns:
+            Seconds spent waiting.
+        """
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return waited
+                delay = (amount - self._tokens) / self.rate
+                await asyncio.sleep(delay)
+                waited += delay
@@ -0,0 +1,127 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from nanobot.providers.balancer import LoadBalancedProvider
+from nanobot.providers.context import CallContext, call_context
+from nanobot.providers.errors import LLMConnectionError
+from nanobot.providers.http_pool import HTTPPool
+from nanobot.providers.openai_compat import OpenAICompatProvider
+
+
+class _Replica(ThreadingHTTPServer):
+    """Stand-in replica that answers with its own name after `delay` seconds."""
+
+    def __init__(self, name: str, delay: float = 0.0, port: int = 0):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.name = name
+        self.delay = delay
+        self.calls = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _send(self, payload: dict) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self._send({"data": [{"id": "m"}]})
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        server: _Replica = self.server  # type: ignore[assignment]
+        server.calls += 1
+        threading.Event().wait(server.delay)
+        self._send({"choices": [{"message": {"content": server.name}, "finish_reason": "stop"}]})
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def replicas():
+    servers = [_Replica("a"), _Replica("b")]
+    for s in servers:
+        threading.Thread(target=s.serve_forever, daemon=True).start()
+    yield servers
+    for s in servers:
+        s.shutdown()
+        s.server_close()
+
+
+def _balancer(urls: list[str], **kwargs) -> LoadBalancedProvider:
+    pool = HTTPPool(http2=False)
+    return LoadBalancedProvider(
+        [(u, OpenAICompatProvider(api_base=u, default_model="m", http_pool=pool)) for u in urls],
+        http_pool=pool,
+        **kwargs,
+    )
+
+
+async def _ask(lb: LoadBalancedProvider, session: str = "") -> str:
+    with call_context(CallContext(session_key=session)):
+        response = await lb.chat([{"role": "user", "content": "hi"}])
+    return response.content
+
+
+async def test_sessions_stick_to_one_replica(replicas):
+    lb = _balancer([s.url for s in replicas])
+    first = {key: await _ask(lb, key) for key in ("s1", "s2", "s3", "s4")}
+    again = {key: await _ask(lb, key) for key in first}
+    assert again == first
+    await lb.aclose()
+
+
+async def test_least_outstanding_spreads_concurrent_calls(replicas):
+    for s in replicas:
+        s.delay = 0.2
+    lb = _balancer([s.url for s in replicas])
+    results = await asyncio.gather(*(_ask(lb, f"s{i}") for i in range(4)))
+    assert sorted(results) == ["a", "a", "b", "b"]
+    await lb.aclose()
+
+
+async def test_sticky_replica_left_when_overloaded(replicas):
+    lb = _balancer([s.url for s in replicas], max_skew=1)
+    home = await _ask(lb, "s1")
+    busy = next(r for r in lb.replicas if r.url.startswith(replicas[0 if home == "a" else 1].url))
+    busy.outstanding = 5
+    assert await _ask(lb, "s1") != home
+    await lb.aclose()
+
+
+async def test_dead_replica_marked_down_and_recovers(replicas):
+    reserved = _Replica("c")
+    port = reserved.server_address[1]
+    reserved.server_close()
+    lb = _balancer([f"http://127.0.0.1:{port}/v1", replicas[0].url], health_interval=0.05)
+    lb.replicas[1].outstanding = 1  # Make the dead replica the first pick
+    with pytest.raises(LLMConnectionError):
+        await _ask(lb)
+    assert lb.status()[0]["healthy"] is False
+    lb.replicas[1].outstanding = 0
+    assert await _ask(lb) == "a"
+
+    revived = _Replica("c", port=port)
+    threading.Thread(target=revived.serve_forever, daemon=True).start()
+    try:
+        await asyncio.sleep(0.2)
+        assert lb.status()[0]["healthy"] is True
+        assert await _ask(lb) in ("a", "c")
+    finally:
+        revived.shutdown()
+        revived.server_close()
+    await lb.aclose()
@@ -0,0 +1,171 @@
+from nanobot.agent.tools.filesystem import MultiEditTool, ReadFilesTool
+from nanobot.agent.tools.patch import ApplyPatchTool
+
+PATCH = """\
+--- a/app.py
++++ b/app.py
+@@ -1,4 +1,4 @@
+ import os
+-DEBUG = True
++DEBUG = False
+ 
+ def main():
+@@ -6,2 +6,3 @@
+     run()
+     stop()
++    cleanup()
+--- /dev/null
++++ b/notes/todo.md
+@@ -0,0 +1,2 @@
++# TODO
++- ship it
+--- a/old.txt
++++ /dev/null
+@@ -1 +0,0 @@
+-bye
+"""
+
+APP = "import os\nDEBUG = True\n\ndef main():\n    pass\n    run()\n    stop()\n"
+
+
+async def test_read_files_reads_all_paths_with_a_shared_cap(tmp_path) -> None:
+    (tmp_path / "a.txt").write_text("alpha")
+    (tmp_path / "big.txt").write_text("x\n" * 5000)
+    out = await ReadFilesTool(max_chars=2000).execute([str(tmp_path / "a.txt"), str(tmp_path / "big.txt"), str(tmp_path / "nope")])
+    assert out.startswith(f"==> {tmp_path / 'a.txt'} <==\nalpha\n\n==> {tmp_path / 'big.txt'} <==\nx\n")
+    assert "[Lines 1-500 of 5,000, output capped at 1,000 chars. Use offset=501 to read more.]" in out
+    assert out.endswith(f"==> {tmp_path / 'nope'} <==\nError: File not found: {tmp_path / 'nope'}")
+
+
+async def test_multi_edit_is_all_or_nothing(tmp_path) -> None:
+    path = tmp_path / "cfg.py"
+    path.write_text("a = 1\nb = 1\nc = 2\n")
+    tool = MultiEditTool()
+    out = await tool.execute(str(path), [{"old_text": "a = 1", "new_text": "a = 10"}, {"old_text": "= 1", "new_text": "= 3"}])
+    assert out.startswith("Error: edit 2: old_text appears 2 times")
+    assert path.read_text() == "a = 1\nb = 1\nc = 2\n"
+
+    out = await tool.execute(str(path), [
+        {"old_text": "c = 2", "new_text": "c = 20"},
+        {"old_text": "= 1", "new_text": "= 3", "replace_all": True},
+    ])
+    assert out == f"Successfully applied 2 edits to {path}"
+    assert path.read_text() == "a = 3\nb = 3\nc = 20\n"
+
+
+async def test_apply_patch_changes_creates_and_deletes_files(tmp_path) -> None:
+    (tmp_path / "app.py").write_text(APP)
+    (tmp_path / "old.txt").write_text("bye\n")
+    changed = []
+    out = await ApplyPatchTool(tmp_path, on_change=changed.append).execute(PATCH)
+    assert out == "Successfully applied patch: patched app.py (2 hunks); created notes/todo.md; deleted old.txt"
+    assert (tmp_path / "app.py").read_text() == APP.replace("True", "False") + "    cleanup()\n"
+    assert (tmp_path / "notes" / "todo.md").read_text() == "# TODO\n- ship it\n"
+    assert not (tmp_path / "old.txt").exists()
+    assert len(changed) == 3
+
+
+async def test_apply_patch_tolerates_shifted_lines_and_rejects_mismatches(tmp_path) -> None:
+    (tmp_path / "app.py").write_text("# header\n# more\n" + APP)
+    (tmp_path / "old.txt").write_text("bye\n")
+    tool = ApplyPatchTool(tmp_path)
+    assert (await tool.execute(PATCH)).startswith("Successfully")
+
+    (tmp_path / "app.py").write_text(APP.replace("DEBUG = True", "DEBUG = 1"))
+    (tmp_path / "old.txt").write_text("bye\n")
+    (tmp_path / "notes" / "todo.md").unlink()
+    out = await tool.execute(PATCH)
+    assert out == "Error: app.py: hunk 1 (line 1) does not match the file. No files were changed."
+    assert (tmp_path / "old.txt").exists() and not (tmp_path / "notes" / "todo.md").exists()
+
+
+GIT_PATCH = """\
+diff --git a/x.txt b/x2.txt
+similarity index 66%
+rename from x.txt
+rename to x2.txt
+index de98044..7be73ce 100644
+--- a/x.txt
++++ b/x2.txt
+@@ -1,3 +1,3 @@
+ a
+-b
++B
+ c
+diff --git a/y.txt b/y.txt
+index 9ed40b4..814f4a4 100644
+--- a/y.txt
++++ b/y.txt
+@@ -1,2 +1,2 @@
+ one
+-two
+\\ No newline at end of file
++two
+diff --git a/z.txt b/z.txt
+index 2fa992c..c693f13 100644
+--- a/z.txt
++++ b/z.txt
+@@ -1 +1 @@
+-keep
++kept
+\\ No newline at end of file
+diff --git a/new.txt b/new.txt
+new file mode 100644
+--- /dev/null
++++ b/new.txt
+@@ -0,0 +1 @@
++fresh
+\\ No newline at end of file
+diff --git a/p.txt b/docs/q.txt
+similarity index 100%
+rename from p.txt
+rename to docs/q.txt
+"""
+
+
+async def test_apply_patch_handles_renames_and_missing_final_newlines(tmp_path) -> None:
+    files = {"x.txt": "a\nb\nc\n", "y.txt": "one\ntwo", "z.txt": "keep\n", "p.txt": "same\n"}
+    for name, text in files.items():
+        (tmp_path / name).write_text(text)
+    changed = []
+    out = await ApplyPatchTool(tmp_path, on_change=changed.append).execute(GIT_PATCH)
+    assert out == (
+        "Successfully applied patch: renamed x.txt -> x2.txt (1 hunks); patched y.txt (1 hunks); "
+        "patched z.txt (1 hunks); created new.txt; renamed p.txt -> docs/q.txt"
+    )
+    assert sorted(p.name for p in tmp_path.rglob("*.txt")) == ["new.txt", "q.txt", "x2.txt", "y.txt", "z.txt"]
+    assert (tmp_path / "x2.txt").read_text() == "a\nB\nc\n"
+    assert (tmp_path / "y.txt").read_text() == "one\ntwo\n"
+    assert (tmp_path / "z.txt").read_text() == "kept"
+    assert (tmp_path / "new.txt").read_text() == "fresh"
+    assert (tmp_path / "docs" / "q.txt").read_text() == "same\n"
+    assert len(changed) == 7
+
+
+async def test_apply_patch_rejects_bad_renames_and_copies(tmp_path) -> None:
+    (tmp_path / "p.txt").write_text("same\n")
+    (tmp_path / "q.txt").write_text("taken\n")
+    tool = ApplyPatchTool(tmp_path)
+    rename = "diff --git a/p.txt b/q.txt\nrename from p.txt\nrename to q.txt\n"
+    assert await tool.execute(rename) == "Error: q.txt: file already exists. No files were changed."
+    copy = "diff --git a/p.txt b/r.txt\ncopy from p.txt\ncopy to r.txt\n"
+    assert (await tool.execute(copy)).startswith("Error: file copies are not supported")
+    assert (tmp_path / "p.txt").exists() and (tmp_path / "q.txt").read_text() == "taken\n"
+
+
+async def test_apply_patch_inserts_after_the_old_start_and_keeps_line_breaks_intact(tmp_path) -> None:
+    tool = ApplyPatchTool(tmp_path)
+    (tmp_path / "letters.txt").write_text("a\nb\nc\nd\ne\n")
+    insert = "--- a/letters.txt\n+++ b/letters.txt\n@@ -4,0 +5,2 @@\n+X\n+Y\n"
+    assert (await tool.execute(insert)).startswith("Successfully")
+    assert (tmp_path / "letters.txt").read_text() == "a\nb\nc\nd\nX\nY\ne\n"
+
+    (tmp_path / "ff.txt").write_text("one\x0ctwo\nthree\n")
+    patch = "--- a/ff.txt\n+++ b/ff.txt\n@@ -2 +2 @@\n-three\n+THREE\n"
+    assert (await tool.execute(patch)).startswith("Successfully")
+    assert (tmp_path / "ff.txt").read_text() == "one\x0ctwo\nTHREE\n"
+
+    (tmp_path / "dos.txt").write_bytes(b"one\r\ntwo\r\n")
+    patch = "--- a/dos.txt\n+++ b/dos.txt\n@@ -2 +2 @@\n-two\n+TWO\n"
+    assert (await tool.execute(patch)).startswith("Successfully")
+    assert (tmp_path / "dos.txt").read_bytes() == b"one\r\nTWO\r\n"
@@ -0,0 +1,65 @@
+from nanobot.bus.events import OutboundMessage
+from nanobot.bus.queue import MessageBus
+from nanobot.channels.base import BaseChannel
+from nanobot.channels.dedup import MessageDeduplicator
+from nanobot.config.schema import DedupConfig, TelegramConfig
+
+
+class DummyChannel(BaseChannel):
+    name = "dummy"
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    async def send(self, msg: OutboundMessage) -> None:
+        pass
+
+
+async def test_handle_message_drops_redelivered_duplicates() -> None:
+    bus = MessageBus()
+    channel = DummyChannel(TelegramConfig(), bus)
+    for _ in range(3):
+        await channel._handle_message("u1", "c1", "hi", metadata={"message_id": 42})
+    await channel._handle_message("u1", "c2", "hi", metadata={"message_id": 42})
+    await channel._handle_message("u1", "c1", "no id")
+    await channel._handle_message("u1", "c1", "no id")
+
+    assert bus.inbound_size == 4
+    assert channel.duplicates_suppressed == 2
+
+
+async def test_dedup_can_be_disabled() -> None:
+    bus = MessageBus()
+    channel = DummyChannel(TelegramConfig(dedup=DedupConfig(enabled=False)), bus)
+    await channel._handle_message("u1", "c1", "hi", metadata={"message_id": 1})
+    await channel._handle_message("u1", "c1", "hi", metadata={"message_id": 1})
+    assert bus.inbound_size == 2
+
+
+def test_deduplicator_bounded_and_ttl(monkeypatch) -> None:
+    dedup = MessageDeduplicator(ttl_s=10, max_entries=2)
+    assert not dedup.check_and_add("a")
+    assert not dedup.check_and_add("b")
+    assert not dedup.check_and_add("c")
+    assert len(dedup) == 2
+    assert not dedup.seen("a")
+
+    import nanobot.channels.dedup as mod
+    now = mod.time.time()
+    monkeypatch.setattr(mod.time, "time", lambda: now + 60)
+    assert not dedup.check_and_add("c")
+
+
+def test_deduplicator_persists_across_restarts(tmp_path) -> None:
+    path = tmp_path / "dedup" / "test.log"
+    first = MessageDeduplicator(path=path)
+    first.check_and_add("chat:1")
+    first.check_and_add("chat:2")
+
+    second = MessageDeduplicator(path=path)
+    assert second.check_and_add("chat:1")
+    assert not second.check_and_add("chat:3")
+    assert second.suppressed == 1
@@ -0,0 +1,90 @@
+import asyncio
+import time
+
+from nanobot.bus.events import OutboundMessage
+from nanobot.bus.queue import MessageBus
+from nanobot.channels.base import BaseChannel
+from nanobot.channels.outbound import coalesce_messages, split_text
+from nanobot.config.schema import OutboundConfig, TelegramConfig
+
+
+class RecordingChannel(BaseChannel):
+    name = "test"
+    max_message_length = 10
+
+    def __init__(self, config, bus):
+        super().__init__(config, bus)
+        self.sent: list[OutboundMessage] = []
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    async def send(self, msg: OutboundMessage) -> None:
+        self.sent.append(msg)
+
+
+def test_split_text_prefers_line_breaks() -> None:
+    chunks = split_text("hello\nworld foo", 8)
+    assert chunks == ["hello", "world", "foo"]
+    assert all(len(c) <= 8 for c in chunks)
+
+
+def test_split_text_hard_cut() -> None:
+    assert split_text("a" * 25, 10) == ["a" * 10, "a" * 10, "a" * 5]
+
+
+def test_coalesce_merges_same_chat_runs() -> None:
+    msgs = [
+        OutboundMessage(channel="t", chat_id="1", content="a"),
+        OutboundMessage(channel="t", chat_id="1", content="b"),
+        OutboundMessage(channel="t", chat_id="1", content="c", reply_to="9"),
+    ]
+    merged = coalesce_messages(msgs)
+    assert [m.content for m in merged] == ["a\n\nb", "c"]
+
+
+async def test_deliver_splits_long_messages() -> None:
+    config = TelegramConfig()
+    channel = RecordingChannel(config, MessageBus())
+    await channel.deliver(OutboundMessage(channel="test", chat_id="1", content="x" * 25))
+    await channel.flush_outbound()
+    assert [len(m.content) for m in channel.sent] == [10, 10, 5]
+
+
+async def test_deliver_coalesces_within_window() -> None:
+    config = TelegramConfig(outbound=OutboundConfig(coalesce_ms=20, max_length=1000))
+    channel = RecordingChannel(config, MessageBus())
+    for text in ("one", "two", "three"):
+        await channel.deliver(OutboundMessage(channel="test", chat_id="1", content=text))
+    await channel.flush_outbound()
+    assert [m.content for m in channel.sent] == ["one\n\ntwo\n\nthree"]
+
+
+async def test_deliver_respects_chat_rate() -> None:
+    config = TelegramConfig(outbound=OutboundConfig(chat_rate=20.0, chat_burst=1))
+    channel = RecordingChannel(config, MessageBus())
+    start = time.monotonic()
+    for i in range(3):
+        await channel.deliver(OutboundMessage(channel="test", chat_id="1", content=str(i)))
+    await asyncio.wait_for(channel.flush_outbound(), timeout=2)
+    assert [m.content for m in channel.sent] == ["0", "1", "2"]
+    assert time.monotonic() - start >= 0.09
+
+
+def test_split_text_measures_the_converted_form() -> None:
+    from nanobot.channels.telegram import _markdown_to_telegram_html
+
+    def measure(text: str) -> int:
+        return len(_markdown_to_telegram_html(text))
+
+    text = "\n".join(f"**{i}** a < b && c > d" for i in range(2000))
+    chunks = split_text(text, 4096, measure)
+    assert len(chunks) > 1
+    assert all(measure(c) <= 4096 for c in chunks)
+    assert "\n".join(chunks) == text
+    # Escaping alone (no breaks to cut at) can also overflow a raw-length cut
+    chunks = split_text("<" * 5000, 4096, measure)
+    assert all(measure(c) <= 4096 for c in chunks) and "".join(chunks) == "<" * 5000
@@ -0,0 +1,131 @@
+import asyncio
+import gc
+import os
+import time
+import weakref
+
+from nanobot.agent.tools.jobs import JobManager, JobsTool
+from nanobot.agent.tools.shell import ExecTool
+from nanobot.bus.events import InboundMessage
+from nanobot.providers.context import CallContext, call_context
+
+
+def _ctx(chat_id: str = "42") -> CallContext:
+    return CallContext(origin="agent", channel="telegram", chat_id=chat_id, session_key=f"telegram:{chat_id}")
+
+
+async def _wait_done(manager: JobManager, job_id: str) -> None:
+    job = manager.get(job_id)
+    assert job and job.task
+    await asyncio.wait_for(asyncio.shield(job.task), timeout=5)
+
+
+async def test_background_job_returns_at_once_and_notifies_on_completion(tmp_path) -> None:
+    notices: list[InboundMessage] = []
+
+    async def notify(msg: InboundMessage) -> None:
+        notices.append(msg)
+
+    manager = JobManager(notify=notify)
+    exec_tool = ExecTool(working_dir=str(tmp_path), jobs=manager)
+    jobs = JobsTool(manager)
+    assert "background" in exec_tool.parameters["properties"]
+
+    with call_context(_ctx()):
+        start = time.monotonic()
+        out = await exec_tool.execute("echo one; sleep 0.3; echo two >&2; exit 3", background=True)
+        assert time.monotonic() - start < 0.3
+        assert out.startswith("Started background job ") and "You will be notified" in out
+        job_id = out.split()[3]
+
+        assert (await jobs.execute("status", job_id=job_id)).startswith(f"[{job_id}] running")
+        await _wait_done(manager, job_id)
+        assert (await jobs.execute("tail", job_id=job_id)).endswith("one\ntwo")
+        assert f"[{job_id}] exited with code 3" in await jobs.execute("list")
+
+    assert len(notices) == 1
+    assert notices[0].channel == "system"
+    assert notices[0].chat_id == "telegram:42"
+    assert CallContext.from_inbound(notices[0]).session_key == "telegram:42"
+    assert f"[Background job {job_id} exited with code 3]" in notices[0].content
+
+
+async def test_kill_stops_the_process_group_without_notifying(tmp_path) -> None:
+    notices: list[InboundMessage] = []
+
+    async def notify(msg: InboundMessage) -> None:
+        notices.append(msg)
+
+    manager = JobManager(notify=notify)
+    exec_tool = ExecTool(working_dir=str(tmp_path), jobs=manager)
+    jobs = JobsTool(manager)
+    pidfile = tmp_path / "child.pid"
+
+    with call_context(_ctx()):
+        out = await exec_tool.execute(f"sleep 30 & echo $! > {pidfile}; wait", background=True)
+        job_id = out.split()[3]
+        while not pidfile.exists() or not pidfile.read_text().strip():
+            await asyncio.sleep(0.02)
+        assert "killed (killed on request)" in await jobs.execute("kill", job_id=job_id)
+        assert "already finished" in await jobs.execute("kill", job_id=job_id)
+
+    await asyncio.sleep(0.1)
+    pid = int(pidfile.read_text())
+    try:
+        os.kill(pid, 0)
+        alive = not open(f"/proc/{pid}/stat").read().split()[2] == "Z"
+    except (ProcessLookupError, FileNotFoundError):
+        alive = False
+    assert not alive
+    assert notices == []
+
+
+async def test_jobs_are_scoped_to_their_session_and_capped(tmp_path) -> None:
+    manager = JobManager(max_running=1, timeout_s=0.5)
+    exec_tool = ExecTool(working_dir=str(tmp_path), jobs=manager)
+    jobs = JobsTool(manager)
+
+    with call_context(_ctx("1")):
+        job_id = (await exec_tool.execute("sleep 30", background=True)).split()[3]
+        assert "already running" in await exec_tool.execute("true", background=True)
+    with call_context(_ctx("2")):
+        assert await jobs.execute("status", job_id=job_id) == f"Error: No background job {job_id}"
+        assert await jobs.execute("list") == "No background jobs."
+
+    await _wait_done(manager, job_id)
+    assert manager.get(job_id).state() == "killed (timed out after 0s)"
+
+
+async def test_background_is_rejected_when_jobs_are_disabled(tmp_path) -> None:
+    tool = ExecTool(working_dir=str(tmp_path))
+    assert "background" not in tool.parameters["properties"]
+    assert await tool.execute("true", background=True) == "Error: Background jobs are not enabled"
+
+
+async def test_shutdown_kills_jobs_quietly_and_cancellation_propagates(tmp_path) -> None:
+    notices: list[InboundMessage] = []
+
+    async def notify(msg: InboundMessage) -> None:
+        notices.append(msg)
+
+    manager = JobManager(notify=notify)
+    exec_tool = ExecTool(working_dir=str(tmp_path), jobs=manager)
+    with call_context(_ctx()):
+        first = (await exec_tool.execute("sleep 30", background=True)).split()[3]
+        second = (await exec_tool.execute("sleep 30", background=True)).split()[3]
+
+    await asyncio.sleep(0.1)
+    task = manager.get(second).task
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    assert task.cancelled()
+    assert manager.get(second).state() == "killed (shutdown)"
+
+    manager.kill_all()
+    await _wait_done(manager, first)
+    assert manager.get(first).state() == "killed (shutdown)"
+    assert notices == []
+
+    ref = weakref.ref(JobManager())
+    gc.collect()
+    assert ref() is None
@@ -0,0 +1,60 @@
+import asyncio
+import os
+import time
+
+from nanobot.agent.tools.shell import ExecTool, OutputBuffer
+from nanobot.bus.events import OutboundMessage
+from nanobot.providers.context import CallContext, call_context
+
+
+def test_output_buffer_keeps_head_and_tail_within_limit() -> None:
+    buf = OutputBuffer(limit=100)
+    for i in range(1000):
+        buf.write(f"line {i:04}\n".encode())
+    assert len(buf.head) + len(buf.tail) == 100
+    text = buf.text()
+    assert text.startswith("line 0000\n")
+    assert text.endswith("line 0999\n")
+    assert f"({buf.total - 100:,} bytes omitted)" in text
+    assert buf.last_line() == "line 0999"
+
+
+async def test_chatty_command_output_is_bounded(tmp_path) -> None:
+    tool = ExecTool(working_dir=str(tmp_path), max_output=2000)
+    out = await tool.execute("seq 1 200000; echo oops >&2; exit 3")
+    assert out.startswith("1\n2\n3\n")
+    assert "200000\n" in out and "bytes omitted" in out
+    assert out.endswith("STDERR:\noops\n\n\nExit code: 3")
+    assert len(out) < 2500
+
+
+async def test_timeout_kills_the_whole_process_group(tmp_path) -> None:
+    pidfile = tmp_path / "child.pid"
+    tool = ExecTool(working_dir=str(tmp_path), timeout=1)
+    start = time.monotonic()
+    out = await tool.execute(f"echo started; sleep 30 & echo $! > {pidfile}; wait")
+    assert time.monotonic() - start < 5
+    assert out.startswith("Error: Command timed out after 1 seconds (process group killed)")
+    assert "Output so far:\nstarted" in out
+    await asyncio.sleep(0.1)
+    pid = int(pidfile.read_text())
+    try:
+        os.kill(pid, 0)
+        with open(f"/proc/{pid}/stat") as f:
+            assert f.read().split()[2] == "Z"  # Only a zombie left, if anything
+    except (ProcessLookupError, FileNotFoundError):
+        pass
+
+
+async def test_long_commands_report_progress_to_the_chat(tmp_path) -> None:
+    sent: list[OutboundMessage] = []
+
+    async def send(msg: OutboundMessage) -> None:
+        sent.append(msg)
+
+    tool = ExecTool(working_dir=str(tmp_path), progress_interval_s=0.2, send_callback=send)
+    with call_context(CallContext(channel="telegram", chat_id="42")):
+        out = await tool.execute("echo step1; sleep 0.5; echo done")
+    assert out == "step1\ndone\n"
+    assert sent and sent[0].chat_id == "42" and "still running" in sent[0].content
+    assert sent[0].content.endswith("step1")
@@ -0,0 +1,159 @@
+import asyncio
+from typing import Any
+
+import pytest
+
+from nanobot.providers.base import LLMProvider, LLMResponse
+from nanobot.providers.errors import (
+    LLMBadRequestError,
+    LLMServerError,
+    LLMUnavailableError,
+    classify_error,
+)
+from nanobot.providers.failover import CircuitBreaker, Endpoint, FailoverProvider
+
+
+class FlakyProvider(LLMProvider):
+    """Raises the queued errors first, then answers (optionally after a delay)."""
+
+    def __init__(self, errors: list[Exception] | None = None, answer: str = "ok", delay: float = 0.0):
+        super().__init__()
+        self.errors = list(errors or [])
+        self.answer = answer
+        self.delay = delay
+        self.calls: list[str | None] = []
+
+    async def chat(self, messages: list[dict[str, Any]], tools=None, model=None,
+                   max_tokens: int = 4096, temperature: float = 0.7) -> LLMResponse:
+        self.calls.append(model)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.errors:
+            raise self.errors.pop(0)
+        return LLMResponse(content=self.answer)
+
+    def get_default_model(self) -> str:
+        return "primary-model"
+
+
+MESSAGES = [{"role": "user", "content": "hi"}]
+
+
+def _overloaded() -> LLMServerError:
+    return LLMServerError("529 Overloaded", status_code=529)
+
+
+async def test_transient_error_is_retried() -> None:
+    primary = FlakyProvider([_overloaded()])
+    provider = FailoverProvider(primary, backoff_base=0.001)
+    response = await provider.chat(MESSAGES)
+    assert response.content == "ok"
+    assert len(primary.calls) == 2
+
+
+async def test_failover_to_next_model_after_retries() -> None:
+    primary = FlakyProvider([_overloaded()] * 3)
+    backup = FlakyProvider(answer="from backup")
+    provider = FailoverProvider(
+        primary,
+        fallbacks={"*": [Endpoint(name="backup", provider=backup, model="backup-model")]},
+        max_retries=2,
+        backoff_base=0.001,
+    )
+    response = await provider.chat(MESSAGES)
+    assert response.content == "from backup"
+    assert len(primary.calls) == 3
+    assert backup.calls == ["backup-model"]
+
+
+async def test_bad_request_is_not_retried() -> None:
+    primary = FlakyProvider([LLMBadRequestError("context too long", status_code=400)])
+    provider = FailoverProvider(primary, backoff_base=0.001)
+    with pytest.raises(LLMBadRequestError):
+        await provider.chat(MESSAGES)
+    assert len(primary.calls) == 1
+
+
+async def test_exhausted_chain_raises_instead_of_returning_content() -> None:
+    provider = FailoverProvider(FlakyProvider([_overloaded()] * 5), max_retries=1, backoff_base=0.001)
+    with pytest.raises(LLMUnavailableError) as exc:
+        await provider.chat(MESSAGES)
+    assert len(exc.value.errors) == 2
+
+
+async def test_open_circuit_skips_endpoint() -> None:
+    primary = FlakyProvider([_overloaded()] * 10)
+    backup = FlakyProvider(answer="backup")
+    provider = FailoverProvider(
+        primary,
+        fallbacks={"*": [Endpoint(name="backup", provider=backup)]},
+        max_retries=0,
+        failure_threshold=2,
+        reset_timeout=60,
+    )
+    for _ in range(3):
+        assert (await provider.chat(MESSAGES)).content == "backup"
+    assert len(primary.calls) == 2
+    assert provider.status()["primary:primary-model"] == "open"
+
+
+async def test_hedged_request_wins_when_primary_is_slow() -> None:
+    primary = FlakyProvider(answer="slow", delay=1.0)
+    backup = FlakyProvider(answer="fast")
+    provider = FailoverProvider(
+        primary,
+        fallbacks={"*": [Endpoint(name="backup", provider=backup)]},
+        hedge_after=0.05,
+    )
+    response = await provider.chat(MESSAGES)
+    assert response.content == "fast"
+
+
+async def test_cancelling_the_caller_cancels_the_hedge_window_call() -> None:
+    primary = FlakyProvider(answer="slow", delay=5.0)
+    provider = FailoverProvider(primary, hedge_after=1.0)
+    before = asyncio.all_tasks()
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(provider.chat(MESSAGES), timeout=0.05)
+    await asyncio.sleep(0)
+    assert not [t for t in asyncio.all_tasks() - before if not t.done()]
+
+
+def test_circuit_breaker_half_open_probe() -> None:
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.0)
+    breaker.record_failure()
+    assert breaker.state == "half_open"
+    assert breaker.allow() is True
+    assert breaker.allow() is False  # only one probe at a time
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+async def test_cancelled_half_open_probe_frees_the_endpoint() -> None:
+    primary = FlakyProvider([_overloaded()])
+    provider = FailoverProvider(primary, max_retries=0, failure_threshold=1, reset_timeout=0.0)
+    with pytest.raises(LLMUnavailableError):
+        await provider.chat(MESSAGES)
+    assert provider.status()["primary:primary-model"] == "half_open"
+
+    primary.delay = 5.0
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(provider.chat(MESSAGES), timeout=0.05)
+
+    primary.delay = 0.0
+    assert (await provider.chat(MESSAGES)).content == "ok"
+    assert provider.status()["primary:primary-model"] == "closed"
+
+
+def test_classify_error_by_status_and_retry_after() -> None:
+    class FakeResponse:
+        status_code = 429
+        headers = {"retry-after": "3"}
+
+    class RateLimitError(Exception):
+        response = FakeResponse()
+
+    error = classify_error(RateLimitError("slow down"))
+    assert error.kind == "rate_limit"
+    assert error.retryable
+    assert error.retry_after == 3.0
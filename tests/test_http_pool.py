@@ -0,0 +1,88 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import litellm
+import pytest
+
+from nanobot.providers.errors import LLMError
+from nanobot.providers.http_pool import HTTPPool
+from nanobot.providers.litellm_provider import LiteLLMProvider
+
+
+class _OkHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def local_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _OkHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/"
+    server.shutdown()
+
+
+async def test_pool_reuses_keepalive_connection(local_server) -> None:
+    pool = HTTPPool(http2=False, name="test_pool_reuse")
+    for _ in range(5):
+        resp = await pool.client.get(local_server)
+        assert resp.status_code == 200
+    stats = pool.stats()
+    assert stats["requests"] == 5
+    assert stats["connections_opened"] == 1
+    assert stats["reused"] == 4
+    await pool.aclose()
+
+
+async def test_litellm_provider_passes_pooled_client_for_anthropic() -> None:
+    pool = HTTPPool(http2=False, name="test_pool_litellm")
+    provider = LiteLLMProvider(api_key="dummy", default_model="anthropic/claude-opus-4-5", http_pool=pool)
+
+    captured = {}
+
+    async def fake_acompletion(**kwargs):
+        captured.update(kwargs)
+        raise RuntimeError("stop")
+
+    with patch("nanobot.providers.litellm_provider.acompletion", side_effect=fake_acompletion):
+        with pytest.raises(LLMError):
+            await provider.chat(messages=[{"role": "user", "content": "hi"}])
+
+    assert captured["client"].client is pool.client
+    await provider.aclose()
+
+
+async def test_litellm_providers_do_not_steal_the_shared_session() -> None:
+    first, second = HTTPPool(http2=False, name="test_pool_a"), HTTPPool(http2=False, name="test_pool_b")
+    providers = [
+        LiteLLMProvider(api_key="dummy", default_model="anthropic/claude-opus-4-5", http_pool=pool)
+        for pool in (first, second)
+    ]
+    clients = []
+
+    async def fake_acompletion(**kwargs):
+        clients.append(kwargs["client"])
+        raise RuntimeError("stop")
+
+    litellm.aclient_session = None
+    with patch("nanobot.providers.litellm_provider.acompletion", side_effect=fake_acompletion):
+        for provider in providers:
+            with pytest.raises(LLMError):
+                await provider.chat(messages=[{"role": "user", "content": "hi"}])
+
+    # The first pool keeps the global; each provider's Anthropic handler uses its own pool
+    assert litellm.aclient_session is first.client
+    assert [c.client for c in clients] == [first.client, second.client]
+    for provider in providers:
+        await provider.aclose()
+    assert litellm.aclient_session is None
@@ -0,0 +1,46 @@
+import asyncio
+import threading
+import time
+
+from nanobot.agent.tools.filesystem import EditFileTool, ListDirTool, ReadFileTool, WriteFileTool
+from nanobot.agent.tools.iopool import IOPool
+from nanobot.utils.metrics import metrics
+
+
+async def test_file_tools_run_on_worker_threads_and_record_latency(tmp_path) -> None:
+    path = str(tmp_path / "notes.txt")
+    before = metrics.counter("tool.io.edit_file.calls")
+    assert "Successfully wrote" in await WriteFileTool().execute(path, "hello world")
+    assert await EditFileTool().execute(path, "world", "there") == f"Successfully edited {path}"
+    assert await ReadFileTool().execute(path) == "hello there"
+    assert "notes.txt" in await ListDirTool().execute(str(tmp_path))
+
+    snap = metrics.snapshot("tool.io.")
+    assert metrics.counter("tool.io.edit_file.calls") == before + 1
+    assert snap["tool.io.read_file.run_s"]["count"] >= 1
+    assert "tool.io.list_dir.wait_s" in snap
+
+
+async def test_slow_io_does_not_block_the_loop() -> None:
+    pool = IOPool(max_workers=2)
+    threads = []
+
+    def slow() -> str:
+        threads.append(threading.current_thread().name)
+        time.sleep(0.2)
+        return "done"
+
+    ticks = 0
+
+    async def ticker() -> None:
+        nonlocal ticks
+        for _ in range(10):
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    start = time.monotonic()
+    results = await asyncio.gather(pool.run("slow", slow), pool.run("slow", slow), ticker())
+    assert results[:2] == ["done", "done"]
+    assert ticks == 10 and time.monotonic() - start < 0.35  # both ran in parallel beside the loop
+    assert all(name.startswith("nanobot-io") for name in threads)
+    pool.shutdown()
@@ -0,0 +1,64 @@
+from nanobot.agent.tools.filesystem import ListDirTool
+from nanobot.utils.ignore import compile_glob
+
+
+def _tree(root, files: dict[str, str]) -> None:
+    for name, text in files.items():
+        (root / name).parent.mkdir(parents=True, exist_ok=True)
+        (root / name).write_text(text)
+
+
+async def test_single_level_listing_is_unchanged(tmp_path) -> None:
+    _tree(tmp_path, {"b.txt": "", "a/x.py": ""})
+    assert await ListDirTool().execute(str(tmp_path)) == "📁 a\n📄 b.txt"
+    (tmp_path / "empty").mkdir()
+    assert await ListDirTool().execute(str(tmp_path / "empty")) == f"Directory {tmp_path / 'empty'} is empty"
+
+
+async def test_tree_honours_depth_ignores_and_sizes(tmp_path) -> None:
+    _tree(tmp_path, {
+        ".gitignore": "dist/\n", "dist/out.js": "", "node_modules/m.js": "",
+        "src/app.py": "x" * 2048, "src/pkg/deep/mod.py": "", "README.md": "hi",
+    })
+    out = await ListDirTool().execute(str(tmp_path), depth=2, sizes=True)
+    assert out.splitlines() == [
+        "📄 .gitignore (6 B)",
+        "📄 README.md (2 B)",
+        "📁 src",
+        "  📄 app.py (2.0 KB)",
+        "  📁 pkg",
+    ]
+    assert "node_modules" in await ListDirTool().execute(str(tmp_path), include_ignored=True)
+
+
+async def test_pattern_lists_matching_files_at_any_depth(tmp_path) -> None:
+    _tree(tmp_path, {"a.py": "", "src/b.py": "", "src/c.txt": "", "src/t/test_d.py": ""})
+    tool = ListDirTool()
+    assert await tool.execute(str(tmp_path), pattern="*.py") == "📄 a.py\n📄 src/b.py\n📄 src/t/test_d.py"
+    assert await tool.execute(str(tmp_path), pattern="src/**/test_*.py") == "📄 src/t/test_d.py"
+    assert compile_glob("src/*.py").match("src/b.py") and not compile_glob("src/*.py").match("src/t/x.py")
+
+
+async def test_listing_is_capped(tmp_path) -> None:
+    _tree(tmp_path, {f"f{i:03}.txt": "" for i in range(50)})
+    out = await ListDirTool(max_entries=10).execute(str(tmp_path))
+    assert out.count("📄") == 10
+    assert "[Listing truncated after 10 entries." in out
+
+
+async def test_subdirectory_listing_honours_repository_ignore_files(tmp_path) -> None:
+    _tree(tmp_path, {
+        ".git/HEAD": "", ".gitignore": "*.log\nsrc/gen/\n", "src/.gitignore": "tmp/\n",
+        "src/app.py": "", "src/app.log": "", "src/gen/x.py": "", "src/pkg/tmp/y.py": "", "src/pkg/z.py": "",
+    })
+    out = await ListDirTool().execute(str(tmp_path / "src" / "pkg"))
+    assert out == "📄 z.py"
+    out = await ListDirTool().execute(str(tmp_path / "src"), pattern="*.py")
+    assert out == "📄 app.py\n📄 pkg/z.py"
+
+    # Without a repository, the workspace's ignore files apply
+    (tmp_path / ".git" / "HEAD").unlink()
+    (tmp_path / ".git").rmdir()
+    tool = ListDirTool(workspace=tmp_path)
+    assert await tool.execute(str(tmp_path / "src"), pattern="*.py") == "📄 app.py\n📄 pkg/z.py"
+    assert "app.log" in await ListDirTool().execute(str(tmp_path / "src"))
@@ -0,0 +1,110 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from nanobot.providers.errors import LLMRateLimitError
+from nanobot.providers.http_pool import HTTPPool
+from nanobot.providers.openai_compat import OpenAICompatProvider
+from nanobot.providers.ratelimit import RateLimit, RateLimitedProvider, RateLimiter, estimate_tokens
+
+
+class _StrictServer(ThreadingHTTPServer):
+    """Stand-in endpoint that answers 429 when requests arrive faster than `min_interval`."""
+
+    def __init__(self, min_interval: float):
+        super().__init__(("127.0.0.1", 0), _StrictHandler)
+        self.min_interval = min_interval
+        self.last = 0.0
+        self.rejected = 0
+        self.lock = threading.Lock()
+
+
+class _StrictHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        server: _StrictServer = self.server  # type: ignore[assignment]
+        with server.lock:
+            now = time.monotonic()
+            limited = now - server.last < server.min_interval
+            if limited:
+                server.rejected += 1
+            else:
+                server.last = now
+        if limited:
+            body = b'{"error": {"message": "rate limited"}}'
+            self.send_response(429)
+            self.send_header("Retry-After", "0.2")
+        else:
+            body = json.dumps({
+                "choices": [{"message": {"content": "ok"}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 5, "completion_tokens": 1, "total_tokens": 6},
+            }).encode()
+            self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def strict_server():
+    server = _StrictServer(min_interval=0.05)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+
+
+def _client(server: _StrictServer, name: str) -> OpenAICompatProvider:
+    return OpenAICompatProvider(
+        api_base=f"http://127.0.0.1:{server.server_port}/v1",
+        default_model="gpt-4o",
+        http_pool=HTTPPool(http2=False, name=name),
+    )
+
+
+MESSAGES = [{"role": "user", "content": "hi"}]
+
+
+async def test_unlimited_burst_hits_429(strict_server) -> None:
+    provider = _client(strict_server, "test_rl_burst")
+    results = await asyncio.gather(*(provider.chat(MESSAGES) for _ in range(4)), return_exceptions=True)
+    await provider.aclose()
+    assert any(isinstance(r, LLMRateLimitError) for r in results)
+
+
+async def test_limiter_queues_callers_under_server_limit(strict_server) -> None:
+    limiter = RateLimiter([RateLimit(model="gpt-4o", rpm=600, burst_s=0.1)])  # 10/s, no burst
+    provider = RateLimitedProvider(_client(strict_server, "test_rl_queue"), limiter)
+    start = time.monotonic()
+    results = await asyncio.gather(*(provider.chat(MESSAGES) for _ in range(4)))
+    await provider.aclose()
+    assert [r.content for r in results] == ["ok"] * 4
+    assert strict_server.rejected == 0
+    assert time.monotonic() - start >= 0.25
+
+
+async def test_429_penalizes_bucket(strict_server) -> None:
+    limiter = RateLimiter([RateLimit(model="*", rpm=6000)])
+    strict_server.last = time.monotonic()  # next request will be rejected
+    provider = RateLimitedProvider(_client(strict_server, "test_rl_penalty"), limiter)
+    with pytest.raises(LLMRateLimitError):
+        await provider.chat(MESSAGES)
+    waited = await limiter.acquire("gpt-4o", 1)
+    await provider.aclose()
+    assert waited >= 0.15
+
+
+def test_estimate_tokens_counts_prompt_and_completion_budget() -> None:
+    messages = [{"role": "system", "content": "x" * 400}, {"role": "user", "content": "y" * 40}]
+    assert estimate_tokens(messages, max_tokens=100) == 100 + 10 + 8 + 100
+    assert RateLimiter([RateLimit(model="claude", tpm=1000)]).rule_for("gpt-4o") is None
@@ -0,0 +1,65 @@
+from typing import Any
+
+from nanobot.agent.loop import AgentLoop
+from nanobot.agent.loop_guard import ToolLoopGuard
+from nanobot.bus.queue import MessageBus
+from nanobot.providers.base import LLMProvider, LLMResponse, ToolCallRequest
+from nanobot.session.manager import SessionManager
+from nanobot.utils.metrics import metrics
+
+
+def _verdicts(guard: ToolLoopGuard, calls: list[tuple[str, dict]]) -> list[str]:
+    out = []
+    for name, args in calls:
+        guard.record(name, args)
+        out.append(guard.check())
+    return out
+
+
+def test_same_call_warns_then_stops() -> None:
+    calls = [("read_file", {"path": "a"})] * 5
+    assert _verdicts(ToolLoopGuard(3, 5), calls) == ["ok", "ok", "warn", "warn", "stop"]
+
+
+def test_alternating_calls_are_a_loop() -> None:
+    a, b = ("exec", {"command": "make"}), ("read_file", {"path": "log"})
+    assert _verdicts(ToolLoopGuard(3, 5), [a, b] * 5)[-1] == "stop"
+
+
+def test_progressing_calls_are_fine() -> None:
+    calls = [("read_file", {"path": f"f{i}"}) for i in range(10)]
+    assert set(_verdicts(ToolLoopGuard(3, 5), calls)) == {"ok"}
+
+
+class _StuckProvider(LLMProvider):
+    """Calls the same tool forever unless tools are withheld."""
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self.calls = 0
+
+    async def chat(self, messages: list[dict[str, Any]], tools=None, model=None, max_tokens=4096, temperature=0.7) -> LLMResponse:
+        self.calls += 1
+        if tools is None:
+            return LLMResponse(content="I could not make progress.")
+        return LLMResponse(content=None, tool_calls=[
+            ToolCallRequest(id=f"c{self.calls}", name="list_dir", arguments={"path": self.path})
+        ])
+
+    def get_default_model(self) -> str:
+        return "stuck"
+
+
+async def test_agent_loop_stops_runaway_tool_calls(tmp_path) -> None:
+    provider = _StuckProvider(str(tmp_path))
+    agent = AgentLoop(
+        bus=MessageBus(),
+        provider=provider,
+        workspace=tmp_path,
+        session_manager=SessionManager(tmp_path, sessions_dir=tmp_path / "sessions"),
+    )
+    stopped = metrics.counter("agent.loop_guard.stopped")
+    assert await agent.process_direct("list it") == "I could not make progress."
+    assert provider.calls == 6  # 5 looping iterations + 1 final call, not 20
+    assert metrics.counter("agent.loop_guard.stopped") == stopped + 1
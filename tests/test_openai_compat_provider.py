@@ -0,0 +1,113 @@
+import json
+import subprocess
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from nanobot.providers.errors import LLMConnectionError, LLMServerError
+from nanobot.providers.http_pool import HTTPPool
+from nanobot.providers.openai_compat import OpenAICompatProvider
+
+
+class _ChatHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    requests: list[dict] = []
+    reply: bytes | None = None  # Raw body to send instead of the canned completion
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        _ChatHandler.requests.append({"path": self.path, "auth": self.headers.get("Authorization"), "body": body})
+        data = json.dumps({
+            "choices": [{
+                "finish_reason": "tool_calls",
+                "message": {
+                    "content": None,
+                    "tool_calls": [{
+                        "id": "call_1",
+                        "type": "function",
+                        "function": {"name": "read_file", "arguments": "{\"path\": \"a.txt\"}"},
+                    }],
+                },
+            }],
+            "usage": {"prompt_tokens": 12, "completion_tokens": 3, "total_tokens": 15},
+        }).encode() if _ChatHandler.reply is None else _ChatHandler.reply
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def chat_server():
+    _ChatHandler.requests = []
+    _ChatHandler.reply = None
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ChatHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/v1"
+    server.shutdown()
+
+
+async def test_chat_parses_tool_calls_and_strips_routing_prefix(chat_server) -> None:
+    provider = OpenAICompatProvider(
+        api_key="sk-test",
+        api_base=chat_server,
+        default_model="hosted_vllm/llama-3",
+        http_pool=HTTPPool(http2=False, name="test_openai_compat"),
+    )
+    tools = [{"type": "function", "function": {"name": "read_file", "parameters": {"type": "object"}}}]
+    response = await provider.chat(messages=[{"role": "user", "content": "hi"}], tools=tools)
+    await provider.aclose()
+
+    assert response.finish_reason == "tool_calls"
+    assert response.tool_calls[0].name == "read_file"
+    assert response.tool_calls[0].arguments == {"path": "a.txt"}
+    assert response.usage["total_tokens"] == 15
+
+    sent = _ChatHandler.requests[0]
+    assert sent["path"] == "/v1/chat/completions"
+    assert sent["auth"] == "Bearer sk-test"
+    assert sent["body"]["model"] == "llama-3"
+    assert sent["body"]["tool_choice"] == "auto"
+
+
+async def test_unusable_200_body_raises_server_error(chat_server) -> None:
+    provider = OpenAICompatProvider(
+        api_base=chat_server,
+        default_model="llama-3",
+        http_pool=HTTPPool(http2=False, name="test_openai_compat_body"),
+    )
+    try:
+        for body in (b"<html>Bad gateway</html>", b'{"error": {"message": "upstream down"}}', b'{"choices": []}'):
+            _ChatHandler.reply = body
+            with pytest.raises(LLMServerError) as exc:
+                await provider.chat(messages=[{"role": "user", "content": "hi"}])
+            assert exc.value.status_code == 200
+            assert body.decode() in str(exc.value)
+    finally:
+        await provider.aclose()
+
+
+async def test_connection_failure_raises_typed_error() -> None:
+    provider = OpenAICompatProvider(
+        api_base="http://127.0.0.1:1/v1",
+        http_pool=HTTPPool(http2=False, connect_timeout=1.0, name="test_openai_compat_err"),
+    )
+    with pytest.raises(LLMConnectionError):
+        await provider.chat(messages=[{"role": "user", "content": "hi"}])
+    await provider.aclose()
+
+
+def test_import_does_not_load_litellm() -> None:
+    code = (
+        "import sys, nanobot.providers, nanobot.providers.openai_compat, nanobot.agent.loop; "
+        "print('litellm' in sys.modules)"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "False"
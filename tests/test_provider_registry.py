@@ -0,0 +1,72 @@
+import asyncio
+import os
+from typing import Any
+from unittest.mock import patch
+
+import litellm
+
+from nanobot.providers.base import LLMProvider, LLMResponse
+from nanobot.providers.litellm_provider import LiteLLMProvider
+from nanobot.providers.registry import ProviderRegistry
+
+
+class NamedProvider(LLMProvider):
+    def __init__(self, api_base: str):
+        super().__init__(api_base=api_base)
+
+    async def chat(self, messages: list[dict[str, Any]], tools=None, model=None,
+                   max_tokens: int = 4096, temperature: float = 0.7) -> LLMResponse:
+        await asyncio.sleep(0)
+        return LLMResponse(content=f"{model}@{self.api_base}")
+
+    def get_default_model(self) -> str:
+        return "unused"
+
+
+async def test_registry_creates_one_instance_per_model() -> None:
+    created: list[str] = []
+
+    def factory(model: str) -> LLMProvider:
+        created.append(model)
+        return NamedProvider("http://local-vllm" if model.startswith("hosted_vllm/") else "https://hosted")
+
+    registry = ProviderRegistry(factory, default_model="anthropic/claude-opus-4-5")
+    results = await asyncio.gather(
+        registry.chat([{"role": "user", "content": "a"}]),
+        registry.chat([{"role": "user", "content": "b"}], model="hosted_vllm/llama-3"),
+        registry.chat([{"role": "user", "content": "c"}]),
+    )
+    assert [r.content for r in results] == [
+        "anthropic/claude-opus-4-5@https://hosted",
+        "hosted_vllm/llama-3@http://local-vllm",
+        "anthropic/claude-opus-4-5@https://hosted",
+    ]
+    assert created == ["anthropic/claude-opus-4-5", "hosted_vllm/llama-3"]
+
+
+async def test_litellm_providers_keep_credentials_per_instance() -> None:
+    env_before = dict(os.environ)
+    base_before = litellm.api_base
+    hosted = LiteLLMProvider(api_key="sk-ant-1", default_model="anthropic/claude-opus-4-5")
+    local = LiteLLMProvider(api_key="local-key", api_base="http://127.0.0.1:8000/v1", default_model="llama-3")
+    assert dict(os.environ) == env_before
+    assert litellm.api_base == base_before
+
+    calls: list[dict[str, Any]] = []
+
+    async def fake_acompletion(**kwargs):
+        calls.append(kwargs)
+        raise RuntimeError("stop")
+
+    with patch("nanobot.providers.litellm_provider.acompletion", side_effect=fake_acompletion):
+        await asyncio.gather(
+            hosted.chat([{"role": "user", "content": "hi"}]),
+            local.chat([{"role": "user", "content": "hi"}]),
+            return_exceptions=True,
+        )
+
+    by_model = {c["model"]: c for c in calls}
+    assert by_model["anthropic/claude-opus-4-5"]["api_key"] == "sk-ant-1"
+    assert "api_base" not in by_model["anthropic/claude-opus-4-5"]
+    assert by_model["hosted_vllm/llama-3"]["api_key"] == "local-key"
+    assert by_model["hosted_vllm/llama-3"]["api_base"] == "http://127.0.0.1:8000/v1"
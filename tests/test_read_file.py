@@ -0,0 +1,73 @@
+import tracemalloc
+
+from nanobot.agent.tools.fileread import LineIndex, is_binary, line_indexes, read_lines
+from nanobot.agent.tools.filesystem import ReadFileTool
+
+
+def _log(path, lines: int) -> None:
+    path.write_text("".join(f"line {i}\n" for i in range(1, lines + 1)))
+
+
+async def test_small_file_is_returned_whole(tmp_path) -> None:
+    (tmp_path / "a.txt").write_text("hello\nworld")
+    assert await ReadFileTool().execute(str(tmp_path / "a.txt")) == "hello\nworld"
+
+
+async def test_large_file_is_capped_with_continuation_hint(tmp_path) -> None:
+    _log(tmp_path / "big.log", 10000)
+    tool = ReadFileTool(max_chars=100)
+    out = await tool.execute(str(tmp_path / "big.log"))
+    assert out.startswith("line 1\nline 2\n")
+    assert "[Lines 1-13 of 10,000, output capped at 100 chars. Use offset=14 to read more.]" in out
+
+    out = await tool.execute(str(tmp_path / "big.log"), offset=14, limit=3)
+    assert out == "line 14\nline 15\nline 16\n\n[Lines 14-16 of 10,000. Use offset=17 to read more.]"
+
+
+async def test_line_index_seeks_across_checkpoints(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr("nanobot.agent.tools.fileread.CHUNK", 64)
+    _log(tmp_path / "big.log", 5000)
+    index = LineIndex.build(tmp_path / "big.log")
+    assert index.lines == 5000 and len(index.offsets) > 100
+    out = await ReadFileTool().execute(str(tmp_path / "big.log"), offset=4999)
+    assert out == "line 4999\nline 5000\n\n[Lines 4999-5000 of 5,000.]"
+    assert "offset 6000 is past the end" in await ReadFileTool().execute(str(tmp_path / "big.log"), offset=6000)
+
+
+async def test_index_is_rebuilt_when_the_file_changes(tmp_path) -> None:
+    path = tmp_path / "grow.log"
+    _log(path, 3)
+    assert line_indexes.get(path).lines == 3
+    assert line_indexes.get(path) is line_indexes.get(path)
+    with open(path, "a") as f:
+        f.write("line 4\nline 5")
+    assert line_indexes.get(path).lines == 5
+
+
+async def test_binary_files_need_byte_mode(tmp_path) -> None:
+    path = tmp_path / "blob.bin"
+    path.write_bytes(bytes(range(256)))
+    assert is_binary(path.read_bytes())
+    assert not is_binary("héllo wörld".encode()[:-1])  # cut multi-byte char is still text
+    tool = ReadFileTool()
+    assert "binary file" in await tool.execute(str(path))
+    out = await tool.execute(str(path), byte_offset=16, byte_limit=16)
+    assert out.startswith("00000010  10 11 12")
+    assert "[Bytes 16-32 of 256. Use byte_offset=32 to read more.]" in out
+
+
+def test_huge_single_line_is_read_in_bounded_memory(tmp_path) -> None:
+    path = tmp_path / "minified.js"
+    path.write_bytes(b"x" * 30_000_000 + "\n\u00e9\u00e9\n".encode())
+    line_indexes.get(path)
+
+    tracemalloc.start()
+    try:
+        head = read_lines(path, 1, None, max_chars=1000)
+        second = read_lines(path, 2, 1, max_chars=3)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert head.text == "x" * 1000 and head.truncated
+    assert second.text == "\u00e9\u00e9\n" and not second.truncated
+    assert peak < 5_000_000
@@ -0,0 +1,118 @@
+import asyncio
+from typing import Any
+
+from nanobot.agent.loop import AgentLoop
+from nanobot.bus.events import InboundMessage
+from nanobot.bus.queue import MessageBus
+from nanobot.providers.base import LLMProvider, LLMResponse, ToolCallRequest
+from nanobot.replay import (
+    RecordingProvider,
+    ReplayProvider,
+    ReplayToolRegistry,
+    TrafficLog,
+    TrafficRecorder,
+    TrafficReplayer,
+)
+from nanobot.replay.recorder import tool_fingerprint
+from nanobot.session.manager import SessionManager
+
+
+class ScriptedProvider(LLMProvider):
+    """Calls list_dir once, then answers."""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    async def chat(self, messages: list[dict[str, Any]], tools=None, model=None,
+                   max_tokens: int = 4096, temperature: float = 0.7) -> LLMResponse:
+        self.calls += 1
+        if messages[-1]["role"] == "user":
+            return LLMResponse(
+                content=None,
+                tool_calls=[ToolCallRequest(id="c1", name="list_dir", arguments={"path": "."})],
+            )
+        return LLMResponse(content="done")
+
+    def get_default_model(self) -> str:
+        return "scripted"
+
+
+def _agent(tmp_path, provider: LLMProvider) -> AgentLoop:
+    return AgentLoop(
+        bus=MessageBus(),
+        provider=provider,
+        workspace=tmp_path,
+        session_manager=SessionManager(tmp_path, sessions_dir=tmp_path / "sessions"),
+    )
+
+
+async def test_record_then_replay_offline(tmp_path) -> None:
+    log_path = tmp_path / "traffic.jsonl.gz"
+    recorder = TrafficRecorder(log_path)
+    agent = _agent(tmp_path, RecordingProvider(ScriptedProvider(), recorder))
+    agent.recorder = recorder
+    assert await agent.process_direct("hello", session_key="cli:a", chat_id="a") == "done"
+    recorder.close()
+
+    log = TrafficLog.load(log_path)
+    assert len(log.inbound) == 1
+    assert len(log.llm) == 2
+    assert [t["name"] for t in log.tools] == ["list_dir"]
+
+    provider = ReplayProvider(log.llm, speed=0, default_model="scripted")
+    replay_agent = _agent(tmp_path, provider)
+    replay_agent.tools = ReplayToolRegistry(replay_agent.tools, log.tools, speed=0)
+    report = await TrafficReplayer(replay_agent, log, speed=0, drain_timeout=5).run()
+
+    assert report.replied == 1
+    assert report.llm["miss"] == 0
+    assert report.llm["exact"] + report.llm["fallback"] == 2
+    assert report.tools == {"replayed": 1, "by_name": 0, "missing": 0, "live": 0}
+
+
+def _tool_entry(args: dict[str, Any], result: str) -> dict[str, Any]:
+    return {"fp": tool_fingerprint("list_dir", args), "name": "list_dir", "args": args, "result": result}
+
+
+async def test_replayed_tools_match_arguments_and_never_run_live_by_default(tmp_path) -> None:
+    (tmp_path / "real.txt").write_text("x")
+    agent = _agent(tmp_path, ScriptedProvider())
+    entries = [_tool_entry({"path": "a"}, "recorded a"), _tool_entry({"path": "b"}, "recorded b")]
+
+    tools = ReplayToolRegistry(agent.tools, entries, speed=0)
+    assert await tools.execute("list_dir", {"path": "b"}) == "recorded b"
+    out = await tools.execute("list_dir", {"path": str(tmp_path)})
+    assert out.startswith("Error: No recorded result for list_dir")
+    assert tools.stats == {"replayed": 1, "by_name": 0, "missing": 1, "live": 0}
+
+    tools = ReplayToolRegistry(agent.tools, entries, speed=0, match_by_name=True)
+    assert await tools.execute("list_dir", {"path": "c"}) == "recorded a"
+    assert await tools.execute("list_dir", {"path": "b"}) == "recorded b"
+
+    tools = ReplayToolRegistry(agent.tools, [], speed=0, live_fallback=True)
+    assert "real.txt" in await tools.execute("list_dir", {"path": str(tmp_path)})
+    assert tools.stats["live"] == 1
+
+
+async def test_inbound_is_recorded_when_published(tmp_path) -> None:
+    log_path = tmp_path / "traffic.jsonl"
+    recorder = TrafficRecorder(log_path)
+    bus = MessageBus()
+    AgentLoop(
+        bus=bus,
+        provider=ScriptedProvider(),
+        workspace=tmp_path,
+        session_manager=SessionManager(tmp_path, sessions_dir=tmp_path / "sessions"),
+        recorder=recorder,
+    )
+    for text in ("one", "two"):
+        await bus.publish_inbound(InboundMessage(channel="cli", sender_id="u", chat_id="a", content=text))
+        await asyncio.sleep(0.2)
+    await bus.publish_inbound(InboundMessage(channel="system", sender_id="subagent", chat_id="cli:a", content="x"))
+    recorder.close()
+
+    # Recorded on arrival, though nothing consumed the bus yet
+    log = TrafficLog.load(log_path)
+    assert [e["content"] for e in log.inbound] == ["one", "two"]
+    assert log.inbound[1]["t"] - log.inbound[0]["t"] >= 0.15
@@ -0,0 +1,104 @@
+import re
+import time
+from typing import Any
+
+from nanobot.agent.context import ContextBuilder
+from nanobot.providers.base import LLMProvider, LLMResponse, ToolCallRequest
+from nanobot.providers.cache import CachingProvider, ResponseCache, cache_key
+from nanobot.providers.context import CallContext, call_context
+from nanobot.providers.router import RouterProvider, RouteRule
+
+
+class CountingProvider(LLMProvider):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    async def chat(self, messages: list[dict[str, Any]], tools=None, model=None,
+                   max_tokens: int = 4096, temperature: float = 0.7) -> LLMResponse:
+        self.calls += 1
+        return LLMResponse(
+            content=f"answer {self.calls}",
+            tool_calls=[ToolCallRequest(id="c1", name="read_file", arguments={"path": "a"})],
+            usage={"total_tokens": 10},
+        )
+
+    def get_default_model(self) -> str:
+        return "m"
+
+
+MESSAGES = [{"role": "user", "content": "what time is it?"}]
+
+
+async def test_identical_deterministic_requests_hit_cache() -> None:
+    inner = CountingProvider()
+    provider = CachingProvider(inner, ResponseCache())
+    first = await provider.chat(MESSAGES, temperature=0)
+    second = await provider.chat(MESSAGES, temperature=0)
+    assert inner.calls == 1
+    assert second.content == first.content
+    assert second.tool_calls[0].arguments == {"path": "a"}
+    await provider.chat([{"role": "user", "content": "other"}], temperature=0)
+    assert inner.calls == 2
+
+
+async def test_sampling_requests_bypass_cache_unless_forced() -> None:
+    inner = CountingProvider()
+    provider = CachingProvider(inner, ResponseCache())
+    await provider.chat(MESSAGES, temperature=0.7)
+    await provider.chat(MESSAGES, temperature=0.7)
+    assert inner.calls == 2
+
+    forced = CachingProvider(inner, ResponseCache(), force=True)
+    await forced.chat(MESSAGES, temperature=0.7)
+    await forced.chat(MESSAGES, temperature=0.7)
+    assert inner.calls == 3
+
+
+async def test_disk_cache_survives_restart_and_expires(tmp_path) -> None:
+    inner = CountingProvider()
+    await CachingProvider(inner, ResponseCache(path=tmp_path)).chat(MESSAGES, temperature=0)
+    restarted = CachingProvider(inner, ResponseCache(path=tmp_path))
+    assert (await restarted.chat(MESSAGES, temperature=0)).content == "answer 1"
+    assert inner.calls == 1
+
+    key = cache_key("m", MESSAGES, None, 4096, 0)
+    expired = ResponseCache(ttl_s=0.01, path=tmp_path)
+    time.sleep(0.02)
+    assert expired.get(key) is None
+
+
+def test_lru_evicts_oldest() -> None:
+    cache = ResponseCache(max_entries=2)
+    for key in ("a", "b", "c"):
+        cache.put(key, LLMResponse(content=key))
+    assert cache.get("a") is None
+    assert cache.get("c").content == "c"
+
+
+def test_key_ignores_the_system_prompt_clock_but_not_the_date(tmp_path) -> None:
+    messages = ContextBuilder(tmp_path).build_messages(history=[], current_message="heartbeat")
+    clock = re.search(r"\d{4}-\d{2}-\d{2} \d{2}:\d{2} \(\w+\)", messages[0]["content"]).group(0)
+
+    def at(stamp: str) -> list[dict[str, Any]]:
+        return [{**messages[0], "content": messages[0]["content"].replace(clock, stamp)}, *messages[1:]]
+
+    key = cache_key("m", messages, None, 4096, 0)
+    assert cache_key("m", at(clock[:11] + "23:59" + clock[16:]), None, 4096, 0) == key
+    assert cache_key("m", at("1999-01-01 10:00 (Friday)"), None, 4096, 0) != key
+
+
+async def test_routed_answers_are_cached_under_the_model_that_answered() -> None:
+    class ModelEcho(CountingProvider):
+        async def chat(self, messages, tools=None, model=None, max_tokens=4096, temperature=0.7):
+            self.calls += 1
+            return LLMResponse(content=f"from {model}")
+
+    inner = ModelEcho()
+    cache = ResponseCache()
+    router = RouterProvider(CachingProvider(inner, cache), rules=[RouteRule(model="small", origins=["cron"])])
+    with call_context(CallContext(origin="cron")):
+        assert (await router.chat(MESSAGES, model="large", temperature=0)).content == "from small"
+    with call_context(CallContext(origin="user")):
+        assert (await router.chat(MESSAGES, model="large", temperature=0)).content == "from large"
+    assert inner.calls == 2
@@ -0,0 +1,73 @@
+from typing import Any
+
+from nanobot.agent.loop import AgentLoop
+from nanobot.bus.queue import MessageBus
+from nanobot.providers.base import LLMProvider, LLMResponse
+from nanobot.providers.context import CallContext, call_context
+from nanobot.providers.errors import LLMServerError
+from nanobot.providers.router import RouterProvider, RouteRule
+from nanobot.session.manager import SessionManager
+
+
+class ModelEcho(LLMProvider):
+    """Answers with the model name; `small` fails or escalates on request."""
+
+    def __init__(self, small_behaviour: str = "ok"):
+        super().__init__()
+        self.small_behaviour = small_behaviour
+        self.models: list[str | None] = []
+
+    async def chat(self, messages: list[dict[str, Any]], tools=None, model=None,
+                   max_tokens: int = 4096, temperature: float = 0.7) -> LLMResponse:
+        self.models.append(model)
+        if model == "small" and self.small_behaviour == "error":
+            raise LLMServerError("overloaded", status_code=529)
+        if model == "small" and self.small_behaviour == "escalate":
+            return LLMResponse(content="[ESCALATE]")
+        return LLMResponse(content=model)
+
+    def get_default_model(self) -> str:
+        return "large"
+
+
+MESSAGES = [{"role": "system", "content": "sys"}, {"role": "user", "content": "hi"}]
+
+
+def test_rules_match_origin_channel_and_length() -> None:
+    router = RouterProvider(ModelEcho(), [
+        RouteRule(model="small", origins=["heartbeat", "cron"]),
+        RouteRule(model="small", channels=["telegram"], max_chars=10),
+    ])
+    assert router.select("large", MESSAGES, None, CallContext(origin="heartbeat")) == "small"
+    assert router.select("large", MESSAGES, None, CallContext(channel="telegram")) == "small"
+    long_msg = [{"role": "user", "content": "x" * 50}]
+    assert router.select("large", long_msg, None, CallContext(channel="telegram")) == "large"
+    assert router.select("large", MESSAGES, None, CallContext(channel="discord")) == "large"
+
+
+async def test_escalates_on_error_and_stays_escalated_for_the_turn() -> None:
+    inner = ModelEcho(small_behaviour="error")
+    router = RouterProvider(inner, [RouteRule(model="small")])
+    with call_context(CallContext(origin="user")):
+        assert (await router.chat(MESSAGES)).content == "large"
+        assert (await router.chat(MESSAGES)).content == "large"
+    assert inner.models == ["small", "large", "large"]
+
+
+async def test_small_model_can_ask_to_escalate() -> None:
+    inner = ModelEcho(small_behaviour="escalate")
+    router = RouterProvider(inner, [RouteRule(model="small")])
+    assert (await router.chat(MESSAGES)).content == "large"
+
+
+async def test_heartbeat_turn_is_routed_to_small_model(tmp_path) -> None:
+    inner = ModelEcho()
+    router = RouterProvider(inner, [RouteRule(model="small", origins=["heartbeat"])])
+    agent = AgentLoop(
+        bus=MessageBus(),
+        provider=router,
+        workspace=tmp_path,
+        session_manager=SessionManager(tmp_path, sessions_dir=tmp_path / "sessions"),
+    )
+    assert await agent.process_direct("check tasks", session_key="heartbeat") == "small"
+    assert await agent.process_direct("hello", session_key="cli:direct") == "large"
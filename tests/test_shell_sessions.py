@@ -0,0 +1,121 @@
+import asyncio
+import gc
+import time
+import weakref
+
+from nanobot.agent.loop import AgentLoop
+from nanobot.agent.tools.shell import ExecTool
+from nanobot.agent.tools.shell_session import ShellSessionPool
+from nanobot.bus.queue import MessageBus
+from nanobot.config.schema import ExecToolConfig
+from nanobot.providers.context import CallContext, call_context
+from nanobot.session.manager import SessionManager
+
+
+def _ctx(key: str) -> CallContext:
+    return CallContext(origin="agent", channel="cli", chat_id=key, session_key=f"cli:{key}")
+
+
+async def test_state_carries_over_within_a_session_only(tmp_path) -> None:
+    (tmp_path / "sub").mkdir()
+    pool = ShellSessionPool()
+    tool = ExecTool(working_dir=str(tmp_path), sessions=pool)
+    try:
+        with call_context(_ctx("a")):
+            assert await tool.execute("cd sub && export GREETING=hi") == "(no output)"
+            assert await tool.execute("pwd; echo $GREETING") == f"{tmp_path / 'sub'}\nhi\n"
+            assert await tool.execute("printf partial") == "partial"
+            assert (await tool.execute("echo err >&2; false")).endswith("STDERR:\nerr\n\n\nExit code: 1")
+        with call_context(_ctx("b")):
+            assert await tool.execute("pwd; echo \"[$GREETING]\"") == f"{tmp_path}\n[]\n"
+        assert pool.status()["cli:a"]["commands"] == 4
+    finally:
+        await pool.aclose()
+
+
+async def test_broken_commands_do_not_wedge_the_shell(tmp_path) -> None:
+    pool = ShellSessionPool()
+    tool = ExecTool(working_dir=str(tmp_path), sessions=pool, timeout=5)
+    try:
+        with call_context(_ctx("a")):
+            assert "Exit code: 2" in await tool.execute("echo 'unterminated")
+            assert await tool.execute("cat") == "(no output)"  # stdin is /dev/null
+            assert "The shell exited" in await tool.execute("exit 4")
+            assert await tool.execute("echo back") == "back\n"
+    finally:
+        await pool.aclose()
+
+
+async def test_timeout_replaces_the_shell(tmp_path) -> None:
+    pool = ShellSessionPool()
+    tool = ExecTool(working_dir=str(tmp_path), sessions=pool, timeout=1)
+    try:
+        with call_context(_ctx("a")):
+            await tool.execute("export KEEP=1")
+            start = time.monotonic()
+            out = await tool.execute("echo started; sleep 30")
+            assert time.monotonic() - start < 5
+            assert out.startswith("Error: Command timed out after 1 seconds (shell killed")
+            assert "Output so far:\nstarted" in out
+            assert await tool.execute("echo \"[$KEEP]\"") == "[]\n"
+    finally:
+        await pool.aclose()
+
+
+async def test_workspace_restriction_resets_cwd(tmp_path) -> None:
+    pool = ShellSessionPool()
+    tool = ExecTool(working_dir=str(tmp_path), sessions=pool, restrict_to_workspace=True)
+    try:
+        with call_context(_ctx("a")):
+            out = await tool.execute("cd ~")
+            assert "Working directory reset" in out
+            assert await tool.execute("pwd") == f"{tmp_path}\n"
+    finally:
+        await pool.aclose()
+
+
+async def test_cap_evicts_idle_shells_and_reaper_closes_old_ones(tmp_path) -> None:
+    pool = ShellSessionPool(max_sessions=2, idle_timeout_s=60)
+    tool = ExecTool(working_dir=str(tmp_path), sessions=pool)
+    try:
+        for key in ("a", "b", "c"):
+            with call_context(_ctx(key)):
+                await tool.execute("true")
+        assert sorted(pool.status()) == ["cli:b", "cli:c"]
+
+        # With every shell busy, a new session runs one-off instead of waiting
+        with call_context(_ctx("b")):
+            busy = asyncio.create_task(tool.execute("sleep 0.5"))
+        await asyncio.sleep(0.1)
+        async with pool._sessions["cli:c"].lock:
+            with call_context(_ctx("d")):
+                assert await tool.execute("echo oneshot") == "oneshot\n"
+        await busy
+        assert sorted(pool.status()) == ["cli:b", "cli:c"]
+
+        pool._sessions["cli:b"].last_used -= 120
+        assert pool.reap() == 1
+        assert list(pool.status()) == ["cli:c"]
+    finally:
+        await pool.aclose()
+
+
+async def test_agent_stop_closes_shells_and_pools_are_not_kept_alive(tmp_path) -> None:
+    agent = AgentLoop(
+        bus=MessageBus(),
+        provider=None,
+        workspace=tmp_path,
+        model="test",
+        exec_config=ExecToolConfig(persistent_shell=True),
+        session_manager=SessionManager(tmp_path, sessions_dir=tmp_path / "sessions"),
+    )
+    with call_context(_ctx("a")):
+        await agent.tools.execute("exec", {"command": "true"})
+    [shell] = agent.shells._sessions.values()
+    agent.stop()
+    await asyncio.wait_for(shell.wait_closed(), timeout=5)
+    assert not shell.alive
+
+    ref = weakref.ref(ShellSessionPool())
+    gc.collect()
+    assert ref() is None
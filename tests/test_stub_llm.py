@@ -0,0 +1,68 @@
+import time
+
+import pytest
+
+from nanobot.agent.loop import AgentLoop
+from nanobot.bus.queue import MessageBus
+from nanobot.providers.errors import LLMRateLimitError
+from nanobot.providers.failover import FailoverProvider
+from nanobot.providers.http_pool import HTTPPool
+from nanobot.providers.openai_compat import OpenAICompatProvider
+from nanobot.providers.stub import StubModel, StubProfile, StubProvider, StubRule, StubServer
+from nanobot.session.manager import SessionManager
+
+LIST_RULE = StubRule(match=r"files", tool_calls=[{"name": "list_dir", "arguments": {"path": "."}}])
+
+
+async def test_stub_provider_drives_agent_through_a_tool(tmp_path) -> None:
+    (tmp_path / "notes.md").write_text("hi")
+    rule = StubRule(
+        match=r"files",
+        tool_calls=[{"name": "list_dir", "arguments": {"path": str(tmp_path)}}],
+        content="Here you go: {tool_result}",
+    )
+    agent = AgentLoop(
+        bus=MessageBus(),
+        provider=StubProvider(StubModel(rules=[rule])),
+        workspace=tmp_path,
+        session_manager=SessionManager(tmp_path, sessions_dir=tmp_path / "sessions"),
+    )
+    assert "notes.md" in await agent.process_direct("which files are there?")
+    assert await agent.process_direct("hello") == "hello"
+
+
+async def test_scripted_responses_cycle() -> None:
+    provider = StubProvider(StubModel(responses=[{"content": "one"}, {"content": "two"}]))
+    replies = [(await provider.chat([{"role": "user", "content": "x"}])).content for _ in range(3)]
+    assert replies == ["one", "two", "one"]
+
+
+async def test_server_speaks_openai_wire_format() -> None:
+    profile = StubProfile(ttft_s=0.1, tokens_per_s=100)
+    with StubServer(StubModel(rules=[LIST_RULE], profile=profile)) as server:
+        client = OpenAICompatProvider(api_base=server.url, default_model="stub", http_pool=HTTPPool(http2=False))
+        start = time.monotonic()
+        response = await client.chat([{"role": "user", "content": "list files"}])
+        assert time.monotonic() - start >= 0.1
+        assert response.tool_calls[0].name == "list_dir"
+        assert response.tool_calls[0].arguments == {"path": "."}
+        assert response.usage["completion_tokens"] > 0
+        await client.aclose()
+
+
+async def test_server_injects_rate_limits_and_errors() -> None:
+    with StubServer(StubModel(profile=StubProfile(rate_limit_rate=1.0, retry_after_s=2))) as server:
+        client = OpenAICompatProvider(api_base=server.url, default_model="stub", http_pool=HTTPPool(http2=False))
+        with pytest.raises(LLMRateLimitError) as exc:
+            await client.chat([{"role": "user", "content": "hi"}])
+        assert exc.value.retry_after == 2
+        await client.aclose()
+
+    model = StubModel(profile=StubProfile(error_rate=0.5, seed=1))
+    with StubServer(model) as server:
+        client = OpenAICompatProvider(api_base=server.url, default_model="stub", http_pool=HTTPPool(http2=False))
+        retrying = FailoverProvider(client, max_retries=10, backoff_base=0.001, failure_threshold=100)
+        for _ in range(5):
+            assert (await retrying.chat([{"role": "user", "content": "hi"}])).content == "hi"
+        assert model.calls > 5
+        await retrying.aclose()
@@ -86,3 +86,31 @@ async def test_registry_returns_validation_error() -> None:
     reg.register(SampleTool())
     result = await reg.execute("sample", {"query": "hi"})
     assert "Invalid parameters" in result
+
+
+def test_validator_is_compiled_once() -> None:
+    tool = SampleTool()
+    tool.validate_params({"query": "hi", "count": 2})
+    validator = tool._validator
+    assert tool.validate_params({"query": "hi", "count": 20}) == ["count must be <= 10"]
+    assert tool._validator is validator
+
+
+def test_registry_caches_definitions_until_tools_change() -> None:
+    reg = ToolRegistry()
+    reg.register(SampleTool())
+    first = reg.get_definitions()
+    assert reg.get_definitions() is first
+    assert '"name": "sample"' in first.serialized
+
+    class OtherTool(SampleTool):
+        @property
+        def name(self) -> str:
+            return "other"
+
+    reg.register(OtherTool())
+    second = reg.get_definitions()
+    assert second is not first
+    assert [d["function"]["name"] for d in second] == ["sample", "other"]
+    reg.unregister("sample")
+    assert [d["function"]["name"] for d in reg.get_definitions()] == ["other"]
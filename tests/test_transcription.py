@@ -0,0 +1,87 @@
+import asyncio
+import time
+from pathlib import Path
+
+from nanobot.providers.http_pool import HTTPPool
+from nanobot.providers.stub import StubServer
+from nanobot.providers.transcription import (
+    TranscriptionBackend,
+    TranscriptionService,
+    WhisperAPIBackend,
+)
+from nanobot.utils.metrics import metrics
+
+
+class _CountingBackend(TranscriptionBackend):
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls: list[str] = []
+
+    async def transcribe_bytes(self, data: bytes, filename: str) -> str:
+        self.calls.append(filename)
+        await asyncio.sleep(self.delay)
+        return data.decode()
+
+
+def _byte_splitter(path: Path, segment_s: int, out_dir: Path) -> list[Path]:
+    data = path.read_bytes()
+    parts = []
+    for i in range(0, len(data), 4):
+        part = out_dir / f"part{i:04d}.ogg"
+        part.write_bytes(data[i:i + 4])
+        parts.append(part)
+    return parts
+
+
+async def test_whisper_backend_against_local_stand_in(tmp_path) -> None:
+    audio = tmp_path / "voice.ogg"
+    audio.write_bytes(b"OggS" + b"\0" * 100)
+    with StubServer() as server:
+        pool = HTTPPool(http2=False, name="test_transcription")
+        service = TranscriptionService(WhisperAPIBackend(api_url=f"{server.url}/audio/transcriptions", http_pool=pool))
+        opened = metrics.counter("test_transcription.http.connections_opened")
+        assert (await service.transcribe(audio)).startswith("stub transcription")
+        audio.write_bytes(b"OggS" + b"\1" * 100)
+        assert (await service.transcribe(audio)).startswith("stub transcription")
+        assert metrics.counter("test_transcription.http.connections_opened") - opened == 1
+        await service.aclose()
+
+
+async def test_identical_audio_is_transcribed_once(tmp_path) -> None:
+    backend = _CountingBackend(delay=0.05)
+    service = TranscriptionService(backend, cache_dir=tmp_path / "cache")
+    files = []
+    for i in range(3):
+        files.append(tmp_path / f"copy{i}.ogg")
+        files[-1].write_bytes(b"hello")
+
+    assert await asyncio.gather(*(service.transcribe(f) for f in files)) == ["hello"] * 3
+    assert len(backend.calls) == 1
+
+    restarted = TranscriptionService(backend, cache_dir=tmp_path / "cache")
+    assert await restarted.transcribe(files[0]) == "hello"
+    assert len(backend.calls) == 1
+
+
+async def test_long_audio_is_chunked_and_transcribed_concurrently(tmp_path) -> None:
+    audio = tmp_path / "long.ogg"
+    audio.write_bytes(b"aaaabbbbccccdddd")
+    backend = _CountingBackend(delay=0.1)
+    service = TranscriptionService(backend, chunk_bytes=8, max_concurrency=4, splitter=_byte_splitter)
+
+    start = time.monotonic()
+    assert await service.transcribe(audio) == "aaaa bbbb cccc dddd"
+    assert time.monotonic() - start < 0.3
+    assert len(backend.calls) == 4
+
+
+async def test_missing_file_and_backend_errors_yield_empty(tmp_path) -> None:
+    class Failing(TranscriptionBackend):
+        async def transcribe_bytes(self, data: bytes, filename: str) -> str:
+            raise RuntimeError("boom")
+
+    audio = tmp_path / "voice.ogg"
+    audio.write_bytes(b"x")
+    service = TranscriptionService(Failing())
+    assert await service.transcribe(tmp_path / "missing.ogg") == ""
+    assert await service.transcribe(audio) == ""
@@ -0,0 +1,77 @@
+import asyncio
+import time
+from typing import Any
+
+from nanobot.agent.budget import TurnBudget
+from nanobot.agent.loop import AgentLoop
+from nanobot.bus.queue import MessageBus
+from nanobot.providers.base import LLMProvider, LLMResponse, ToolCallRequest
+from nanobot.session.manager import SessionManager
+from nanobot.utils.metrics import metrics
+
+
+class _BusyProvider(LLMProvider):
+    """Keeps asking for new directory listings; answers only when tools are withheld."""
+
+    def __init__(self, path: str, delay: float = 0.0, tokens: int = 10):
+        super().__init__()
+        self.path = path
+        self.delay = delay
+        self.tokens = tokens
+        self.calls = 0
+        self.final_prompt = ""
+
+    async def chat(self, messages: list[dict[str, Any]], tools=None, model=None, max_tokens=4096, temperature=0.7) -> LLMResponse:
+        self.calls += 1
+        if tools is None:
+            self.final_prompt = messages[-1]["content"]
+            return LLMResponse(content="summary so far")
+        await asyncio.sleep(self.delay)
+        return LLMResponse(
+            content=None,
+            tool_calls=[ToolCallRequest(id=f"c{self.calls}", name="list_dir", arguments={"path": self.path})],
+            usage={"total_tokens": self.tokens},
+        )
+
+    def get_default_model(self) -> str:
+        return "busy"
+
+
+def _agent(tmp_path, provider: LLMProvider, **kwargs) -> AgentLoop:
+    return AgentLoop(
+        bus=MessageBus(),
+        provider=provider,
+        workspace=tmp_path,
+        loop_stop_after=0,
+        loop_warn_after=0,
+        session_manager=SessionManager(tmp_path, sessions_dir=tmp_path / "sessions"),
+        **kwargs,
+    )
+
+
+def test_token_budget_stops_before_the_next_call_would_exceed_it() -> None:
+    budget = TurnBudget(max_tokens=100)
+    budget.add_usage({"prompt_tokens": 40, "completion_tokens": 10})
+    assert budget.exhausted() is None
+    budget.add_usage({"total_tokens": 50})
+    assert budget.exhausted() == "tokens"
+
+
+async def test_deadline_bounds_the_turn(tmp_path) -> None:
+    provider = _BusyProvider(str(tmp_path), delay=0.3)
+    agent = _agent(tmp_path, provider, turn_timeout_s=1.0)
+    exhausted = metrics.counter("agent.budget.exhausted.time")
+
+    start = time.monotonic()
+    assert await agent.process_direct("keep going") == "summary so far"
+    assert time.monotonic() - start < 1.2
+    assert "out of time" in provider.final_prompt
+    assert metrics.counter("agent.budget.exhausted.time") == exhausted + 1
+
+
+async def test_token_budget_finalizes_the_turn(tmp_path) -> None:
+    provider = _BusyProvider(str(tmp_path), tokens=400)
+    agent = _agent(tmp_path, provider, turn_token_budget=1000)
+    assert await agent.process_direct("keep going") == "summary so far"
+    assert provider.calls == 3  # 400 + 400, a third call would pass 1000; then the final call
+    assert "token budget" in provider.final_prompt
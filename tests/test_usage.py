@@ -0,0 +1,77 @@
+from typing import Any
+
+import pytest
+
+from nanobot.providers.base import LLMProvider, LLMResponse
+from nanobot.providers.context import CallContext, call_context
+from nanobot.providers.errors import LLMRateLimitError
+from nanobot.usage import UsageRecord, UsageStore, UsageTrackingProvider
+
+
+class UsageProvider(LLMProvider):
+    def __init__(self, fail: bool = False):
+        super().__init__()
+        self.fail = fail
+
+    async def chat(self, messages: list[dict[str, Any]], tools=None, model=None,
+                   max_tokens: int = 4096, temperature: float = 0.7) -> LLMResponse:
+        if self.fail:
+            raise LLMRateLimitError("slow down", status_code=429)
+        return LLMResponse(
+            content="ok",
+            usage={"prompt_tokens": 100, "completion_tokens": 20, "total_tokens": 120, "cached_tokens": 80},
+        )
+
+    def get_default_model(self) -> str:
+        return "m1"
+
+
+MESSAGES = [{"role": "user", "content": "hi"}]
+
+
+async def test_calls_are_attributed_to_the_call_context(tmp_path) -> None:
+    store = UsageStore(tmp_path)
+    provider = UsageTrackingProvider(UsageProvider(), store)
+    with call_context(CallContext(channel="telegram", chat_id="42", sender_id="alice", session_key="telegram:42")):
+        await provider.chat(MESSAGES)
+        await provider.chat(MESSAGES)
+    with call_context(CallContext(origin="cron", session_key="cron:job1")):
+        await provider.chat(MESSAGES, model="m2")
+
+    by_session = {r["key"]: r for r in store.summarize(by="session")}
+    assert by_session["telegram:42"]["calls"] == 2
+    assert by_session["telegram:42"]["cached_tokens"] == 160
+    assert by_session["cron:job1"]["total_tokens"] == 120
+    assert {r["key"] for r in store.summarize(by="model")} == {"m1", "m2"}
+    assert {r["key"] for r in store.summarize(by="origin")} == {"user", "cron"}
+
+
+async def test_failures_are_recorded_with_error_kind(tmp_path) -> None:
+    store = UsageStore(tmp_path)
+    provider = UsageTrackingProvider(UsageProvider(fail=True), store)
+    with pytest.raises(LLMRateLimitError):
+        await provider.chat(MESSAGES)
+    [rec] = store.records()
+    assert rec.error == "rate_limit"
+    assert store.totals()["errors"] == 1
+
+
+def test_records_round_trip_compactly(tmp_path) -> None:
+    store = UsageStore(tmp_path)
+    store.record(UsageRecord(ts=1_700_000_000.0, model="m", session="s", prompt_tokens=5, latency_s=0.25))
+    store.close()
+    line = next(tmp_path.glob("usage-*.jsonl")).read_text().strip()
+    assert line == '{"t":1700000000.0,"s":"s","m":"m","p":5,"l":0.25}'
+    assert UsageStore(tmp_path, retention_days=0).records()[0].prompt_tokens == 5
+
+
+async def test_ttft_is_left_unset_for_non_streaming_calls(tmp_path) -> None:
+    store = UsageStore(tmp_path)
+    await UsageTrackingProvider(UsageProvider(), store).chat(MESSAGES)
+    assert store.records()[0].ttft_s is None
+    assert store.summarize(by="model")[0]["ttft_avg_s"] is None
+
+    store.record(UsageRecord(ts=1_700_000_000.0, model="m1", ttft_s=0.5))
+    [summary] = store.summarize(by="model")
+    assert summary["calls"] == 2
+    assert summary["ttft_avg_s"] == 0.5
@@ -0,0 +1,81 @@
+import os
+
+from nanobot.agent.tools.filesystem import EditFileTool
+from nanobot.agent.tools.search import SearchTool, WorkspaceIndex, required_literals
+from nanobot.utils.ignore import IgnoreRules, walk
+
+
+def _tool(tmp_path, **kwargs) -> SearchTool:
+    root = tmp_path / "ws"
+    root.mkdir(exist_ok=True)
+    return SearchTool(root, index=WorkspaceIndex(root, tmp_path / "index.db", **kwargs))
+
+
+def test_ignore_rules_follow_gitignore_semantics(tmp_path) -> None:
+    for name in ("a.log", "src/keep.log", "src/x.py", "src/gen/y.py", "docs/build/i.html", "node_modules/m.js"):
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_text("x")
+    (tmp_path / ".gitignore").write_text("*.log\n!src/keep.log\n/docs/build/\n")
+    (tmp_path / "src" / ".gitignore").write_text("gen/\n")
+    files = [rel for rel, _, _ in walk(tmp_path, IgnoreRules(tmp_path))]
+    assert files == [".gitignore", "src/.gitignore", "src/keep.log", "src/x.py"]
+
+
+def test_regex_prefilter_only_uses_required_literals() -> None:
+    assert required_literals(r"def \w+_request\(", regex=True) == ["def ", "_request"]
+    assert required_literals("foo|bar", regex=True) == []
+    assert required_literals("a.b", regex=False) == ["a.b"]
+
+
+async def test_search_ranks_matches_with_line_numbers(tmp_path) -> None:
+    tool = _tool(tmp_path)
+    ws = tool.index.root
+    (ws / "src").mkdir()
+    (ws / "src" / "app.py").write_text("import os\n\ndef handle_request(req):\n    return handle(req)\n")
+    (ws / "src" / "handle.py").write_text("# handle it\n")
+    (ws / "notes.md").write_text("nothing here\n")
+    (ws / "blob.bin").write_bytes(b"\0handle")
+
+    out = await tool.execute("handle")
+    assert out.splitlines() == [
+        "3 matches in 2 files:",
+        "src/handle.py",  # name match ranks first
+        "  1: # handle it",
+        "src/app.py",
+        "  3: def handle_request(req):",
+        "  4: return handle(req)",
+    ]
+    assert "src/app.py" in await tool.execute(r"def \w+_request", regex=True)
+    assert await tool.execute("HANDLE", case_sensitive=True) == "No matches for 'HANDLE'"
+    assert "notes.md" not in await tool.execute("handle", glob="*.md")
+    assert (await tool.execute("(", regex=True)).startswith("Error: invalid regex")
+
+
+async def test_index_persists_and_updates_incrementally(tmp_path) -> None:
+    tool = _tool(tmp_path, rescan_interval_s=3600)
+    ws = tool.index.root
+    (ws / "a.txt").write_text("alpha\n")
+    (ws / "b.txt").write_text("beta\n")
+    assert "a.txt" in await tool.execute("alpha")
+    tool.index.close()
+
+    # A new index over the same database only re-reads changed files
+    tool = _tool(tmp_path, rescan_interval_s=3600)
+    (ws / "b.txt").write_text("gamma\n")
+    os.utime(ws / "b.txt", ns=(1, 1))
+    assert tool.index.refresh() == 1
+
+    # Within the rescan interval, edits made through the edit tool are picked up via mark_dirty
+    edit = EditFileTool(on_change=tool.index.mark_dirty)
+    assert await tool.execute("delta") == "No matches for 'delta'"
+    await edit.execute(str(ws / "a.txt"), "alpha", "delta")
+    assert "a.txt" in await tool.execute("delta")
+    assert await tool.execute("alpha") == "No matches for 'alpha'"
+
+
+async def test_case_insensitive_search_handles_non_ascii_and_wildcard_chars(tmp_path) -> None:
+    tool = _tool(tmp_path)
+    (tool.index.root / "a.md").write_text("Über alles\n100% done_now\n")
+    assert "1: Über alles" in await tool.execute("über")
+    assert "2: 100% done_now" in await tool.execute("0% done_n")
+    assert "No matches" in await tool.execute("0% DONE_N", case_sensitive=True)